@@ -1,29 +1,32 @@
-from flask import Flask, request, jsonify, send_file, make_response, send_from_directory
-from flask_pymongo import PyMongo
+from flask import Flask, Response, request, jsonify
 from bson.json_util import dumps
 import os
 import bcrypt
 from dotenv import load_dotenv
-from mail import send_username_password_mail
 from flask_cors import CORS  # Add this import
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import io
 import json
-import requests
-from docx import Document
+from datetime import datetime
 from werkzeug.utils import secure_filename
 from gridfs import GridFS
 from bson.objectid import ObjectId
-import math
-# Add this import at the top\
-from verification_commity import create_verification_blueprint
-# Add this import at the top
-from faculty_list import faculty_list
-# Add this import at the top of app.py
-from forgot_password import forgot_password
-# Add this import at the top of app.py
-from user_profile import user_profile
+from pymongo import ReturnDocument
+# Document generation (reportlab, python-docx, docx2pdf, pythoncom), mail and APScheduler are
+# imported where they are used, so serverless cold starts do not pay for them
+from section_store import SECTIONS, SECTION_SAVE_OPTIONS, save_section, resolve_patch_paths, patch_section
+from roster_cache import roster_cache
+from appraisal_schema import empty_faculty_document, faculty_entry, merge_section
+from appraisal_report import build_report_data, report_placeholders
+from report_cache import ReportCache, report_cache_key
+from report_jobs import ReportJobQueue, create_report_jobs_blueprint
+from gridfs_download import gridfs_response
+from report_prerender import report_prerender
+from department_summary import (department_summary, DEPARTMENT_SUMMARY_RECONCILE_HOURS, SUMMARY_PROJECTION,
+                                create_department_summary_blueprint)
+from pagination import PaginationError, page_fields, paginate_query, parse_page
+from report_retention import (ReportRetention, REPORT_RETENTION_INTERVAL_HOURS,
+                              create_report_retention_blueprint)
+from db_config import registry, mongo, mongo_fdw, department_collections
+from request_metrics import request_metrics
 
 
 
@@ -35,7 +38,7 @@ app = Flask(__name__)
 CORS(app, resources={
     r"/*": {
         "origins": ["http://10.10.1.18:5173", "http://127.0.0.1:5173","http://localhost:5173","*"],  # Your React app's URLs
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         "allow_headers": ["Content-Type", "Authorization"],
         "supports_credentials": True
     }
@@ -45,33 +48,26 @@ CORS(app, resources={
 app.config["MONGO_URI"] = os.getenv("MONGO_URI")
 app.config["MONGO_URI_FDW"] = os.getenv("MONGO_URI_FDW")
 
-mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-
+# Shared clients and department collections come from the process-wide registry (db_config)
 # Collections
 db_users = mongo.db.users
 db_signin = mongo.db.signin
 
 # GridFS instance
 fs = GridFS(mongo_fdw.db)
-
-# Department-based collections in the FDW database
-department_collections = {
-    "AIML": mongo_fdw.db.AIML,
-    "ASH": mongo_fdw.db.ASH,
-    "Civil": mongo_fdw.db.Civil,
-    "Computer": mongo_fdw.db.Computer,
-    "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-    "ENTC": mongo_fdw.db.ENTC,
-    "IT": mongo_fdw.db.IT,
-    "Mechanical": mongo_fdw.db.Mechanical
-}
+report_cache = ReportCache(fs, mongo_fdw.db.fs.files)
+report_retention = ReportRetention(mongo_fdw.db, department_collections)
 
 # Health check
 @app.route('/', methods=['GET'])
 def health_check():
     return jsonify({"message": "Welcome to FDW project"}), 200
 
+@app.route('/health/db-pool', methods=['GET'])
+def db_pool_stats():
+    """Connection pool settings and per-server counters of the shared Mongo clients"""
+    return jsonify(registry.stats()), 200
+
 # Create a new user
 @app.route('/users', methods=['POST'])
 def add_user():
@@ -140,258 +136,12 @@ def add_user():
                 {"$set": {f"data.{data['_id']}": data["role"]}},
                 upsert=True
             )
+            roster_cache.invalidate(department)
 
             # Create empty document for the user
-            empty_doc = {
-        "_id": data["_id"],
-        "status": "pending",
-        "isUpdated": False,
-        "grand_total": {
-            "grand_total": 0,
-            "status": "pending"
-        },
-        "A": {
-            "1": {
-                "courses": {},
-                "total_marks": 0
-            },
-            "2": {
-                "courses": {},
-                "semesterScores": {
-                    "Sem I": 0,
-                    "Sem II": 0
-                },
-                "total_marks": 0
-            },
-            "3": {
-                "elearningInstances": 0,
-                "total_marks": 0
-            },
-            "4": {
-                "courses": {},
-                "total_marks": 0
-            },
-            "5": {
-                "weeklyLoadSem1": 0,
-                "weeklyLoadSem2": 0,
-                "adminResponsibility": 0,
-                "cadre": data["role"],
-                "total_marks": 0
-            },
-            "6": {
-                "projectsGuided": 0,
-                "total_marks": 0
-            },
-            "7": {
-                "courses": {},
-                "total_marks": 0
-            },
-            "8": {
-                "ptgMeetings": 0,
-                "total_marks": 0
-            },
-            "total_marks": 0
-        },
-        "B": {
-            "1": {
-                "journalPapers": {
-                    "sciCount": 0, "sciProof": "", "ver_sciMarks": 0,
-                    "esciCount": 0, "esciProof": "", "ver_esciMarks": 0,
-                    "scopusCount": 0, "scopusProof": "", "ver_scopusMarks": 0,
-                    "ugcCareCount": 0, "ugcCareProof": "", "ver_ugcCareMarks": 0,
-                    "otherCount": 0, "otherProof": "", "ver_otherMarks": 0,
-                    "marks": 0, "verified_marks": 0
-                }
-            },
-            "2": {
-                "conferencePapers": {
-                    "scopusWosCount": 0, "scopusWosProof": "", "ver_scopusWosMarks": 0,
-                    "otherCount": 0, "otherProof": "", "ver_otherMarks": 0,
-                    "marks": 0, "verified_marks": 0
-                }
-            },
-            '3': {
-                'bookChapters': {
-                    'scopusWosCount': 0, 'scopusWosProof': '', 'ver_scopusWosMarks': 0,
-                    'otherCount': 0, 'otherProof': '', 'ver_otherMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '4': {
-                'books': {
-                    'scopusWosCount': 0, 'scopusWosProof': '', 'ver_scopusWosMarks': 0,
-                    'nonIndexedCount': 0, 'nonIndexedProof': '', 'ver_nonIndexedMarks': 0,
-                    'localCount': 0, 'localProof': '', 'ver_localMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '5': {
-                'citations': {
-                    'webOfScienceCount': 0, 'webOfScienceProof': '', 'ver_webOfScienceMarks': 0,
-                    'scopusCount': 0, 'scopusProof': '', 'ver_scopusMarks': 0,
-                    'googleScholarCount': 0, 'googleScholarProof': '', 'ver_googleScholarMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '6': {
-                'copyrightIndividual': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '7': {
-                'copyrightInstitute': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '8': {
-                'patentIndividual': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'publishedCount': 0, 'publishedProof': '', 'ver_publishedMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '9': {
-                'patentInstitute': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'publishedCount': 0, 'publishedProof': '', 'ver_publishedMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '10': {
-                'researchGrants': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '11': {
-                'trainingPrograms': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '12': {
-                'nonResearchGrants': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '13': {
-                'productDevelopment': {
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'developedCount': 0, 'developedProof': '', 'ver_developedMarks': 0,
-                    'pocCount': 0, 'pocProof': '', 'ver_pocMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '14': {
-                'startup': {
-                    'revenueFiftyKCount': 0, 'revenueFiftyKProof': '', 'ver_revenueFiftyKMarks': 0,
-                    'fundsFiveLakhsCount': 0, 'fundsFiveLakhsProof': '', 'ver_fundsFiveLakhsMarks': 0,
-                    'productsCount': 0, 'productsProof': '', 'ver_productsMarks': 0,
-                    'pocCount': 0, 'pocProof': '', 'ver_pocMarks': 0,
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '15': {
-                'awardsAndFellowships': {
-                    'internationalAwardsCount': 0, 'internationalAwardsProof': '', 'ver_internationalAwardsMarks': 0,
-                    'governmentAwardsCount': 0, 'governmentAwardsProof': '', 'ver_governmentAwardsMarks': 0,
-                    'nationalAwardsCount': 0, 'nationalAwardsProof': '', 'ver_nationalAwardsMarks': 0,
-                    'internationalFellowshipsCount': 0, 'internationalFellowshipsProof': '', 'ver_internationalFellowshipsMarks': 0,
-                    'nationalFellowshipsCount': 0, 'nationalFellowshipsProof': '', 'ver_nationalFellowshipsMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '16': {
-                'industryInteraction': {
-                    'moUsCount': 0, 'moUsProof': '', 'ver_moUsMarks': 0,
-                    'collaborationCount': 0, 'collaborationProof': '', 'ver_collaborationMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '17': {
-                'internshipPlacement': {
-                    'offersCount': 0, 'offersProof': '', 'ver_offersMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            "total_marks": 0,
-            "final_verified_marks": 0,
-            "verifier_id": ""
-        
-        },
-        "C": {
-            "1": {
-                "qualification": {
-                    "pdfCompleted": False,
-                    "pdfOngoing": False,
-                    "phdAwarded": False,
-                    "marks": 0
-                }
-            },
-            "2": {
-                "trainingAttended": {
-                    "twoWeekProgram": 0,
-                    "oneWeekProgram": 0,
-                    "twoToFiveDayProgram": 0,
-                    "oneDayProgram": 0,
-                    "marks": 0
-                }
-            },
-            "3": {
-                "trainingOrganized": {
-                    "twoWeekProgram": 0,
-                    "oneWeekProgram": 0,
-                    "twoToFiveDayProgram": 0,
-                    "oneDayProgram": 0,
-                    "marks": 0
-                }
-            },
-            "4": {
-                "phdGuided": {
-                    "degreesAwarded": 0,
-                    "thesisSubmitted": 0,
-                    "scholarsGuiding": 0,
-                    "marks": 0
-                }
-            },
-            "total_marks": 0
-        },
-        "D": {
-            "portfolioType": "",
-            "selfAwardedMarks": 0,
-            "deanMarks": 0,
-            "hodMarks": 0,
-            "isMarkHOD": False,
-            "isMarkDean": False,
-            "isAdministrativeRole": False,
-            "administrativeRole": "",
-            "adminSelfAwardedMarks": 0,
-            "directorMarks": 0,
-            "adminDeanMarks": 0,
-            "instituteLevelPortfolio": "",
-            "departmentLevelPortfolio": "",
-            "total_marks": 0,
-            "isFirstTime": True
-        },
-        "E": {
-            "total_marks": 0,
-            "bullet_points": [],
-            "verified_marks": 0,
-            "verifier_comments": "",
-            "isVerified": False
-        }
-    }
+            empty_doc = empty_faculty_document(data["_id"], data["role"])
             collection.insert_one(empty_doc)
+            department_summary.record(department, None, empty_doc)
 
             return jsonify({"message": f"User added successfully to {department}"}), 201
         else:
@@ -401,11 +151,35 @@ def add_user():
         print(str(e))
         return jsonify({"error": str(e)}), 500
 
+USER_SORT_FIELDS = {"_id": "_id", "name": "name", "department": "dept", "role": "role", "desg": "desg"}
+USER_FILTER_FIELDS = {"role": "role", "desg": "desg", "department": "dept"}
+_user_indexes_created = False
+
+
+def ensure_user_indexes():
+    """Indexes behind the sort keys of the paginated user listing, created on first use"""
+    global _user_indexes_created
+    if not _user_indexes_created:
+        for field in USER_SORT_FIELDS.values():
+            if field != "_id":
+                db_users.create_index([(field, 1), ("_id", 1)])
+        _user_indexes_created = True
+
+
 # Get all users
 @app.route('/users', methods=['GET'])
 def get_users():
-    users = db_users.find()
-    return dumps(users), 200
+    """One page of users, with ?limit= / ?cursor= (see pagination.py)"""
+    try:
+        page = parse_page(request.args, USER_SORT_FIELDS, USER_FILTER_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ensure_user_indexes()
+    # External reviewers are only listed when asked for by role
+    base_query = None if "external" in page.filters.get("role", []) else {"isExternal": {"$ne": True}}
+    users, next_cursor = paginate_query(db_users, page, USER_SORT_FIELDS, USER_FILTER_FIELDS, base_query)
+    return Response(dumps({"data": users, **page_fields(page, next_cursor)}), mimetype='application/json')
 
 # Get a user by ID
 @app.route('/users/<string:user_id>', methods=['GET'])
@@ -427,6 +201,10 @@ def update_user(user_id):
 
     result = db_users.update_one({"_id": user_id}, {"$set": updated_data})
 
+    # Role or department changes affect the cached rosters
+    if "role" in updated_data or "dept" in updated_data:
+        roster_cache.invalidate()
+
     if result.modified_count:
         return jsonify({"message": "User updated successfully"}), 200
     return jsonify({"error": "User not found or no changes made"}), 404
@@ -463,6 +241,8 @@ def migrate_users():
                 upsert=True
             )
             
+    # Rosters were rewritten above, drop every cached copy
+    roster_cache.invalidate()
 
     return jsonify({"message": f"Migrated {migrated_count} users to signin collection"}), 200
 
@@ -526,6 +306,9 @@ def login():
 
 
 #Section Data Adding Start here
+# Projection holding just what calculate_grand_total reads
+GRAND_TOTAL_FIELDS = {f"{section}.total_marks": 1 for section in SECTIONS}
+
 def calculate_grand_total(data):
     """Calculate grand total from all sections and determine status"""
     try:
@@ -578,65 +361,28 @@ def handle_post_A(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
         
-        lookup = collection.find_one({"_id": "lookup"}).get("data")
+        # Roster membership is answered from the in-process cache
+        lookup = roster_cache.get(department, collection)
         if lookup is None:
             return jsonify({"error": "Invalid department"}), 400
-        user = lookup.get(user_id)
+        user = roster_cache.role_of(department, collection, user_id)
         if user is None:
             return jsonify({"error": "Invalid user"}), 400
-        print(data)
-        # Update the document for the given user_id
-        if 'total_marks' not in data['1']:
-            data['1']['total_marks'] = 0
-        if 'total_marks' not in data['2']:
-            data['2']['total_marks'] = 0
-        if 'total_marks' not in data['3']:
-            data['3']['total_marks'] = 0
-        if 'total_marks' not in data['4']:
-            data['4']['total_marks'] = 0
-        if 'total_marks' not in data['5']:
-            data['5']['total_marks'] = 0
-        if 'total_marks' not in data['6']:
-            data['6']['total_marks'] = 0
-        if 'total_marks' not in data['7']:
-            data['7']['total_marks'] = 0
-        if 'total_marks' not in data['8']:
-            data['8']['total_marks'] = 0
-        if 'total_marks' not in data:
-            data['total_marks'] = 0
-        
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "A": data,
-                "isUpdated": True,
-                "status": "pending"  # Set initial status
-            }},
-            upsert=True
-        )
-
-        # Get updated document and calculate grand total
-        updated_doc = collection.find_one({"_id": user_id})
-        calculated_data = calculate_grand_total(updated_doc)
-
-        # Update grand total and status
-        collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "grand_total": calculated_data['grand_total'],
-                "status": calculated_data['status']
-            }}
+        # Fill missing fields with the section A defaults
+        data = merge_section('A', data)
+
+        # Store section A and recompute the grand total in one write
+        grand_total = save_section(
+            collection, user_id, "A", data,
+            extra_fields={"status": "pending"},
+            nested_total=False,
+            on_change=department_summary.recorder(department)
         )
 
-        if result.matched_count > 0:
-            message = "Data updated successfully"
-        else:
-            message = "Data inserted successfully"
-
         return jsonify({
-            "message": message,
-            "grand_total": calculated_data['grand_total'],
-            "status": calculated_data['status']
+            "message": "Data updated successfully",
+            "grand_total": grand_total,
+            "status": "pending"
         }), 200
 
     except Exception as e:
@@ -648,7 +394,7 @@ def get_section_A(department, user_id):
     try:
         collection = department_collections.get(department)
         if collection is not None:
-            user = collection.find_one({"_id": user_id})
+            user = collection.find_one({"_id": user_id}, {"A": 1})
             if user:
                 return jsonify(user.get("A"))
             return jsonify({"error": "User not found"}), 404
@@ -674,210 +420,31 @@ def handle_post_B(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
         
-        lookup = collection.find_one({"_id": "lookup"}).get("data")
-        print(lookup)
+        # Roster membership is answered from the in-process cache
+        lookup = roster_cache.get(department, collection)
         if lookup is None:
             return jsonify({"error": "Invalid department"}), 400
-        user = lookup.get(user_id)
+        user = roster_cache.role_of(department, collection, user_id)
         if user is None:
             return jsonify({"error": "Invalid user"}), 400
         
         
         
-         # Initialize default structure for section B if not present
-        
-
-        # Initialize subsections with default values
-        sections = {
-            '1': {
-                'journalPapers': {
-                    'sciCount': 0, 'sciProof': '', 'ver_sciMarks': 0,
-                    'esciCount': 0, 'esciProof': '', 'ver_esciMarks': 0,
-                    'scopusCount': 0, 'scopusProof': '', 'ver_scopusMarks': 0,
-                    'ugcCareCount': 0, 'ugcCareProof': '', 'ver_ugcCareMarks': 0,
-                    'otherCount': 0, 'otherProof': '', 'ver_otherMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '2': {
-                'conferencePapers': {
-                    'scopusWosCount': 0, 'scopusWosProof': '', 'ver_scopusWosMarks': 0,
-                    'otherCount': 0, 'otherProof': '', 'ver_otherMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '3': {
-                'bookChapters': {
-                    'scopusWosCount': 0, 'scopusWosProof': '', 'ver_scopusWosMarks': 0,
-                    'otherCount': 0, 'otherProof': '', 'ver_otherMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '4': {
-                'books': {
-                    'scopusWosCount': 0, 'scopusWosProof': '', 'ver_scopusWosMarks': 0,
-                    'nonIndexedCount': 0, 'nonIndexedProof': '', 'ver_nonIndexedMarks': 0,
-                    'localCount': 0, 'localProof': '', 'ver_localMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '5': {
-                'citations': {
-                    'webOfScienceCount': 0, 'webOfScienceProof': '', 'ver_webOfScienceMarks': 0,
-                    'scopusCount': 0, 'scopusProof': '', 'ver_scopusMarks': 0,
-                    'googleScholarCount': 0, 'googleScholarProof': '', 'ver_googleScholarMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '6': {
-                'copyrightIndividual': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '7': {
-                'copyrightInstitute': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '8': {
-                'patentIndividual': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'publishedCount': 0, 'publishedProof': '', 'ver_publishedMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '9': {
-                'patentInstitute': {
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'publishedCount': 0, 'publishedProof': '', 'ver_publishedMarks': 0,
-                    'grantedCount': 0, 'grantedProof': '', 'ver_grantedMarks': 0,
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '10': {
-                'researchGrants': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '11': {
-                'trainingPrograms': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '12': {
-                'nonResearchGrants': {
-                    'amount': 0, 'proof': '', 'ver_amountMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '13': {
-                'productDevelopment': {
-                    'commercializedCount': 0, 'commercializedProof': '', 'ver_commercializedMarks': 0,
-                    'developedCount': 0, 'developedProof': '', 'ver_developedMarks': 0,
-                    'pocCount': 0, 'pocProof': '', 'ver_pocMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '14': {
-                'startup': {
-                    'revenueFiftyKCount': 0, 'revenueFiftyKProof': '', 'ver_revenueFiftyKMarks': 0,
-                    'fundsFiveLakhsCount': 0, 'fundsFiveLakhsProof': '', 'ver_fundsFiveLakhsMarks': 0,
-                    'productsCount': 0, 'productsProof': '', 'ver_productsMarks': 0,
-                    'pocCount': 0, 'pocProof': '', 'ver_pocMarks': 0,
-                    'registeredCount': 0, 'registeredProof': '', 'ver_registeredMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '15': {
-                'awardsAndFellowships': {
-                    'internationalAwardsCount': 0, 'internationalAwardsProof': '', 'ver_internationalAwardsMarks': 0,
-                    'governmentAwardsCount': 0, 'governmentAwardsProof': '', 'ver_governmentAwardsMarks': 0,
-                    'nationalAwardsCount': 0, 'nationalAwardsProof': '', 'ver_nationalAwardsMarks': 0,
-                    'internationalFellowshipsCount': 0, 'internationalFellowshipsProof': '', 'ver_internationalFellowshipsMarks': 0,
-                    'nationalFellowshipsCount': 0, 'nationalFellowshipsProof': '', 'ver_nationalFellowshipsMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '16': {
-                'industryInteraction': {
-                    'moUsCount': 0, 'moUsProof': '', 'ver_moUsMarks': 0,
-                    'collaborationCount': 0, 'collaborationProof': '', 'ver_collaborationMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            '17': {
-                'internshipPlacement': {
-                    'offersCount': 0, 'offersProof': '', 'ver_offersMarks': 0,
-                    'marks': 0, 'verified_marks': 0
-                }
-            },
-            
-        }
+        # Fill missing categories and fields with the section B defaults
+        data = merge_section('B', data)
 
-        # Merge incoming data with default values
-        for section, default_data in sections.items():
-            if section not in data:
-                print(f"Adding default value for {section}")
-                data[section] = default_data
-            else:
-                for category, category_data in default_data.items():
-                    if category not in data[section]:
-                        print(f"Adding default value for {section} -> {category}")
-                        data[section][category] = category_data
-                    else:
-                        for field, default_value in category_data.items():
-                            if field not in data[section][category]:
-                                print(f"Adding default value for {section} - {category} - {field}")
-                                data[section][category][field] = default_value
-        checkData = {"total_marks": 0,
-            "final_verified_marks": 0,
-            "verifier_id": ""}
-        for field,value in checkData.items() :
-            if field not in data:
-                print(f"{field} is not present")
-                data[field] = value
         # Rest of your existing code for database update
         collection = department_collections.get(department)
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "B": data,
-                "isUpdated": True
-            }},
-            upsert=True
-        )
+        # Store section B and recompute the grand total in one write
+        grand_total = save_section(collection, user_id, "B", data,
+                                   on_change=department_summary.recorder(department))
         print('added data in B')
-
-        # Get updated document and calculate grand total
-        updated_doc = collection.find_one({"_id": user_id})
-        grand_total = calculate_grand_total(updated_doc)
-
-        # Update grand total
-        collection.update_one(
-            {"_id": user_id},
-            {"$set": {"grand_total": grand_total}}
-        )
-        print('grand total updated')
-        
-        if result.matched_count > 0:
-            message = "Data updated successfully"
-        else:
-            message = "Data inserted successfully"
         
         return jsonify({
-            "message": message,
+            "message": "Data updated successfully",
             "grand_total": grand_total
         }), 200
     
@@ -890,7 +457,7 @@ def get_section_B(department, user_id):
     try:
         collection = department_collections.get(department)
         if collection is not None:
-            user = collection.find_one({"_id": user_id})
+            user = collection.find_one({"_id": user_id}, {"B": 1})
             if user:
                 return jsonify(user.get("B"))
             return jsonify({"error": "User not found"}), 404
@@ -905,92 +472,20 @@ def handle_post_C(department, user_id):
         if not data:
             return jsonify({"error": "Invalid JSON data"}), 400
 
-        # Initialize default structure for section C if not present
-        
-
-        # Initialize subsections with default values
-        sections = {
-            '1': {
-                'qualification': {
-                    'pdfCompleted': False,
-                    'pdfOngoing': False,
-                    'phdAwarded': False,
-                    'marks': 0
-                }
-            },
-            '2': {
-                'trainingAttended': {
-                    'twoWeekProgram': 0,
-                    'oneWeekProgram': 0,
-                    'twoToFiveDayProgram': 0,
-                    'oneDayProgram': 0,
-                    'marks': 0
-                }
-            },
-            '3': {
-                'trainingOrganized': {
-                    'twoWeekProgram': 0,
-                    'oneWeekProgram': 0,
-                    'twoToFiveDayProgram': 0,
-                    'oneDayProgram': 0,
-                    'marks': 0
-                }
-            },
-            '4': {
-                'phdGuided': {
-                    'degreesAwarded': 0,
-                    'thesisSubmitted': 0,
-                    'scholarsGuiding': 0,
-                    'marks': 0
-                }
-            },
-           
-        }
-
-        # Merge incoming data with default values
-        for section, default_data in sections.items():
-            if section not in data:
-                data[section] = default_data
-            else:
-                for category, category_data in default_data.items():
-                    if isinstance(category_data, dict):
-                        if category not in data[section]:
-                            data[section][category] = category_data
-                        else:
-                            for field, default_value in category_data.items():
-                                if field not in data[section][category]:
-                                    data[section][category][field] = default_value
-                    else:
-                        if category not in data[section]:
-                            data[section][category] = category_data
-                            
-        if  'total_marks' not in data:
-            data['total_marks'] = 0
+        # Fill missing categories and fields with the section C defaults
+        data = merge_section('C', data)
 
         # Update document with merged data
         collection = department_collections.get(department)
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "C": data,
-                "isUpdated": True
-            }},
-            upsert=True
-        )
-
-        # Update grand total
-        updated_doc = collection.find_one({"_id": user_id})
-        grand_total = calculate_grand_total(updated_doc)
-        collection.update_one(
-            {"_id": user_id},
-            {"$set": {"grand_total": grand_total}}
-        )
+        # Store section C and recompute the grand total in one write
+        grand_total = save_section(collection, user_id, "C", data,
+                                   on_change=department_summary.recorder(department))
 
         return jsonify({
-            "message": "Data updated successfully" if result.matched_count > 0 else "Data inserted successfully",
+            "message": "Data updated successfully",
             "grand_total": grand_total
         }), 200
 
@@ -1002,7 +497,7 @@ def get_section_C(department, user_id):
     try:
         collection = department_collections.get(department)
         if collection is not None:
-            user = collection.find_one({"_id": user_id})
+            user = collection.find_one({"_id": user_id}, {"C": 1})
             if user:
                 return jsonify(user.get("C"))
             return jsonify({"error": "User not found"}), 404
@@ -1017,58 +512,20 @@ def handle_post_D(department, user_id):
         if not data:
             return jsonify({"error": "Invalid JSON data"}), 400
 
-        # Initialize default structure for section D if not present
-        if 'D' not in data:
-            data['D'] = {}
-
-        # Initialize with default values
-        default_data = {
-            'portfolioType': '',
-            'selfAwardedMarks': 0,
-            'deanMarks': 0,
-            'hodMarks': 0,
-            'isMarkHOD': False,
-            'isMarkDean': False,
-            'isAdministrativeRole': False,
-            'administrativeRole': '',
-            'adminSelfAwardedMarks': 0,
-            'directorMarks': 0,
-            'adminDeanMarks': 0,
-            'instituteLevelPortfolio': '',
-            'departmentLevelPortfolio': '',
-            'total_marks': 0,
-            'isFirstTime': True
-        }
-
-        # Merge incoming data with default values
-        for field, default_value in default_data.items():
-            if field not in data['D']:
-                data['D'][field] = default_value
+        # Fill missing fields with the section D defaults
+        data['D'] = merge_section('D', data.get('D') or {})
 
         # Update document with merged data
         collection = department_collections.get(department)
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "D": data['D'],
-                "isUpdated": True
-            }},
-            upsert=True
-        )
-
-        # Update grand total
-        updated_doc = collection.find_one({"_id": user_id})
-        grand_total = calculate_grand_total(updated_doc)
-        collection.update_one(
-            {"_id": user_id},
-            {"$set": {"grand_total": grand_total}}
-        )
+        # Store section D and recompute the grand total in one write
+        grand_total = save_section(collection, user_id, "D", data['D'],
+                                   on_change=department_summary.recorder(department))
 
         return jsonify({
-            "message": "Data updated successfully" if result.matched_count > 0 else "Data inserted successfully",
+            "message": "Data updated successfully",
             "grand_total": grand_total
         }), 200
 
@@ -1080,7 +537,7 @@ def get_section_D(department, user_id):
     try:
         collection = department_collections.get(department)
         if collection is not None:
-            user = collection.find_one({"_id": user_id})
+            user = collection.find_one({"_id": user_id}, {"D": 1})
             if user:
                 return jsonify(user.get("D"))
             return jsonify({"error": "User not found"}), 404
@@ -1094,7 +551,7 @@ def get_grand_total(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        user_doc = collection.find_one({"_id": user_id})
+        user_doc = collection.find_one({"_id": user_id}, GRAND_TOTAL_FIELDS)
         if not user_doc:
             return jsonify({"error": "User not found"}), 404
 
@@ -1115,7 +572,7 @@ def get_form_status(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        user_doc = collection.find_one({"_id": user_id})
+        user_doc = collection.find_one({"_id": user_id}, {"status": 1})
         if not user_doc:
             return jsonify({"error": "User not found"}), 404
 
@@ -1127,420 +584,123 @@ def get_form_status(department, user_id):
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    
-def fill_template_document(data, user_id, department):
+
+# Fields the combined read may return, with the value used when the document lacks them
+SECTION_READ_DEFAULTS = {
+    "A": None,
+    "B": None,
+    "C": None,
+    "D": None,
+    "E": {
+        'total_marks': 0,
+        'bullet_points': [],
+        'verified_marks': 0,
+        'isVerified': False
+    },
+    "status": "pending",
+    "grand_total": 0,
+    "grand_verified_marks": 0,
+    "isUpdated": False
+}
+
+@app.route('/<department>/<user_id>/sections', methods=['GET'])
+def get_sections(department, user_id):
+    """Return several sections and workflow fields in one projected read, e.g. ?fields=A,C,status"""
     try:
-        # Get user details directly from MongoDB
-        user_data = db_users.find_one({"_id": user_id})
-        if not user_data:
-            raise Exception("User not found")
+        collection = department_collections.get(department)
+        if collection is None:
+            return jsonify({"error": "Invalid department"}), 400
 
-        # Load the template document
-        doc = Document("Faculty Self Appraisal Scheme -PCCoE-24-25.docx")
-        
-        # Initial placeholders with user details
-        placeholders = {
-            '{faculty_name}': user_data.get('name', ''),
-            '{faculty_designation}': user_data.get('role', ''),
-            '{faculty_department}': user_data.get('dept', ''),
-        }
-        role = user_data.get('role', '')
-        desg = user_data.get('desg', '')
-        # Add all other placeholders using the data parameter
-        
-            # Rest of your existing code...
-        section_a_marks = data.get('A', {}).get('total_marks', 0)
-        Prof_A = 0
-        Assoc_A = 0
-        Assis_A = 0
-        Prof_A_total_marks = 0
-        Assoc_A_total_marks = 0
-        Assis_A_total_marks = 0
-        if role == 'Assistant Professor':
-            section_a_marks = section_a_marks / 1.0
-            Assis_A =  section_a_marks
-            Assis_A_total_marks = (data.get('A', {}).get('total_marks', 0))
-            
-        if role == 'Associate Professor':
-            section_a_marks = section_a_marks / 0.818
-            Assoc_A =  section_a_marks
-            Assoc_A_total_marks = (data.get('A', {}).get('total_marks', 0))
-        elif role == 'Professor':
-            section_a_marks = section_a_marks / 0.68        
-            Prof_A =  section_a_marks
-            Prof_A_total_marks = (data.get('A', {}).get('total_marks', 0))
-
-        #adding all the marks in the B section and store in the variable
-        b_total_verified = data['B']['1']['journalPapers']['verified_marks'] + data['B']['2']['conferencePapers']['verified_marks'] + data['B']['3']['bookChapters']['verified_marks'] + data['B']['4']['books']['verified_marks'] + data['B']['5']['citations']['verified_marks'] + data['B']['6']['copyrightIndividual']['verified_marks'] + data['B']['7']['copyrightInstitute']['verified_marks'] + data['B']['8']['patentIndividual']['verified_marks'] + data['B']['9']['patentInstitute']['verified_marks'] + data['B']['10']['researchGrants']['verified_marks'] + data['B']['11']['trainingPrograms']['verified_marks'] + data['B']['12']['nonResearchGrants']['verified_marks'] + data['B']['13']['productDevelopment']['verified_marks'] + data['B']['14']['startup']['verified_marks'] + data['B']['15']['awardsAndFellowships']['verified_marks'] + data['B']['16']['industryInteraction']['verified_marks'] + data['B']['17']['internshipPlacement']['verified_marks']
-        # b_total = data['B']['1']['journalPapers']['total_marks'] + data['B']['2']['conferencePapers']['total_marks'] + data['B']['3']['bookChapters']['total_marks'] + data['B']['4']['books']['total_marks'] + data['B']['5']['citations']['total_marks'] + data['B']['6']['copyrightIndividual']['total_marks'] + data['B']['7']['copyrightInstitute']['total_marks'] + data['B']['8']['patentIndividual']['total_marks'] + data['B']['9']['patentInstitute']['total_marks'] + data['B']['10']['researchGrants']['total_marks'] + data['B']['11']['trainingPrograms']['total_marks'] + data['B']['12']['nonResearchGrants']['total_marks'] + data['B']['13']['productDevelopment']['total_marks'] + data['B']['14']['startup']['total_marks']
-        b_total = data['B']['1']['journalPapers']['marks'] + data['B']['2']['conferencePapers']['marks'] + data['B']['3']['bookChapters']['marks'] + data['B']['4']['books']['marks'] + data['B']['5']['citations']['marks'] + data['B']['6']['copyrightIndividual']['marks'] + data['B']['7']['copyrightInstitute']['marks'] + data['B']['8']['patentIndividual']['marks'] + data['B']['9']['patentInstitute']['marks'] + data['B']['10']['researchGrants']['marks'] + data['B']['11']['trainingPrograms']['marks'] + data['B']['12']['nonResearchGrants']['marks'] + data['B']['13']['productDevelopment']['marks'] + data['B']['14']['startup']['marks'] + data['B']['15']['awardsAndFellowships']['marks'] + data['B']['16']['industryInteraction']['marks'] + data['B']['17']['internshipPlacement']['marks']
-        print(f'#############{str(b_total)}##############{str(b_total_verified)}')
-        Prof_B = 0
-        Assoc_B = 0
-        Assis_B = 0
-        
-        Prof_B_total_marks = 0
-        Assoc_B_total_marks = 0
-        Assis_B_total_marks = 0
-        
-        Prof_B_total_verified = 0
-        Assoc_B_total_verified = 0
-        Assis_B_total_verified = 0
-        
-        if role == 'Assistant Professor':
-            Assis_B =  b_total
-            Assis_B_total_marks = data['B']['total_marks']
-            Assis_B_total_verified = data['B']['final_verified_marks']
-        if role == 'Associate Professor':
-            Assoc_B =  b_total
-            Assoc_B_total_marks = data['B']['total_marks']
-            Assoc_B_total_verified = data['B']['final_verified_marks']
-        elif role == 'Professor':
-            Prof_B =  b_total
-            Prof_B_total_marks = data['B']['total_marks']
-            Prof_B_total_verified = data['B']['final_verified_marks']
-            
-        #get the verifier name from the verifier id
-        verifier_id = data['B']['verifier_id']
-        verifier_name = 'Not Verified Yet'
-        if verifier_id != '':
-            verifier_name = db_users.find_one({"_id": verifier_id})['name']
-        
-        Prof_qualification_marks = 0
-        qualification_marks  = 0
-        if role == 'Assistant Professor':
-            qualification_marks =  data['C']['1']['qualification']['marks']
+        requested = request.args.get('fields')
+        if requested:
+            fields = [field.strip() for field in requested.split(',') if field.strip()]
         else:
-            Prof_qualification_marks =  data['C']['1']['qualification']['marks']
-            
-        c_total = data['C']['1']['qualification']['marks'] + data['C']['2']['trainingAttended']['marks'] + data['C']['3']['trainingOrganized']['marks'] + data['C']['4']['phdGuided']['marks']
-        Prof_C = 0
-        Assoc_C = 0
-        Assis_C = 0
-        Prof_C_total_marks = 0
-        Assoc_C_total_marks = 0
-        Assis_C_total_marks = 0
-        if role == 'Assistant Professor':
-            Assis_C =  c_total
-            Assis_C_total_marks = data['C']['total_marks']
-        if role == 'Associate Professor':
-            Assoc_C =  c_total
-            Assoc_C_total_marks = data['C']['total_marks']
-        elif role == 'Professor':
-            Prof_C =  c_total
-            Prof_C_total_marks = data['C']['total_marks']
-        # Placeholders and their corresponding values from different sections
-        self_awarded_marks = data['D']['selfAwardedMarks']
-        hod_marks = data['D']['hodMarks']
-        total_marks_D= data['D']['total_marks']
-        assTotalMarks = 0
-        assDeanHODMarks = 0
-        assDeanDeanMarks = 0
-        sumMarks_hod_dean = 0
-        assSelfawardedmarks = 0
-        if desg == 'Associate Dean' : 
-            self_awarded_marks = 0
-            total_marks_D = 0
-            hod_marks = 0
-            assDeanHODMarks = data['D']['hodMarks']
-            assDeanDeanMarks = data['D']['deanMarks']
-            sumMarks_hod_dean = (data['D']['hodMarks'] + data['D']['deanMarks']) / 2
-            assSelfawardedmarks = data['D']['selfAwardedMarks']
-            assTotalMarks = assSelfawardedmarks + sumMarks_hod_dean
-        
-        extraMarks = 0
-        if desg == 'Dean' or desg == 'HOD':
-            extraMarks = 100
-        if desg == 'Associate Dean':
-            extraMarks = 50 
-        
-        print('-----------before placeholders update-----------')
-        
-        placeholders.update({
-            # Section A placeholders
-            '{result_analysis_marks}': str(round(data['A']['1']['total_marks'], 2)),
-            '{course_outcome_marks}': str(round(data['A']['2']['total_marks'], 2)),
-            '{elearning_content_marks}': str(round(data['A']['3']['total_marks'], 2)),
-            '{academic_engagement_marks}': str(round(data['A']['4']['total_marks'], 2)),
-            '{teaching_load_marks}': str(round(data['A']['5']['total_marks'], 2)),
-            '{projects_guided_marks}': str(round(data['A']['6']['total_marks'], 2)),
-            '{student_feedback_marks}': str(round(data['A']['7']['total_marks'], 2)),
-            '{ptg_meetings_marks}': str(round(data['A']['8']['total_marks'], 2)),
-            '{section_a_total}': str(round(section_a_marks)),
-            '{Prof_A}': str(round(Prof_A)),
-            '{Assoc_A}': str(round(Assoc_A)),
-            '{Assis_A}': str(round(Assis_A)),
-            '{Prof_A_total_marks}': str(round(Prof_A_total_marks)),
-            '{Assoc_A_total_marks}': str(round(Assoc_A_total_marks)),
-            '{Assis_A_total_marks}': str(round(Assis_A_total_marks)),
-            
-            # Section B detailed placeholders - Updated to include verification marks
-            # 1. Journal Papers
-            
-            
-            
-            '{sci_papers_marks}': str(data['B']['1']['journalPapers']['sciCount'] * 100),
-            '{sci_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_sciMarks']),
-            
-            '{esci_papers_marks}': str(data['B']['1']['journalPapers']['esciCount'] * 50),
-            '{esci_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_esciMarks']),
-            
-            '{scopus_papers_marks}': str(data['B']['1']['journalPapers']['scopusCount'] * 50),
-            '{scopus_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_scopusMarks']),
-            
-            '{ugc_papers_marks}': str(data['B']['1']['journalPapers']['ugcCareCount'] * 10),
-            '{ugc_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_ugcCareMarks']),
-            
-            '{other_papers_marks}': str(data['B']['1']['journalPapers']['otherCount'] * 5),
-            '{other_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_otherMarks']),
-            '{papers_published_marks}': str(data['B']['1']['journalPapers']['verified_marks']),
-            
-            # 2. Conferences
-            
-            '{scopus_conf_marks}': str(data['B']['2']['conferencePapers']['scopusWosCount'] * 30),
-            '{scopus_conf_verified_marks}': str(data['B']['2']['conferencePapers']['ver_scopusWosMarks']),
-            
-            '{other_conf_marks}': str(data['B']['2']['conferencePapers']['otherCount'] * 5),
-            '{other_conf_verified_marks}': str(data['B']['2']['conferencePapers']['ver_otherMarks']),
-            '{conferences_marks}': str(data['B']['2']['conferencePapers']['verified_marks']),
-            
-            # 3. Book Chapters
-            
-            '{scopus_chapter_marks}': str(data['B']['3']['bookChapters']['scopusWosCount'] * 30),
-            '{scopus_chapter_verified_marks}': str(data['B']['3']['bookChapters']['ver_scopusWosMarks']),
-            
-            '{other_chapter_marks}': str(data['B']['3']['bookChapters']['otherCount'] * 5),
-            '{other_chapter_verified_marks}': str(data['B']['3']['bookChapters']['ver_otherMarks']),
-            '{book_chapters_marks}': str(data['B']['3']['bookChapters']['verified_marks']),
-            
-            # 4. Books
-            
-            '{scopus_books_marks}': str(data['B']['4']['books']['scopusWosCount'] * 100),
-            '{scopus_books_verified_marks}': str(data['B']['4']['books']['ver_scopusWosMarks']),
-            
-            '{national_books_marks}': str(data['B']['4']['books']['nonIndexedCount'] * 30),
-            '{national_books_verified_marks}': str(data['B']['4']['books']['ver_nonIndexedMarks']),
-            
-            '{local_books_marks}': str(data['B']['4']['books']['localCount'] * 10),
-            '{local_books_verified_marks}': str(data['B']['4']['books']['ver_localMarks']),
-            '{books_marks}': str(data['B']['4']['books']['verified_marks']),
-            
-            # 5. Citations
-            '{wos_citations_marks}': str(math.floor(data['B']['5']['citations']['webOfScienceCount'] / 3) * 3),
-            '{wos_citations_verified_marks}': str(data['B']['5']['citations']['ver_webOfScienceMarks']),
-            
-            '{scopus_citations_marks}': str(math.floor(data['B']['5']['citations']['scopusCount'] / 3) * 3),
-            '{scopus_citations_verified_marks}': str(data['B']['5']['citations']['ver_scopusMarks']),
-            
-            '{google_citations_marks}': str(math.floor(data['B']['5']['citations']['googleScholarCount'] / 3) * 1),
-            '{google_citations_verified_marks}': str(data['B']['5']['citations']['ver_googleScholarMarks']),
-            '{citations_marks}': str(data['B']['5']['citations']['verified_marks']),
-            
-            # 6. Copyright Individual
-            
-            '{individual_copyright_registered_marks}': str(data['B']['6']['copyrightIndividual']['registeredCount'] * 20),
-            '{individual_copyright_registered_verified_marks}': str(data['B']['6']['copyrightIndividual']['ver_registeredMarks']),
-            
-            '{individual_copyright_granted_marks}': str(data['B']['6']['copyrightIndividual']['grantedCount'] * 50),
-            '{individual_copyright_granted_verified_marks}': str(data['B']['6']['copyrightIndividual']['ver_grantedMarks']),
-            '{individual_copyright_marks}': str(data['B']['6']['copyrightIndividual']['verified_marks']),
-            
-            # 7. Copyright Institute
-            
-            '{institute_copyright_registered_marks}': str(data['B']['7']['copyrightInstitute']['registeredCount'] * 40),
-            '{institute_copyright_registered_verified_marks}': str(data['B']['7']['copyrightInstitute']['ver_registeredMarks']),
-            
-            '{institute_copyright_granted_marks}': str(data['B']['7']['copyrightInstitute']['grantedCount'] * 100),
-            '{institute_copyright_granted_verified_marks}': str(data['B']['7']['copyrightInstitute']['ver_grantedMarks']),
-            '{institute_copyright_marks}': str(data['B']['7']['copyrightInstitute']['verified_marks']),
-            
-            # 8-9. Patents (Individual and Institute)
-            
-            '{individual_patent_registered_marks}': str(data['B']['8']['patentIndividual']['registeredCount'] * 20),
-            '{individual_patent_registered_verified_marks}': str(data['B']['8']['patentIndividual']['ver_registeredMarks']),
-            
-            '{individual_patent_published_marks}': str(data['B']['8']['patentIndividual']['publishedCount'] * 30),
-            '{individual_patent_published_verified_marks}': str(data['B']['8']['patentIndividual']['ver_publishedMarks']),
-            
-            '{individual_granted_marks}': str(data['B']['8']['patentIndividual']['grantedCount'] * 50),
-            '{individual_granted_verified_marks}': str(data['B']['8']['patentIndividual']['ver_grantedMarks']),
-            
-            '{individual_commercialized_marks}': str(data['B']['8']['patentIndividual']['commercializedCount'] * 100),
-            '{individual_commercialized_verified_marks}': str(data['B']['8']['patentIndividual']['ver_commercializedMarks']),
-            '{individual_patent_marks}': str(data['B']['8']['patentIndividual']['verified_marks']),
-            
-            #9
-            
-            '{college_patent_registered_marks}': str(data['B']['9']['patentInstitute']['registeredCount'] * 40),
-            '{college_patent_registered_verified_marks}': str(data['B']['9']['patentInstitute']['ver_registeredMarks']),
-            
-            '{college_patent_published_marks}': str(data['B']['9']['patentInstitute']['publishedCount'] * 60),
-            '{college_patent_published_verified_marks}': str(data['B']['9']['patentInstitute']['ver_publishedMarks']),
-            
-            '{college_granted_marks}': str(data['B']['9']['patentInstitute']['grantedCount'] * 100),
-            '{college_granted_verified_marks}': str(data['B']['9']['patentInstitute']['ver_grantedMarks']),
-            
-            '{college_commercialized_marks}': str(data['B']['9']['patentInstitute']['commercializedCount'] * 200),
-            '{college_commercialized_verified_marks}': str(data['B']['9']['patentInstitute']['ver_commercializedMarks']),
-            '{college_patent_marks}': str(data['B']['9']['patentInstitute']['verified_marks']),
-            '{patents_marks}': str(data['B']['8']['patentIndividual']['verified_marks'] + data['B']['9']['patentInstitute']['verified_marks']),
-            
-            # 10. Research Grants
-            '{research_grants_amount}': str(data['B']['10']['researchGrants']['amount']),
-            '{research_grants_marks}': str(math.floor(data['B']['10']['researchGrants']['amount'] / 200000) * 10),
-            '{research_grants_verified_marks}': str(data['B']['10']['researchGrants']['ver_amountMarks']),
-            
-            # 11. Training Revenue
-            '{training_amount}': str(data['B']['11']['trainingPrograms']['amount']),
-            '{training_marks}': str(math.floor(data['B']['11']['trainingPrograms']['amount'] / 10000) * 5),
-            '{training_verified_marks}': str(data['B']['11']['trainingPrograms']['ver_amountMarks']),
-            
-            # 12. Non-Research Grants
-            '{nonresearch_grants_amount}': str(data['B']['12']['nonResearchGrants']['amount']),
-            '{nonresearch_grants_marks}': str(math.floor(data['B']['12']['nonResearchGrants']['amount'] / 10000) * 5),
-            '{nonresearch_grants_verified_marks}': str(data['B']['12']['nonResearchGrants']['ver_amountMarks']),
-            
-            # 13. Products
-            
-            '{commercialized_products_marks}': str(data['B']['13']['productDevelopment']['commercializedCount'] * 100),
-            '{commercialized_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_commercializedMarks']),
-            
-            '{developed_products_marks}': str(data['B']['13']['productDevelopment']['developedCount'] * 40),
-            '{developed_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_developedMarks']),
-            
-            '{poc_products_marks}': str(data['B']['13']['productDevelopment']['pocCount'] * 10),
-            '{poc_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_pocMarks']),
-            '{products_marks}': str(data['B']['13']['productDevelopment']['verified_marks']),
-            
-            # 14. Startup PCCOE
-            '{startup_revenue_pccoe_amount}': str(data['B']['14']['startup']['revenueFiftyKCount']),
-            '{startup_revenue_pccoe_marks}': str(data['B']['14']['startup']['revenueFiftyKCount'] * 100),
-            '{startup_revenue_pccoe_verified_marks}': str(data['B']['14']['startup']['ver_revenueFiftyKMarks']),
-            '{startup_funding_pccoe_amount}': str(data['B']['14']['startup']['fundsFiveLakhsCount']),
-            '{startup_funding_pccoe_marks}': str(data['B']['14']['startup']['fundsFiveLakhsCount'] * 100),
-            '{startup_funding_pccoe_verified_marks}': str(data['B']['14']['startup']['ver_fundsFiveLakhsMarks']),
-            
-            '{startup_products_marks}': str(data['B']['14']['startup']['productsCount'] * 40),
-            '{startup_products_verified_marks}': str(data['B']['14']['startup']['ver_productsMarks']),
-            
-            '{startup_poc_marks}': str(data['B']['14']['startup']['pocCount'] * 10),
-            '{startup_poc_verified_marks}': str(data['B']['14']['startup']['ver_pocMarks']),
-            
-            '{startup_registered_marks}': str(data['B']['14']['startup']['registeredCount'] * 5),
-            '{startup_registered_verified_marks}': str(data['B']['14']['startup']['ver_registeredMarks']),
-            '{startup_pccoe_marks}': str(data['B']['14']['startup']['verified_marks']),
-            
-            # 15. Awards
-            
-            '{international_awards_marks}': str(data['B']['15']['awardsAndFellowships']['internationalAwardsCount'] * 30),
-            '{international_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_internationalAwardsMarks']),
-            
-            '{government_awards_marks}': str(data['B']['15']['awardsAndFellowships']['governmentAwardsCount'] * 20),
-            '{government_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_governmentAwardsMarks']),
-            
-            '{national_awards_marks}': str(data['B']['15']['awardsAndFellowships']['nationalAwardsCount'] * 5),
-            '{national_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_nationalAwardsMarks']),
-            
-            '{international_fellowship_marks}': str(data['B']['15']['awardsAndFellowships']['internationalFellowshipsCount'] * 50),
-            '{international_fellowship_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_internationalFellowshipsMarks']),
-            
-            '{national_fellowship_marks}': str(data['B']['15']['awardsAndFellowships']['nationalFellowshipsCount'] * 30),
-            '{national_fellowship_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_nationalFellowshipsMarks']),
-            '{awards_marks}': str(data['B']['15']['awardsAndFellowships']['verified_marks']),
-            
-            # 16. Industry Interaction
-            
-            '{active_mou_marks}': str(data['B']['16']['industryInteraction']['moUsCount'] * 10),
-            '{active_mou_verified_marks}': str(data['B']['16']['industryInteraction']['ver_moUsMarks']),
-            
-            '{lab_development_marks}': str(data['B']['16']['industryInteraction']['collaborationCount'] * 20),
-            '{lab_development_verified_marks}': str(data['B']['16']['industryInteraction']['ver_collaborationMarks']),
-            '{industry_interaction_marks}': str(data['B']['16']['industryInteraction']['verified_marks']),
-            
-            # 17. Industry Association
-            
-            '{internships_placements_marks}': str(data['B']['17']['internshipPlacement']['offersCount'] * 10),
-            '{internships_placements_verified_marks}': str(data['B']['17']['internshipPlacement']['ver_offersMarks']),
-            '{industry_association_marks}': str(data['B']['17']['internshipPlacement']['verified_marks']),
-            
-            # Total Section B
-            '{B_total_marks}': str(b_total),
-            '{section_b_total}': str(b_total_verified),
-            '{Prof_B}': str(Prof_B),
-            '{Assoc_B}': str(Assoc_B),
-            '{Assis_B}': str(Assis_B),
-            '{Prof_B_total_marks}': str(Prof_B_total_marks),
-            '{Assoc_B_total_marks}': str(Assoc_B_total_marks),
-            '{Assis_B_total_marks}': str(Assis_B_total_marks),
-            '{Prof_B_total_verified}': str(Prof_B_total_verified),
-            '{Assoc_B_total_verified}': str(Assoc_B_total_verified),
-            '{Assis_B_total_verified}': str(Assis_B_total_verified),
-            '{verf_committee_name}': verifier_name,
-            
-            # Section C placeholders
-            '{Prof_qualification_marks}': str(Prof_qualification_marks),
-            '{qualification_marks}': str(qualification_marks),
-            '{training_attended_marks}': str(data['C']['2']['trainingAttended']['marks']),
-            '{training_organized_marks}': str(data['C']['3']['trainingOrganized']['marks']),
-            '{phd_guided_marks}': str(data['C']['4']['phdGuided']['marks']),
-            '{section_c_total}': str(c_total),
-            '{Prof_C}': str(Prof_C),
-            '{Assoc_C}': str(Assoc_C),
-            '{Assis_C}': str(Assis_C),
-            '{Prof_C_total_marks}': str(Prof_C_total_marks),
-            '{Assoc_C_total_marks}': str(Assoc_C_total_marks),
-            '{Assis_C_total_marks}': str(Assis_C_total_marks),
-            
-            # New section D (Portfolio details)
-            '{Department_portfolio}': "Not Applicable" if not data['D'].get('departmentLevelPortfolio') else data['D']['departmentLevelPortfolio'],
-            '{Institute_Portfolio}': "Not Applicable" if not data['D'].get('instituteLevelPortfolio') else data['D']['instituteLevelPortfolio'],
-            '{self_awarded_marks}': str(self_awarded_marks),
-            '{hodMarks}': str(hod_marks),
-            '{section_d_total}': str(total_marks_D),
-            '{assDeanDeanMarks}' : str(assDeanDeanMarks),
-            '{assDeanHODMarks}' : str(assDeanHODMarks),
-            '{assTotalMarks}' : str(assTotalMarks),
-            '{assSelfawardedmarks}' : str(assSelfawardedmarks),
-            '{sumMarks_hod_dean}' : str(sumMarks_hod_dean),
-            
-            
-            # Section E placeholders
-            # '{section_E_total}': str(data['E']['total_marks']),
-            '{section_E_total}': str(data.get('E', {}).get('total_marks', 0)),
-            '{extra_marks}' : str(extraMarks),
-            # Grand total
-            '{total_for_C}' : str(round(data['C']['total_marks'])),
-            '{total_for_B}' : str(round(data['B']['total_marks'])),
-            '{total_for_A}' : str(round(data['A']['total_marks'])),
-            '{total_for_D}' : str(round(data['D']['total_marks'])),
-            '{total_for_B_verified}' : str(round(data['B']['final_verified_marks'])),
-            '{grand_total}': str(min(round(data['grand_total']['grand_total'] + extraMarks),1000)),
-            '{total_for_A_verified}' : str(round(data['A_verified_marks'])),
-            '{total_for_C_verified}' : str(round(data['C_verified_marks'])),
-            '{total_for_D_verified}' : str(round(data['D_verified_marks'])),
-            '{total_for_E_verified}' : str(round(data['E_verified_marks'])),
-            '{grand_verified_marks}': str(min(round(data['grand_verified_marks']+extraMarks),1000)),
-        })
-        
-        print('-----------after placeholders update-----------')
-        # Replace placeholders in paragraphs and tables
-        for paragraph in doc.paragraphs:
-            for placeholder, value in placeholders.items():
-                if placeholder in paragraph.text:
-                    paragraph.text = paragraph.text.replace(placeholder, value)
-        
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        for placeholder, value in placeholders.items():
-                            if placeholder in paragraph.text:
-                                paragraph.text = paragraph.text.replace(placeholder, value)
-        
-        return doc
+            fields = list(SECTION_READ_DEFAULTS)
+
+        unknown = [field for field in fields if field not in SECTION_READ_DEFAULTS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+        # Only the requested subtrees leave Mongo
+        user_doc = collection.find_one({"_id": user_id}, {field: 1 for field in fields})
+        if not user_doc:
+            return jsonify({"error": "User not found"}), 404
+
+        return jsonify({
+            field: user_doc.get(field, SECTION_READ_DEFAULTS[field]) for field in fields
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/<department>/<user_id>/<section>', methods=['PATCH'])
+def patch_section_fields(department, user_id, section):
+    """
+    Update individual fields of a section, e.g. {"1.journalPapers.sciCount": 2, "total_marks": 140}.
+
+    Paths are relative to the section and must exist in the section layout; verification
+    fields are rejected. The marks of any touched Section B category, Section B's
+    total_marks and the grand total are recomputed in the same write.
+    """
+    try:
+        if section not in SECTION_SAVE_OPTIONS:
+            return jsonify({"error": "Invalid section"}), 400
+
+        data = request.get_json()
+        if not data or not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON data"}), 400
+
+        collection = department_collections.get(department)
+        if collection is None:
+            return jsonify({"error": "Invalid department"}), 400
+
+        updates, errors = resolve_patch_paths(section, data)
+        if errors:
+            return jsonify({"error": "Invalid fields", "details": errors}), 400
+
+        result = patch_section(collection, user_id, section, updates, **SECTION_SAVE_OPTIONS[section],
+                               on_change=department_summary.recorder(department))
+        if result is None:
+            return jsonify({"error": "User not found"}), 404
+
+        grand_total, marks = result
+        return jsonify({
+            "message": "Data updated successfully",
+            "updated_fields": len(updates),
+            "marks": marks,
+            "grand_total": grand_total
+        }), 200
 
     except Exception as e:
-        raise Exception(f"Error in fill_template_document: {str(e)}")
+        print(f"Error patching section {section}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+def report_placeholders_for(data, user_id, users=None):
+    """
+    Look up the faculty member and the Section B verifier, then compute the report placeholders.
+
+    users ({_id: users document}), when given, answers the lookups without a query.
+    """
+    def find_user(_id):
+        if users is not None:
+            return users.get(_id)
+        return db_users.find_one({"_id": _id})
+
+    user_data = find_user(user_id)
+    if not user_data:
+        raise Exception("User not found")
+
+    #get the verifier name from the verifier id
+    verifier_id = data['B']['verifier_id']
+    verifier_name = 'Not Verified Yet'
+    if verifier_id != '':
+        verifier_name = find_user(verifier_id)['name']
+
+    return report_placeholders(data, user_data, verifier_name)
+
+
+REPORT_TEMPLATE = "Faculty Self Appraisal Scheme -PCCoE-24-25.docx"
+
 
 # @app.route('/<department>/<user_id>/generate-doc', methods=['GET'])
 # def generate_filled_document(department, user_id):
@@ -1593,15 +753,115 @@ def fill_template_document(data, user_id, department):
 #                 pass
 #         return jsonify({"error": str(e)}), 500
     
-from docx2pdf import convert
-import tempfile
+# "reportlab" renders the PDF in-process; "docx" fills the Word template and converts it
+# with docx2pdf, which needs Windows and Microsoft Word
+REPORT_RENDERER = os.getenv("REPORT_RENDERER", "docx" if os.name == 'nt' else "reportlab")
+
+
+def render_docx_pdf(placeholders, user_id):
+    """Fill the Word template, convert it to PDF through Word and return the PDF bytes"""
+    import tempfile
+    import pythoncom
+    from docx2pdf import convert
+    from docx_template import get_template
+
+    # Initialize COM for PDF generation
+    pythoncom.CoInitialize()
+    try:
+        # The template is parsed once per process; each report fills a copy of it
+        doc = get_template(REPORT_TEMPLATE).fill(placeholders)
+
+        # Word converts files, not streams: use a private directory per render, removed on return
+        with tempfile.TemporaryDirectory(prefix="appraisal_") as temp_dir:
+            temp_docx = os.path.join(temp_dir, "report.docx")
+            output_path = os.path.join(temp_dir, "report.pdf")
+            doc.save(temp_docx)
+            convert(temp_docx, output_path)
+            with open(output_path, 'rb') as pdf_file:
+                return pdf_file.read()
+    finally:
+        pythoncom.CoUninitialize()
+
+
+def render_report_pdf(placeholders, user_id):
+    """Render the appraisal report with the configured REPORT_RENDERER and return the PDF bytes"""
+    if REPORT_RENDERER == 'docx':
+        return render_docx_pdf(placeholders, user_id)
+    from report_pdf import render_appraisal_pdf
+    return render_appraisal_pdf(placeholders)
+
+
+def produce_report(collection, department, user_id, user_doc):
+    """
+    Return (GridFS file id, 'hit' or 'miss', PDF bytes or None) for a faculty document.
+
+    Renders only when no report with the same content hash is stored; the bytes are
+    returned only when this call rendered them.
+    """
+    # Every value printed on the report; the cache key and the render both use them
+    data = build_report_data(user_doc)
+    placeholders = report_placeholders_for(data, user_id)
+    report_hash = report_cache_key(placeholders, REPORT_RENDERER)
+    existing_pdf = user_doc.get('appraisal_pdf') or {}
+
+    if existing_pdf.get('report_hash') == report_hash:
+        file_id = ObjectId(existing_pdf['file_id'])
+        # The stored file may have been removed; fall back to the shared cache
+        if fs.exists(file_id):
+            return file_id, 'hit', None
+
+    safe_filename = secure_filename(f"filled_appraisal_{user_id}.pdf")
+    file_id, pdf_bytes, rendered = report_cache.get_or_render(
+        report_hash,
+        lambda: render_report_pdf(placeholders, user_id),
+        filename=safe_filename,
+        user_id=user_id,
+        department=department,
+        content_type='application/pdf'
+    )
+
+    record_report(collection, department, user_id, file_id, report_hash)
+    return file_id, 'miss' if rendered else 'hit', pdf_bytes
+
+
+def record_report(collection, department, user_id, file_id, report_hash):
+    """Point the faculty document at its report, reset isUpdated flag and record the version"""
+    collection.update_one(
+        {"_id": user_id},
+        {
+            "$set": {
+                "appraisal_pdf": {
+                    "file_id": str(file_id),
+                    "filename": secure_filename(f"filled_appraisal_{user_id}.pdf"),
+                    "upload_date": datetime.now(),
+                    "report_hash": report_hash
+                },
+                "isUpdated": False
+            }
+        }
+    )
+    report_retention.record(department, user_id, file_id, report_hash)
+
+
+def run_report_job(department, user_id):
+    """Produce one report for the job queue and return its GridFS file id"""
+    collection = department_collections.get(department)
+    if collection is None:
+        raise Exception("Invalid department")
+    user_doc = collection.find_one({"_id": user_id})
+    if not user_doc:
+        raise Exception("User data not found")
+    file_id, _, _ = produce_report(collection, department, user_id, user_doc)
+    return file_id
+
+
+report_jobs = ReportJobQueue(mongo_fdw.db.report_jobs, run_report_job)
+report_prerender.attach(report_jobs)
 
 
 @app.route('/<department>/<user_id>/generate-doc', methods=['GET'])
 def generate_document(department, user_id):
     print(user_id)
-    temp_docx = None
-    output_path = None
     try:
         collection = department_collections.get(department)
         if collection is None:
@@ -1611,143 +871,117 @@ def generate_document(department, user_id):
         if not user_doc:
             return jsonify({"error": "User data not found"}), 404
 
-        # Check if document needs regeneration
-        is_updated = user_doc.get('isUpdated', True)  # Default to True for backward compatibility
-        existing_pdf = user_doc.get('appraisal_pdf')
+        file_id, cache_status, pdf_bytes = produce_report(collection, department, user_id, user_doc)
 
-        if not is_updated and existing_pdf:
-            # Return existing PDF from GridFS
+        # Stream the stored report, or send a fresh render from memory rather than reading it
+        # back; a browser that already has this version gets a 304
+        response = gridfs_response(
+            fs.get(file_id),
+            secure_filename(f"filled_appraisal_{user_id}.pdf"),
+            mimetype='application/pdf',
+            data=pdf_bytes
+        )
+        response.headers['X-Report-Cache'] = cache_status
+        return response
+
+    except Exception as e:
+        print(str(e))
+        return jsonify({"error": str(e)}), 500
+
+def export_entries(departments, status):
+    """
+    Yield (archive name, PDF bytes or GridFS file) for the faculty reports of each department.
+
+    Departments are read one at a time as the archive reaches them: cached reports are
+    streamed from GridFS, then the department's missing reports are rendered.
+    """
+    from report_export import (REPORT_EXPORT_WORKERS, EXPORT_WINDOW_PER_WORKER, render_as_completed,
+                               render_pool, render_reportlab_task, word_pool)
+
+    if REPORT_RENDERER == 'docx':
+        # Word automation cannot run in parallel; convert one report at a time
+        executor, render, window = word_pool(), (lambda task: render_docx_pdf(*task)), 1
+    else:
+        executor, render = render_pool(), render_reportlab_task
+        window = REPORT_EXPORT_WORKERS * (1 + EXPORT_WINDOW_PER_WORKER)
+
+    errors = []
+    for department in departments:
+        collection = department_collections[department]
+        query = {"status": {"$exists": True}} if status == 'all' else {"status": status}
+        user_docs = list(collection.find(query))
+
+        # One users query for every faculty member and verifier of the department
+        user_ids = {user_doc["_id"] for user_doc in user_docs}
+        user_ids.update(user_doc.get('B', {}).get('verifier_id') or '' for user_doc in user_docs)
+        users = {user["_id"]: user for user in db_users.find({"_id": {"$in": list(user_ids - {''})}})}
+
+        prepared = []
+        for user_doc in user_docs:
             try:
-                file_id = ObjectId(existing_pdf['file_id'])
-                grid_out = fs.get(file_id)
-                
-                return send_file(
-                    io.BytesIO(grid_out.read()),
-                    as_attachment=True,
-                    download_name=existing_pdf['filename'],
-                    mimetype='application/pdf'
-                )
+                placeholders = report_placeholders_for(build_report_data(user_doc), user_doc["_id"], users)
             except Exception as e:
-                # If there's any error retrieving existing PDF, generate new one
-                pass
+                errors.append(f"{department}/{user_doc['_id']}: {str(e)}")
+                continue
+            prepared.append((user_doc["_id"], placeholders, report_cache_key(placeholders, REPORT_RENDERER),
+                             (user_doc.get('appraisal_pdf') or {}).get('report_hash')))
+        del user_docs, users
+
+        to_render = []
+        cached = report_cache.lookup_many({report_hash for _, _, report_hash, _ in prepared})
+        for user_id, placeholders, report_hash, recorded_hash in prepared:
+            file_id = cached.get(report_hash)
+            if file_id is None:
+                to_render.append(((user_id, report_hash), (placeholders, user_id)))
+                continue
+            if recorded_hash != report_hash:
+                record_report(collection, department, user_id, file_id, report_hash)
+            yield f"{department}/{secure_filename(f'filled_appraisal_{user_id}.pdf')}", fs.get(file_id)
+        del prepared
+
+        for (user_id, report_hash), pdf_bytes, error in render_as_completed(executor, render, to_render, window):
+            if error is not None:
+                errors.append(f"{department}/{user_id}: {str(error)}")
+                continue
+            safe_filename = secure_filename(f"filled_appraisal_{user_id}.pdf")
+            file_id = report_cache.store(report_hash, pdf_bytes, filename=safe_filename, user_id=user_id,
+                                         department=department, content_type='application/pdf')
+            record_report(collection, department, user_id, file_id, report_hash)
+            yield f"{department}/{safe_filename}", pdf_bytes
 
-        # Initialize COM for PDF generation
-        pythoncom.CoInitialize()
+    if errors:
+        print(f"Report export skipped {len(errors)} faculty")
+        yield "errors.txt", "\n".join(errors).encode('utf-8')
 
-        # Prepare data for document generation with proper grand_total structure
-        user_doc = collection.find_one({"_id": user_id})
-        grand_total_data = user_doc.get('grand_total', {'grand_total': 0, 'status': 'pending'})
-        
-        # Ensure grand_total is in correct format
-        if isinstance(grand_total_data, (int, float)):
-            grand_total_data = {'grand_total': float(grand_total_data), 'status': 'pending'}
-        
-        A_verified_marks = 0
-        B_verified_marks = 0
-        C_verified_marks = 0
-        D_verified_marks = 0
-        E_verified_marks = 0
-        grand_verified_marks = 0
-        
-        if user_doc.get('grand_marks_A', {}).get('verified_marks'):
-            A_verified_marks = user_doc['grand_marks_A']['verified_marks']
-        if user_doc.get('grand_marks_B', {}).get('verified_marks'):
-            B_verified_marks = user_doc['grand_marks_B']['verified_marks']
-        if user_doc.get('grand_marks_C', {}).get('verified_marks'):
-            C_verified_marks = user_doc['grand_marks_C']['verified_marks']
-        if user_doc.get('grand_marks_D', {}).get('verified_marks'):
-            D_verified_marks = user_doc['grand_marks_D']['verified_marks']
-        if user_doc.get('grand_marks_E', {}).get('verified_marks'):
-            E_verified_marks = user_doc['grand_marks_E']['verified_marks']
-        if user_doc.get('grand_verified_marks'):
-            grand_verified_marks = user_doc['grand_verified_marks']
-        
-        
-        
-        data = {
-            'A': user_doc.get('A', {}),
-            'B': user_doc.get('B', {}),
-            'C': user_doc.get('C', {}),
-            'D': user_doc.get('D', {}),
-            'E': user_doc.get('E', {}),
-            'grand_total': grand_total_data,
-            'A_verified_marks' : A_verified_marks,
-            'B_verified_marks' : B_verified_marks,
-            'C_verified_marks' : C_verified_marks,
-            'D_verified_marks' : D_verified_marks,
-            'E_verified_marks' : E_verified_marks,
-            'grand_verified_marks' : grand_verified_marks
-            
-        }
 
-        doc = fill_template_document(data, user_id, department)
-        
-        # Create temporary directory
-        temp_dir = os.path.join(os.getcwd(), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Generate PDF
-        safe_filename_docx = secure_filename(f"temp_{user_id}.docx")
-        safe_filename = secure_filename(f"filled_appraisal_{user_id}.pdf")
-        temp_docx = os.path.join(temp_dir, safe_filename_docx)
-        output_path = os.path.join(temp_dir, safe_filename)
-        
-        # Save and convert to PDF
-        doc.save(temp_docx)
-        convert(temp_docx, output_path)
-        
-        # Store PDF in GridFS
-        with open(output_path, 'rb') as pdf_file:
-            file_id = fs.put(
-                pdf_file,
-                filename=safe_filename,
-                user_id=user_id,
-                department=department,
-                content_type='application/pdf'
-            )
-        
-        # Update user document with file reference and reset isUpdated flag
-        collection.update_one(
-            {"_id": user_id},
-            {
-                "$set": {
-                    "appraisal_pdf": {
-                        "file_id": str(file_id),
-                        "filename": safe_filename,
-                        "upload_date": datetime.now()
-                    },
-                    "isUpdated": False  # Reset flag after generating new PDF
-                }
-            }
-        )
-        
-        # Send file
-        return send_file(
-            output_path,
-            as_attachment=True,
-            download_name=safe_filename,
-            mimetype='application/pdf'
-        )
+def export_response(departments, filename):
+    from report_export import stream_zip
+
+    # ?status=all exports every faculty member; by default only forms sent to the director
+    status = request.args.get('status', 'SentToDirector')
+    return Response(
+        stream_zip(export_entries(departments, status)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 
+@app.route('/<department>/reports.zip', methods=['GET'])
+def export_department_reports(department):
+    try:
+        if department not in department_collections:
+            return jsonify({"error": "Invalid department"}), 400
+        return export_response([department], secure_filename(f"appraisal_reports_{department}.zip"))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/reports.zip', methods=['GET'])
+def export_institute_reports():
+    try:
+        return export_response(list(department_collections), "appraisal_reports.zip")
     except Exception as e:
-        # Cleanup on error
-        for path in [temp_docx, output_path]:
-            if path and os.path.exists(path):
-                try:
-                    os.remove(path)
-                except OSError:
-                    pass
-        print(str(e))
         return jsonify({"error": str(e)}), 500
-    finally:
-        # Cleanup temporary files and uninitialize COM
-        for path in [temp_docx, output_path]:
-            if path and os.path.exists(path):
-                try:
-                    os.remove(path)
-                except OSError:
-                    pass
-        pythoncom.CoUninitialize()
 
 @app.route('/getEvaluationStatus/<user_id>/<department>', methods=['GET'])
 def get_evaluation_status(user_id, department):
@@ -1756,7 +990,7 @@ def get_evaluation_status(user_id, department):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        user_doc = collection.find_one({"_id": user_id})
+        user_doc = collection.find_one({"_id": user_id}, {"status": 1})
         if not user_doc:
             return jsonify({"error": "User not found"}), 404
 
@@ -1767,41 +1001,28 @@ def get_evaluation_status(user_id, department):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Add a download endpoint to handle direct file downloads
-@app.route('/download/<filename>')
-def download_file(filename):
+def collect_old_reports():
     try:
-        return send_from_directory(
-            os.path.join(os.getcwd(), 'temp'),
-            filename,
-            as_attachment=True
-        )
+        report_retention.collect()
     except Exception as e:
-        return jsonify({"error": str(e)}), 404
+        print(f"Report retention failed: {str(e)}")
 
-# Add this function to clean up old temporary files
-def cleanup_temp_files():
-    temp_dir = os.path.join(os.getcwd(), 'temp')
-    if os.path.exists(temp_dir):
-        for file in os.listdir(temp_dir):
-            try:
-                file_path = os.path.join(temp_dir, file)
-                # Remove files older than 1 hour
-                if os.path.getmtime(file_path) < time.time() - 3600:
-                    os.remove(file_path)
-            except:
-                continue
+def reconcile_department_summaries():
+    department_summary.reconcile_all()
 
-# Add these imports at the top of your file
-import time
-from apscheduler.schedulers.background import BackgroundScheduler
-import pythoncom
-from datetime import datetime
+scheduler = None
 
-# Add this after your app initialization
-scheduler = BackgroundScheduler()
-scheduler.add_job(func=cleanup_temp_files, trigger="interval", minutes=60)
-scheduler.start()
+def start_scheduler():
+    """Start the report retention run and the summary reconciliation, once per process"""
+    global scheduler
+    if scheduler is None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        scheduler = BackgroundScheduler()
+        scheduler.add_job(func=collect_old_reports, trigger="interval", hours=REPORT_RETENTION_INTERVAL_HOURS)
+        scheduler.add_job(func=reconcile_department_summaries, trigger="interval",
+                          hours=DEPARTMENT_SUMMARY_RECONCILE_HOURS)
+        scheduler.start()
+    return scheduler
 
 @app.route('/<department>/<user_id>/download/<format>', methods=['GET'])
 def get_stored_document(department, user_id, format):
@@ -1810,7 +1031,7 @@ def get_stored_document(department, user_id, format):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
             
-        user_doc = collection.find_one({"_id": user_id})
+        user_doc = collection.find_one({"_id": user_id}, {f"appraisal_{format}": 1})
         if not user_doc:
             return jsonify({"error": "User not found"}), 404
             
@@ -1824,28 +1045,11 @@ def get_stored_document(department, user_id, format):
         grid_out = fs.get(file_id)
         
         # Return the file
-        return send_file(
-            io.BytesIO(grid_out.read()),
-            as_attachment=True,
-            download_name=file_ref['filename'],
-            mimetype=grid_out.content_type
-        )
+        return gridfs_response(grid_out, file_ref['filename'])
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Add after your app initialization and before running the app
-verification_bp = create_verification_blueprint(mongo_fdw, db_users, department_collections)
-app.register_blueprint(verification_bp)
-# Add this line after creating the Flask app
-app.register_blueprint(faculty_list)
-
-# Add this line with your other blueprint registrations
-app.register_blueprint(forgot_password)
-
-# Add this after creating the Flask app and before the routes
-app.register_blueprint(user_profile)
-
 # After the MongoDB configuration, add this to make the db_users available to the blueprint
 app.config['db_users'] = db_users
 
@@ -1855,7 +1059,7 @@ def get_status(department, user_id):
         collection = department_collections.get(department)
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
-        user_doc  = collection.find_one({"_id" : user_id})
+        user_doc  = collection.find_one({"_id": user_id}, {"status": 1})
         if not user_doc:
             return jsonify({"error": "User not found"}), 404
         current_status = user_doc.get("status","pending")
@@ -1867,6 +1071,26 @@ def get_status(department, user_id):
         return jsonify({"error": str(e)}), 500
 
 
+def change_status(collection, user_id, allowed, new_status):
+    """
+    Move a form from one of the `allowed` statuses to new_status in a single write, so a
+    concurrent transition cannot slip in between the check and the update.
+
+    Returns the form's department summary fields from before the write, or None when
+    the form does not exist or is in another status.
+    """
+    return collection.find_one_and_update(
+        {"_id": user_id, "status": {"$in": allowed}},
+        {"$set": {"status": new_status}},
+        projection=SUMMARY_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+
+
+def form_exists(collection, user_id):
+    return collection.find_one({"_id": user_id}, {"_id": 1}) is not None
+
+
 # Add these status change endpoints after your existing routes
 @app.route('/<department>/<user_id>/submit-form', methods=['POST'])
 def submit_form(department, user_id):
@@ -1876,30 +1100,25 @@ def submit_form(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        if not user_doc:
-            return jsonify({"error": "User not found"}), 404
-
-        current_status = user_doc.get('status', 'pending')
-        if current_status != 'pending':
+        # A form without a stored status counts as pending
+        before = change_status(collection, user_id, ['pending', None], "verification_pending")
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in pending status to submit"
             }), 400
 
-        # Update status
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {"status": "verification_pending"}}
-        )
-
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "Form submitted successfully",
-                "new_status": "verification_pending"
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        if before.get('status') is None:
+            # A form without a stored status is not counted yet, so it joins with its marks
+            department_summary.record(department, before, {**before, "status": "verification_pending"})
+        else:
+            department_summary.transition(department, before['status'], "verification_pending")
+        return jsonify({
+            "message": "Form submitted successfully",
+            "new_status": "verification_pending"
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1914,30 +1133,21 @@ def hod_mark_given(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        if not user_doc:
-            return jsonify({"error": "User not found"}), 404
-
-        current_status = user_doc.get('status', 'pending')
-        if current_status != 'Portfolio_Mark_pending':
+        # Update status to indicate Dean marks are pending
+        before = change_status(collection, user_id, ['Portfolio_Mark_pending'], "Portfolio_Mark_Dean_pending")
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in Portfolio_Mark_pending status to proceed"
             }), 400
 
-        # Update status to indicate Dean marks are pending
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {"status": "Portfolio_Mark_Dean_pending"}}
-        )
-
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "HOD portfolio marks assigned successfully, awaiting Dean review",
-                "new_status": "Portfolio_Mark_Dean_pending"
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        department_summary.transition(department, before['status'], "Portfolio_Mark_Dean_pending")
+        return jsonify({
+            "message": "HOD portfolio marks assigned successfully, awaiting Dean review",
+            "new_status": "Portfolio_Mark_Dean_pending"
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1950,30 +1160,22 @@ def portfolio_given(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        if not user_doc:
-            return jsonify({"error": "User not found"}), 404
-
-        current_status = user_doc.get('status', 'pending')
-        if (current_status != 'Portfolio_Mark_pending' and current_status != 'Portfolio_Mark_Dean_pending'):
+        # Update status
+        before = change_status(collection, user_id, ['Portfolio_Mark_pending', 'Portfolio_Mark_Dean_pending'],
+                               "authority_verification_pending")
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in Portfolio_Mark_pending or Portfolio_Mark_Dean_pending status to proceed"
             }), 400
 
-        # Update status
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {"status": "authority_verification_pending"}}
-        )
-
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "Portfolio marks assigned successfully",
-                "new_status": "authority_verification_pending"
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        department_summary.transition(department, before['status'], "authority_verification_pending")
+        return jsonify({
+            "message": "Portfolio marks assigned successfully",
+            "new_status": "authority_verification_pending"
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1986,30 +1188,22 @@ def director_mark_given(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        if not user_doc:
-            return jsonify({"error": "User not found"}), 404
-
-        current_status = user_doc.get('status', 'pending')
-        if (current_status != 'Portfolio_mark_director_pending'):
+        # Update status
+        before = change_status(collection, user_id, ['Portfolio_mark_director_pending'],
+                               "authority_verification_pending")
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in Portfolio_mark_director_pending status to proceed"
             }), 400
 
-        # Update status
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {"status": "authority_verification_pending"}}
-        )
-
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "Portfolio marks assigned successfully",
-                "new_status": "authority_verification_pending"
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        department_summary.transition(department, before['status'], "authority_verification_pending")
+        return jsonify({
+            "message": "Portfolio marks assigned successfully",
+            "new_status": "authority_verification_pending"
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -2023,31 +1217,26 @@ def verify_research(department,verifier_id, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        user_info = db_users.find_one({"_id": user_id})
-        if not user_doc or not user_info:
+        # The designation decides the next status, so it is read before the form is moved
+        user_info = db_users.find_one({"_id": user_id}, {"desg": 1})
+        if not user_info:
             return jsonify({"error": "User not found"}), 404
 
-        current_status = user_doc.get('status')
         faculty_desg = user_info.get('desg')
+        if(faculty_desg == "HOD" or faculty_desg == "Dean"):
+            new_status = "Portfolio_mark_director_pending"
+        else:
+            new_status = "Portfolio_Mark_pending"
 
-        if current_status != 'verification_pending':
+        before = change_status(collection, user_id, ['verification_pending'], new_status)
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in verification_pending status"
             }), 400
-        
-        if(faculty_desg == "HOD" or faculty_desg == "Dean"):
-            result = collection.update_one(
-                {"_id": user_id},
-                {"$set": {"status": "Portfolio_mark_director_pending"}}
-            )
-        else:
-            result = collection.update_one(
-                {"_id": user_id},
-                {"$set": {"status": "Portfolio_Mark_pending"}}
-            )
+        department_summary.transition(department, before['status'], new_status)
         
         committee_head = db_users.find_one({"_id": verifier_id})
         if not committee_head:
@@ -2072,15 +1261,13 @@ def verify_research(department,verifier_id, user_id):
         if result_isVerified.modified_count <= 0:
             return jsonify({"error": "Faculty not found or already approved"}), 400
 
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "Research verification completed",
-                "new_status": "Portfolio_Mark_pending",
-                "department": department,
-                "faculty_id": user_id,
-                "verifier_id": verifier_id
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        return jsonify({
+            "message": "Research verification completed",
+            "new_status": "Portfolio_Mark_pending",
+            "department": department,
+            "faculty_id": user_id,
+            "verifier_id": verifier_id
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -2093,29 +1280,21 @@ def verify_authority(department, user_id):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get current document and check status
-        user_doc = collection.find_one({"_id": user_id})
-        if not user_doc:
-            return jsonify({"error": "User not found"}), 404
-
-        current_status = user_doc.get('status')
-        if current_status != 'verified':
+        # Update status
+        before = change_status(collection, user_id, ['verified'], "Interaction_pending")
+        if before is None:
+            if not form_exists(collection, user_id):
+                return jsonify({"error": "User not found"}), 404
             return jsonify({
                 "error": "Invalid status transition",
                 "message": "Form must be in verified status"
             }), 400
 
-        # Update status
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {"status": "Interaction_pending"}}
-        )
-        if result.modified_count > 0:
-            return jsonify({
-                "message": "Authority verification completed",
-                "new_status": "Interaction_pending"
-            }), 200
-        return jsonify({"error": "No changes made"}), 400
+        department_summary.transition(department, before['status'], "Interaction_pending")
+        return jsonify({
+            "message": "Authority verification completed",
+            "new_status": "Interaction_pending"
+        }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -2136,31 +1315,22 @@ def send_to_director(department):
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Find users with 'Done' status
-        valid_users = collection.find({
-            "_id": {"$in": user_ids},
-            "status": "done"
-        })
-        
-        valid_user_ids = [user["_id"] for user in valid_users]
-        
+        # Each form moves only if it is still 'done' when it is written, so the ids
+        # reported as sent are exactly the forms this request moved
+        valid_user_ids = [user_id for user_id in dict.fromkeys(user_ids)
+                          if change_status(collection, user_id, ['done'], "SentToDirector") is not None]
+
         if not valid_user_ids:
             return jsonify({
                 "error": "No valid users found",
                 "message": "No users with 'Done' status found among the provided IDs"
             }), 404
 
-        # Update status for all valid users
-        result = collection.update_many(
-            {
-                "_id": {"$in": valid_user_ids},
-                "status": "done"
-            },
-            {"$set": {"status": "SentToDirector"}}
-        )
+        department_summary.transition(department, "done", "SentToDirector", len(valid_user_ids))
+        report_prerender.milestone(department, valid_user_ids, "SentToDirector")
 
         # Check results
-        success_count = result.modified_count
+        success_count = len(valid_user_ids)
         skipped_ids = [user_id for user_id in user_ids if user_id not in valid_user_ids]
 
         return jsonify({
@@ -2206,17 +1376,6 @@ def get_deans():
         }), 500
 
 
-
-from dean_associates import dean_associates
-
-# Add this line with your other blueprint registrations
-app.register_blueprint(dean_associates)
-
-from externals import externals
-
-# Add this line with your other blueprint registrations
-app.register_blueprint(externals)
-
 @app.route('/<department>/<user_id>/E', methods=['POST'])
 def handle_post_E(department, user_id):
     try:
@@ -2230,10 +1389,11 @@ def handle_post_E(department, user_id):
             return jsonify({"error": "Invalid department"}), 400
         
         # Verify user exists in department
-        lookup = collection.find_one({"_id": "lookup"}).get("data")
+        # Roster membership is answered from the in-process cache
+        lookup = roster_cache.get(department, collection)
         if lookup is None:
             return jsonify({"error": "Invalid department"}), 400
-        user = lookup.get(user_id)
+        user = roster_cache.role_of(department, collection, user_id)
         if user is None:
             return jsonify({"error": "Invalid user"}), 400
 
@@ -2247,42 +1407,21 @@ def handle_post_E(department, user_id):
         if 'bullet_points' not in data['E']:
             return jsonify({"error": "Missing required field: bullet_points"}), 400
 
-        # Create section E structure with default values
-        section_E = {
-            'total_marks': data['E']['total_marks'],
-            'bullet_points': data['E']['bullet_points'],
-            'verified_marks': 0,  # Default verified marks
-            'isVerified': False  # Verification status
-        }
-
-        # Update the document
-        result = collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "E": section_E,
-                "isUpdated": True,
-                "status": "pending"
-            }},
-            upsert=True
-        )
+        # Create section E structure, verification fields start from their defaults
+        section_E = merge_section('E', faculty_entry('E', data['E']))
 
-        # Get updated document and calculate grand total
-        updated_doc = collection.find_one({"_id": user_id})
-        calculated_data = calculate_grand_total(updated_doc)
-
-        # Update grand total and status
-        collection.update_one(
-            {"_id": user_id},
-            {"$set": {
-                "grand_total": calculated_data['grand_total'],
-                "status": calculated_data['status']
-            }}
+        # Store section E and recompute the grand total in one write
+        grand_total = save_section(
+            collection, user_id, "E", section_E,
+            extra_fields={"status": "pending"},
+            nested_total=False,
+            on_change=department_summary.recorder(department)
         )
 
         return jsonify({
-            "message": "Data updated successfully" if result.matched_count > 0 else "Data inserted successfully",
-            "grand_total": calculated_data['grand_total'],
-            "status": calculated_data['status']
+            "message": "Data updated successfully",
+            "grand_total": grand_total,
+            "status": "pending"
         }), 200
 
     except Exception as e:
@@ -2294,19 +1433,71 @@ def get_section_E(department, user_id):
     try:
         collection = department_collections.get(department)
         if collection is not None:
-            user = collection.find_one({"_id": user_id})
+            user = collection.find_one({"_id": user_id}, {"E": 1})
             if user:
-                return jsonify(user.get("E", {
-                    'total_marks': 0,
-                    'bullet_points': [],
-                    'verified_marks': 0,
-                    'isVerified': False
-                }))
+                return jsonify(user.get("E", SECTION_READ_DEFAULTS["E"]))
             return jsonify({"error": "User not found"}), 404
         return jsonify({"error": "Invalid department"}), 400
     except Exception as e:
         print(f"Error retrieving section E: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def register_blueprints(flask_app):
+    """Register every blueprint; the modules are only imported here"""
+    from verification_commity import create_verification_blueprint
+    from faculty_list import faculty_list
+    from forgot_password import forgot_password
+    from user_profile import user_profile
+    from bulk_import import create_bulk_import_blueprint
+    from dean_associates import dean_associates
+    from externals import externals
+    from request_metrics import create_metrics_blueprint
+    from scoring import create_scoring_blueprint
+
+    flask_app.register_blueprint(create_verification_blueprint(mongo_fdw, db_users, department_collections))
+    flask_app.register_blueprint(create_bulk_import_blueprint(department_collections, department_summary))
+    flask_app.register_blueprint(faculty_list)
+    flask_app.register_blueprint(forgot_password)
+    flask_app.register_blueprint(user_profile)
+    flask_app.register_blueprint(dean_associates)
+    flask_app.register_blueprint(externals)
+    flask_app.register_blueprint(create_metrics_blueprint(request_metrics, pool_stats=registry.stats))
+    flask_app.register_blueprint(create_report_jobs_blueprint(report_jobs, fs, department_collections))
+    flask_app.register_blueprint(create_report_retention_blueprint(report_retention))
+    flask_app.register_blueprint(create_scoring_blueprint(department_collections, db_users))
+    flask_app.register_blueprint(create_department_summary_blueprint(department_summary))
+
+
+def is_serverless():
+    """True on Vercel (VERCEL is set by the platform) or when FDW_SERVERLESS is set"""
+    return any(os.getenv(name, "") not in ("", "0", "false") for name in ("FDW_SERVERLESS", "VERCEL"))
+
+
+def create_app(serverless=None):
+    """
+    Finish configuring the application and return it.
+
+    Registers the blueprints once. The report retention scheduler only runs on
+    long-lived servers: serverless instances are frozen between requests.
+    """
+    if serverless is None:
+        serverless = is_serverless()
+    if not app.config.get('BLUEPRINTS_REGISTERED'):
+        request_metrics.init_app(app)
+        register_blueprints(app)
+        app.config['BLUEPRINTS_REGISTERED'] = True
+    app.config['SERVERLESS'] = serverless
+    if not serverless:
+        start_scheduler()
+        if REPORT_RENDERER == 'docx':
+            # Compile the Word template before the first report request
+            from docx_template import get_template
+            get_template(REPORT_TEMPLATE)
+    return app
+
+
+# Entry point for WSGI servers and the Vercel runtime, which both import `app`
+app = create_app()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
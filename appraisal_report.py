@@ -0,0 +1,411 @@
+"""
+Values shown in the Faculty Self Appraisal report.
+
+The DOCX template and the PDF renderer both fill their slots from
+report_placeholders, so every output format shows the same numbers.
+"""
+from scoring import score_faculty
+
+
+def build_report_data(user_doc):
+    """Collect the sections, grand total and verified marks of a faculty document for the report"""
+    grand_total_data = user_doc.get('grand_total', {'grand_total': 0, 'status': 'pending'})
+
+    # Ensure grand_total is in correct format
+    if isinstance(grand_total_data, (int, float)):
+        grand_total_data = {'grand_total': float(grand_total_data), 'status': 'pending'}
+
+    data = {
+        'A': user_doc.get('A', {}),
+        'B': user_doc.get('B', {}),
+        'C': user_doc.get('C', {}),
+        'D': user_doc.get('D', {}),
+        'E': user_doc.get('E', {}),
+        'grand_total': grand_total_data,
+        'grand_verified_marks': user_doc.get('grand_verified_marks') or 0
+    }
+    for section in ['A', 'B', 'C', 'D', 'E']:
+        data[f'{section}_verified_marks'] = user_doc.get(f'grand_marks_{section}', {}).get('verified_marks') or 0
+    return data
+
+
+def report_placeholders(data, user_data, verifier_name='Not Verified Yet'):
+    """
+    Compute the value of every {placeholder} in the report.
+
+    Args:
+        data (dict): Output of build_report_data
+        user_data (dict): The faculty member's users document
+        verifier_name (str): Name of the Section B verifier
+    """
+    # Initial placeholders with user details
+    placeholders = {
+        '{faculty_name}': user_data.get('name', ''),
+        '{faculty_designation}': user_data.get('role', ''),
+        '{faculty_department}': user_data.get('dept', ''),
+    }
+    role = user_data.get('role', '')
+    desg = user_data.get('desg', '')
+
+    # Weighted marks come from the scoring engine; the report only lays them out
+    scores = score_faculty(data, user_data)
+    claimed = {key: entry["items"] for key, entry in scores["section_b"].items()}
+
+    section_a_marks = scores["section_a"]["scaled_marks"]
+    Prof_A = 0
+    Assoc_A = 0
+    Assis_A = 0
+    Prof_A_total_marks = 0
+    Assoc_A_total_marks = 0
+    Assis_A_total_marks = 0
+    if role == 'Assistant Professor':
+        Assis_A =  section_a_marks
+        Assis_A_total_marks = scores["section_a"]["total_marks"]
+
+    if role == 'Associate Professor':
+        Assoc_A =  section_a_marks
+        Assoc_A_total_marks = scores["section_a"]["total_marks"]
+    elif role == 'Professor':
+        Prof_A =  section_a_marks
+        Prof_A_total_marks = scores["section_a"]["total_marks"]
+
+    #adding all the marks in the B section and store in the variable
+    b_total_verified = data['B']['1']['journalPapers']['verified_marks'] + data['B']['2']['conferencePapers']['verified_marks'] + data['B']['3']['bookChapters']['verified_marks'] + data['B']['4']['books']['verified_marks'] + data['B']['5']['citations']['verified_marks'] + data['B']['6']['copyrightIndividual']['verified_marks'] + data['B']['7']['copyrightInstitute']['verified_marks'] + data['B']['8']['patentIndividual']['verified_marks'] + data['B']['9']['patentInstitute']['verified_marks'] + data['B']['10']['researchGrants']['verified_marks'] + data['B']['11']['trainingPrograms']['verified_marks'] + data['B']['12']['nonResearchGrants']['verified_marks'] + data['B']['13']['productDevelopment']['verified_marks'] + data['B']['14']['startup']['verified_marks'] + data['B']['15']['awardsAndFellowships']['verified_marks'] + data['B']['16']['industryInteraction']['verified_marks'] + data['B']['17']['internshipPlacement']['verified_marks']
+    # b_total = data['B']['1']['journalPapers']['total_marks'] + data['B']['2']['conferencePapers']['total_marks'] + data['B']['3']['bookChapters']['total_marks'] + data['B']['4']['books']['total_marks'] + data['B']['5']['citations']['total_marks'] + data['B']['6']['copyrightIndividual']['total_marks'] + data['B']['7']['copyrightInstitute']['total_marks'] + data['B']['8']['patentIndividual']['total_marks'] + data['B']['9']['patentInstitute']['total_marks'] + data['B']['10']['researchGrants']['total_marks'] + data['B']['11']['trainingPrograms']['total_marks'] + data['B']['12']['nonResearchGrants']['total_marks'] + data['B']['13']['productDevelopment']['total_marks'] + data['B']['14']['startup']['total_marks']
+    b_total = data['B']['1']['journalPapers']['marks'] + data['B']['2']['conferencePapers']['marks'] + data['B']['3']['bookChapters']['marks'] + data['B']['4']['books']['marks'] + data['B']['5']['citations']['marks'] + data['B']['6']['copyrightIndividual']['marks'] + data['B']['7']['copyrightInstitute']['marks'] + data['B']['8']['patentIndividual']['marks'] + data['B']['9']['patentInstitute']['marks'] + data['B']['10']['researchGrants']['marks'] + data['B']['11']['trainingPrograms']['marks'] + data['B']['12']['nonResearchGrants']['marks'] + data['B']['13']['productDevelopment']['marks'] + data['B']['14']['startup']['marks'] + data['B']['15']['awardsAndFellowships']['marks'] + data['B']['16']['industryInteraction']['marks'] + data['B']['17']['internshipPlacement']['marks']
+    Prof_B = 0
+    Assoc_B = 0
+    Assis_B = 0
+
+    Prof_B_total_marks = 0
+    Assoc_B_total_marks = 0
+    Assis_B_total_marks = 0
+
+    Prof_B_total_verified = 0
+    Assoc_B_total_verified = 0
+    Assis_B_total_verified = 0
+
+    if role == 'Assistant Professor':
+        Assis_B =  b_total
+        Assis_B_total_marks = data['B']['total_marks']
+        Assis_B_total_verified = data['B']['final_verified_marks']
+    if role == 'Associate Professor':
+        Assoc_B =  b_total
+        Assoc_B_total_marks = data['B']['total_marks']
+        Assoc_B_total_verified = data['B']['final_verified_marks']
+    elif role == 'Professor':
+        Prof_B =  b_total
+        Prof_B_total_marks = data['B']['total_marks']
+        Prof_B_total_verified = data['B']['final_verified_marks']
+
+    Prof_qualification_marks = 0
+    qualification_marks  = 0
+    if role == 'Assistant Professor':
+        qualification_marks =  data['C']['1']['qualification']['marks']
+    else:
+        Prof_qualification_marks =  data['C']['1']['qualification']['marks']
+
+    c_total = data['C']['1']['qualification']['marks'] + data['C']['2']['trainingAttended']['marks'] + data['C']['3']['trainingOrganized']['marks'] + data['C']['4']['phdGuided']['marks']
+    Prof_C = 0
+    Assoc_C = 0
+    Assis_C = 0
+    Prof_C_total_marks = 0
+    Assoc_C_total_marks = 0
+    Assis_C_total_marks = 0
+    if role == 'Assistant Professor':
+        Assis_C =  c_total
+        Assis_C_total_marks = data['C']['total_marks']
+    if role == 'Associate Professor':
+        Assoc_C =  c_total
+        Assoc_C_total_marks = data['C']['total_marks']
+    elif role == 'Professor':
+        Prof_C =  c_total
+        Prof_C_total_marks = data['C']['total_marks']
+    # Placeholders and their corresponding values from different sections
+    self_awarded_marks = data['D']['selfAwardedMarks']
+    hod_marks = data['D']['hodMarks']
+    total_marks_D= data['D']['total_marks']
+    assTotalMarks = 0
+    assDeanHODMarks = 0
+    assDeanDeanMarks = 0
+    sumMarks_hod_dean = 0
+    assSelfawardedmarks = 0
+    if desg == 'Associate Dean' : 
+        self_awarded_marks = 0
+        total_marks_D = 0
+        hod_marks = 0
+        assDeanHODMarks = data['D']['hodMarks']
+        assDeanDeanMarks = data['D']['deanMarks']
+        sumMarks_hod_dean = (data['D']['hodMarks'] + data['D']['deanMarks']) / 2
+        assSelfawardedmarks = data['D']['selfAwardedMarks']
+        assTotalMarks = assSelfawardedmarks + sumMarks_hod_dean
+
+    extraMarks = scores["designation_bonus"]
+
+    placeholders.update({
+        # Section A placeholders
+        '{result_analysis_marks}': str(round(data['A']['1']['total_marks'], 2)),
+        '{course_outcome_marks}': str(round(data['A']['2']['total_marks'], 2)),
+        '{elearning_content_marks}': str(round(data['A']['3']['total_marks'], 2)),
+        '{academic_engagement_marks}': str(round(data['A']['4']['total_marks'], 2)),
+        '{teaching_load_marks}': str(round(data['A']['5']['total_marks'], 2)),
+        '{projects_guided_marks}': str(round(data['A']['6']['total_marks'], 2)),
+        '{student_feedback_marks}': str(round(data['A']['7']['total_marks'], 2)),
+        '{ptg_meetings_marks}': str(round(data['A']['8']['total_marks'], 2)),
+        '{section_a_total}': str(round(section_a_marks)),
+        '{Prof_A}': str(round(Prof_A)),
+        '{Assoc_A}': str(round(Assoc_A)),
+        '{Assis_A}': str(round(Assis_A)),
+        '{Prof_A_total_marks}': str(round(Prof_A_total_marks)),
+        '{Assoc_A_total_marks}': str(round(Assoc_A_total_marks)),
+        '{Assis_A_total_marks}': str(round(Assis_A_total_marks)),
+
+        # Section B detailed placeholders - Updated to include verification marks
+        # 1. Journal Papers
+
+
+
+        '{sci_papers_marks}': str(claimed['1']['sci']),
+        '{sci_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_sciMarks']),
+
+        '{esci_papers_marks}': str(claimed['1']['esci']),
+        '{esci_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_esciMarks']),
+
+        '{scopus_papers_marks}': str(claimed['1']['scopus']),
+        '{scopus_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_scopusMarks']),
+
+        '{ugc_papers_marks}': str(claimed['1']['ugcCare']),
+        '{ugc_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_ugcCareMarks']),
+
+        '{other_papers_marks}': str(claimed['1']['other']),
+        '{other_papers_verified_marks}': str(data['B']['1']['journalPapers']['ver_otherMarks']),
+        '{papers_published_marks}': str(data['B']['1']['journalPapers']['verified_marks']),
+
+        # 2. Conferences
+
+        '{scopus_conf_marks}': str(claimed['2']['scopusWos']),
+        '{scopus_conf_verified_marks}': str(data['B']['2']['conferencePapers']['ver_scopusWosMarks']),
+
+        '{other_conf_marks}': str(claimed['2']['other']),
+        '{other_conf_verified_marks}': str(data['B']['2']['conferencePapers']['ver_otherMarks']),
+        '{conferences_marks}': str(data['B']['2']['conferencePapers']['verified_marks']),
+
+        # 3. Book Chapters
+
+        '{scopus_chapter_marks}': str(claimed['3']['scopusWos']),
+        '{scopus_chapter_verified_marks}': str(data['B']['3']['bookChapters']['ver_scopusWosMarks']),
+
+        '{other_chapter_marks}': str(claimed['3']['other']),
+        '{other_chapter_verified_marks}': str(data['B']['3']['bookChapters']['ver_otherMarks']),
+        '{book_chapters_marks}': str(data['B']['3']['bookChapters']['verified_marks']),
+
+        # 4. Books
+
+        '{scopus_books_marks}': str(claimed['4']['scopusWos']),
+        '{scopus_books_verified_marks}': str(data['B']['4']['books']['ver_scopusWosMarks']),
+
+        '{national_books_marks}': str(claimed['4']['nonIndexed']),
+        '{national_books_verified_marks}': str(data['B']['4']['books']['ver_nonIndexedMarks']),
+
+        '{local_books_marks}': str(claimed['4']['local']),
+        '{local_books_verified_marks}': str(data['B']['4']['books']['ver_localMarks']),
+        '{books_marks}': str(data['B']['4']['books']['verified_marks']),
+
+        # 5. Citations
+        '{wos_citations_marks}': str(claimed['5']['webOfScience']),
+        '{wos_citations_verified_marks}': str(data['B']['5']['citations']['ver_webOfScienceMarks']),
+
+        '{scopus_citations_marks}': str(claimed['5']['scopus']),
+        '{scopus_citations_verified_marks}': str(data['B']['5']['citations']['ver_scopusMarks']),
+
+        '{google_citations_marks}': str(claimed['5']['googleScholar']),
+        '{google_citations_verified_marks}': str(data['B']['5']['citations']['ver_googleScholarMarks']),
+        '{citations_marks}': str(data['B']['5']['citations']['verified_marks']),
+
+        # 6. Copyright Individual
+
+        '{individual_copyright_registered_marks}': str(claimed['6']['registered']),
+        '{individual_copyright_registered_verified_marks}': str(data['B']['6']['copyrightIndividual']['ver_registeredMarks']),
+
+        '{individual_copyright_granted_marks}': str(claimed['6']['granted']),
+        '{individual_copyright_granted_verified_marks}': str(data['B']['6']['copyrightIndividual']['ver_grantedMarks']),
+        '{individual_copyright_marks}': str(data['B']['6']['copyrightIndividual']['verified_marks']),
+
+        # 7. Copyright Institute
+
+        '{institute_copyright_registered_marks}': str(claimed['7']['registered']),
+        '{institute_copyright_registered_verified_marks}': str(data['B']['7']['copyrightInstitute']['ver_registeredMarks']),
+
+        '{institute_copyright_granted_marks}': str(claimed['7']['granted']),
+        '{institute_copyright_granted_verified_marks}': str(data['B']['7']['copyrightInstitute']['ver_grantedMarks']),
+        '{institute_copyright_marks}': str(data['B']['7']['copyrightInstitute']['verified_marks']),
+
+        # 8-9. Patents (Individual and Institute)
+
+        '{individual_patent_registered_marks}': str(claimed['8']['registered']),
+        '{individual_patent_registered_verified_marks}': str(data['B']['8']['patentIndividual']['ver_registeredMarks']),
+
+        '{individual_patent_published_marks}': str(claimed['8']['published']),
+        '{individual_patent_published_verified_marks}': str(data['B']['8']['patentIndividual']['ver_publishedMarks']),
+
+        '{individual_granted_marks}': str(claimed['8']['granted']),
+        '{individual_granted_verified_marks}': str(data['B']['8']['patentIndividual']['ver_grantedMarks']),
+
+        '{individual_commercialized_marks}': str(claimed['8']['commercialized']),
+        '{individual_commercialized_verified_marks}': str(data['B']['8']['patentIndividual']['ver_commercializedMarks']),
+        '{individual_patent_marks}': str(data['B']['8']['patentIndividual']['verified_marks']),
+
+        #9
+
+        '{college_patent_registered_marks}': str(claimed['9']['registered']),
+        '{college_patent_registered_verified_marks}': str(data['B']['9']['patentInstitute']['ver_registeredMarks']),
+
+        '{college_patent_published_marks}': str(claimed['9']['published']),
+        '{college_patent_published_verified_marks}': str(data['B']['9']['patentInstitute']['ver_publishedMarks']),
+
+        '{college_granted_marks}': str(claimed['9']['granted']),
+        '{college_granted_verified_marks}': str(data['B']['9']['patentInstitute']['ver_grantedMarks']),
+
+        '{college_commercialized_marks}': str(claimed['9']['commercialized']),
+        '{college_commercialized_verified_marks}': str(data['B']['9']['patentInstitute']['ver_commercializedMarks']),
+        '{college_patent_marks}': str(data['B']['9']['patentInstitute']['verified_marks']),
+        '{patents_marks}': str(data['B']['8']['patentIndividual']['verified_marks'] + data['B']['9']['patentInstitute']['verified_marks']),
+
+        # 10. Research Grants
+        '{research_grants_amount}': str(data['B']['10']['researchGrants']['amount']),
+        '{research_grants_marks}': str(claimed['10']['amount']),
+        '{research_grants_verified_marks}': str(data['B']['10']['researchGrants']['ver_amountMarks']),
+
+        # 11. Training Revenue
+        '{training_amount}': str(data['B']['11']['trainingPrograms']['amount']),
+        '{training_marks}': str(claimed['11']['amount']),
+        '{training_verified_marks}': str(data['B']['11']['trainingPrograms']['ver_amountMarks']),
+
+        # 12. Non-Research Grants
+        '{nonresearch_grants_amount}': str(data['B']['12']['nonResearchGrants']['amount']),
+        '{nonresearch_grants_marks}': str(claimed['12']['amount']),
+        '{nonresearch_grants_verified_marks}': str(data['B']['12']['nonResearchGrants']['ver_amountMarks']),
+
+        # 13. Products
+
+        '{commercialized_products_marks}': str(claimed['13']['commercialized']),
+        '{commercialized_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_commercializedMarks']),
+
+        '{developed_products_marks}': str(claimed['13']['developed']),
+        '{developed_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_developedMarks']),
+
+        '{poc_products_marks}': str(claimed['13']['poc']),
+        '{poc_products_verified_marks}': str(data['B']['13']['productDevelopment']['ver_pocMarks']),
+        '{products_marks}': str(data['B']['13']['productDevelopment']['verified_marks']),
+
+        # 14. Startup PCCOE
+        '{startup_revenue_pccoe_amount}': str(data['B']['14']['startup']['revenueFiftyKCount']),
+        '{startup_revenue_pccoe_marks}': str(claimed['14']['revenueFiftyK']),
+        '{startup_revenue_pccoe_verified_marks}': str(data['B']['14']['startup']['ver_revenueFiftyKMarks']),
+        '{startup_funding_pccoe_amount}': str(data['B']['14']['startup']['fundsFiveLakhsCount']),
+        '{startup_funding_pccoe_marks}': str(claimed['14']['fundsFiveLakhs']),
+        '{startup_funding_pccoe_verified_marks}': str(data['B']['14']['startup']['ver_fundsFiveLakhsMarks']),
+
+        '{startup_products_marks}': str(claimed['14']['products']),
+        '{startup_products_verified_marks}': str(data['B']['14']['startup']['ver_productsMarks']),
+
+        '{startup_poc_marks}': str(claimed['14']['poc']),
+        '{startup_poc_verified_marks}': str(data['B']['14']['startup']['ver_pocMarks']),
+
+        '{startup_registered_marks}': str(claimed['14']['registered']),
+        '{startup_registered_verified_marks}': str(data['B']['14']['startup']['ver_registeredMarks']),
+        '{startup_pccoe_marks}': str(data['B']['14']['startup']['verified_marks']),
+
+        # 15. Awards
+
+        '{international_awards_marks}': str(claimed['15']['internationalAwards']),
+        '{international_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_internationalAwardsMarks']),
+
+        '{government_awards_marks}': str(claimed['15']['governmentAwards']),
+        '{government_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_governmentAwardsMarks']),
+
+        '{national_awards_marks}': str(claimed['15']['nationalAwards']),
+        '{national_awards_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_nationalAwardsMarks']),
+
+        '{international_fellowship_marks}': str(claimed['15']['internationalFellowships']),
+        '{international_fellowship_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_internationalFellowshipsMarks']),
+
+        '{national_fellowship_marks}': str(claimed['15']['nationalFellowships']),
+        '{national_fellowship_verified_marks}': str(data['B']['15']['awardsAndFellowships']['ver_nationalFellowshipsMarks']),
+        '{awards_marks}': str(data['B']['15']['awardsAndFellowships']['verified_marks']),
+
+        # 16. Industry Interaction
+
+        '{active_mou_marks}': str(claimed['16']['moUs']),
+        '{active_mou_verified_marks}': str(data['B']['16']['industryInteraction']['ver_moUsMarks']),
+
+        '{lab_development_marks}': str(claimed['16']['collaboration']),
+        '{lab_development_verified_marks}': str(data['B']['16']['industryInteraction']['ver_collaborationMarks']),
+        '{industry_interaction_marks}': str(data['B']['16']['industryInteraction']['verified_marks']),
+
+        # 17. Industry Association
+
+        '{internships_placements_marks}': str(claimed['17']['offers']),
+        '{internships_placements_verified_marks}': str(data['B']['17']['internshipPlacement']['ver_offersMarks']),
+        '{industry_association_marks}': str(data['B']['17']['internshipPlacement']['verified_marks']),
+
+        # Total Section B
+        '{B_total_marks}': str(b_total),
+        '{section_b_total}': str(b_total_verified),
+        '{Prof_B}': str(Prof_B),
+        '{Assoc_B}': str(Assoc_B),
+        '{Assis_B}': str(Assis_B),
+        '{Prof_B_total_marks}': str(Prof_B_total_marks),
+        '{Assoc_B_total_marks}': str(Assoc_B_total_marks),
+        '{Assis_B_total_marks}': str(Assis_B_total_marks),
+        '{Prof_B_total_verified}': str(Prof_B_total_verified),
+        '{Assoc_B_total_verified}': str(Assoc_B_total_verified),
+        '{Assis_B_total_verified}': str(Assis_B_total_verified),
+        '{verf_committee_name}': verifier_name,
+
+        # Section C placeholders
+        '{Prof_qualification_marks}': str(Prof_qualification_marks),
+        '{qualification_marks}': str(qualification_marks),
+        '{training_attended_marks}': str(data['C']['2']['trainingAttended']['marks']),
+        '{training_organized_marks}': str(data['C']['3']['trainingOrganized']['marks']),
+        '{phd_guided_marks}': str(data['C']['4']['phdGuided']['marks']),
+        '{section_c_total}': str(c_total),
+        '{Prof_C}': str(Prof_C),
+        '{Assoc_C}': str(Assoc_C),
+        '{Assis_C}': str(Assis_C),
+        '{Prof_C_total_marks}': str(Prof_C_total_marks),
+        '{Assoc_C_total_marks}': str(Assoc_C_total_marks),
+        '{Assis_C_total_marks}': str(Assis_C_total_marks),
+
+        # New section D (Portfolio details)
+        '{Department_portfolio}': "Not Applicable" if not data['D'].get('departmentLevelPortfolio') else data['D']['departmentLevelPortfolio'],
+        '{Institute_Portfolio}': "Not Applicable" if not data['D'].get('instituteLevelPortfolio') else data['D']['instituteLevelPortfolio'],
+        '{self_awarded_marks}': str(self_awarded_marks),
+        '{hodMarks}': str(hod_marks),
+        '{section_d_total}': str(total_marks_D),
+        '{assDeanDeanMarks}' : str(assDeanDeanMarks),
+        '{assDeanHODMarks}' : str(assDeanHODMarks),
+        '{assTotalMarks}' : str(assTotalMarks),
+        '{assSelfawardedmarks}' : str(assSelfawardedmarks),
+        '{sumMarks_hod_dean}' : str(sumMarks_hod_dean),
+
+
+        # Section E placeholders
+        # '{section_E_total}': str(data['E']['total_marks']),
+        '{section_E_total}': str(data.get('E', {}).get('total_marks', 0)),
+        '{extra_marks}' : str(extraMarks),
+        # Grand total
+        '{total_for_C}' : str(round(data['C']['total_marks'])),
+        '{total_for_B}' : str(round(data['B']['total_marks'])),
+        '{total_for_A}' : str(round(data['A']['total_marks'])),
+        '{total_for_D}' : str(round(data['D']['total_marks'])),
+        '{total_for_B_verified}' : str(round(data['B']['final_verified_marks'])),
+        '{grand_total}': str(scores['grand_total']),
+        '{total_for_A_verified}' : str(round(data['A_verified_marks'])),
+        '{total_for_C_verified}' : str(round(data['C_verified_marks'])),
+        '{total_for_D_verified}' : str(round(data['D_verified_marks'])),
+        '{total_for_E_verified}' : str(round(data['E_verified_marks'])),
+        '{grand_verified_marks}': str(scores['grand_verified_marks']),
+    })
+
+    return placeholders
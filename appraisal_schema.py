@@ -0,0 +1,292 @@
+"""
+Declarative layout of the Faculty Self Appraisal form (sections A-E).
+
+Every default structure of the form is derived from the tables below: the empty
+faculty document created by add_user, the defaults each section handler merges
+into a POST, and the field paths PATCH requests may touch.
+"""
+import copy
+
+# Section A: teaching-learning items, keyed as the form numbers them
+SECTION_A_ITEMS = {
+    '1': {"courses": {}},                                       # result analysis
+    '2': {"courses": {}, "semesterScores": {"Sem I": 0, "Sem II": 0}},  # course outcomes
+    '3': {"elearningInstances": 0},                             # e-learning content
+    '4': {"courses": {}},                                       # academic engagement
+    '5': {"weeklyLoadSem1": 0, "weeklyLoadSem2": 0,             # teaching load
+          "adminResponsibility": 0, "cadre": ""},
+    '6': {"projectsGuided": 0},                                 # projects guided
+    '7': {"courses": {}},                                       # student feedback
+    '8': {"ptgMeetings": 0},                                    # PTG meetings
+}
+
+# Section B: research categories and the marks each item earns.
+# A weight is either points per unit, or (points, per) meaning floor(value / per) * points.
+# The item "amount" is a rupee amount stored as amount/proof/ver_amountMarks;
+# every other item is stored as <item>Count/<item>Proof/ver_<item>Marks.
+SECTION_B_CATEGORIES = {
+    '1': ('journalPapers', {'sci': 100, 'esci': 50, 'scopus': 50, 'ugcCare': 10, 'other': 5}),
+    '2': ('conferencePapers', {'scopusWos': 30, 'other': 5}),
+    '3': ('bookChapters', {'scopusWos': 30, 'other': 5}),
+    '4': ('books', {'scopusWos': 100, 'nonIndexed': 30, 'local': 10}),
+    '5': ('citations', {'webOfScience': (3, 3), 'scopus': (3, 3), 'googleScholar': (1, 3)}),
+    '6': ('copyrightIndividual', {'registered': 20, 'granted': 50}),
+    '7': ('copyrightInstitute', {'registered': 40, 'granted': 100}),
+    '8': ('patentIndividual', {'registered': 20, 'published': 30, 'granted': 50, 'commercialized': 100}),
+    '9': ('patentInstitute', {'registered': 40, 'published': 60, 'granted': 100, 'commercialized': 200}),
+    '10': ('researchGrants', {'amount': (10, 200000)}),
+    '11': ('trainingPrograms', {'amount': (5, 10000)}),
+    '12': ('nonResearchGrants', {'amount': (5, 10000)}),
+    '13': ('productDevelopment', {'commercialized': 100, 'developed': 40, 'poc': 10}),
+    '14': ('startup', {'revenueFiftyK': 100, 'fundsFiveLakhs': 100, 'products': 40, 'poc': 10, 'registered': 5}),
+    '15': ('awardsAndFellowships', {'internationalAwards': 30, 'governmentAwards': 20, 'nationalAwards': 5,
+                                    'internationalFellowships': 50, 'nationalFellowships': 30}),
+    '16': ('industryInteraction', {'moUs': 10, 'collaboration': 20}),
+    '17': ('internshipPlacement', {'offers': 10}),
+}
+
+# Section C: self development categories
+SECTION_C_CATEGORIES = {
+    '1': ('qualification', {"pdfCompleted": False, "pdfOngoing": False, "phdAwarded": False}),
+    '2': ('trainingAttended', {"twoWeekProgram": 0, "oneWeekProgram": 0,
+                               "twoToFiveDayProgram": 0, "oneDayProgram": 0}),
+    '3': ('trainingOrganized', {"twoWeekProgram": 0, "oneWeekProgram": 0,
+                                "twoToFiveDayProgram": 0, "oneDayProgram": 0}),
+    '4': ('phdGuided', {"degreesAwarded": 0, "thesisSubmitted": 0, "scholarsGuiding": 0}),
+}
+
+SECTION_D_FIELDS = {
+    "portfolioType": "",
+    "selfAwardedMarks": 0,
+    "deanMarks": 0,
+    "hodMarks": 0,
+    "isMarkHOD": False,
+    "isMarkDean": False,
+    "isAdministrativeRole": False,
+    "administrativeRole": "",
+    "adminSelfAwardedMarks": 0,
+    "directorMarks": 0,
+    "adminDeanMarks": 0,
+    "instituteLevelPortfolio": "",
+    "departmentLevelPortfolio": "",
+    "total_marks": 0,
+    "isFirstTime": True
+}
+
+SECTION_E_FIELDS = {
+    "total_marks": 0,
+    "bullet_points": [],
+    "verified_marks": 0,
+    "verifier_comments": "",
+    "isVerified": False
+}
+
+
+# Fields written by the verification panel, never by the faculty member's own saves
+VERIFIER_FIELDS = {"verified_marks", "final_verified_marks", "verifier_id", "verifier_comments", "isVerified"}
+
+
+# Sections whose save takes only these fields from the faculty member; the rest start from defaults
+FACULTY_FIELDS = {'E': ('total_marks', 'bullet_points')}
+
+
+def is_verifier_field(path):
+    """Whether a field path (tuple of keys) holds a verification result, e.g. B's ver_<item>Marks"""
+    return path[-1] in VERIFIER_FIELDS or path[-1].startswith('ver_')
+
+
+def faculty_entry(section, data):
+    """The part of a posted section a faculty save keeps, see FACULTY_FIELDS"""
+    fields = FACULTY_FIELDS.get(section)
+    if fields is None:
+        return data
+    return {field: data[field] for field in fields if field in data}
+
+
+def item_weight(weight):
+    """Normalize a Section B weight to (points, per)"""
+    return weight if isinstance(weight, tuple) else (weight, 1)
+
+
+def item_fields(item):
+    """Return the (value, proof, verified marks) field names of a Section B item"""
+    if item == 'amount':
+        return 'amount', 'proof', 'ver_amountMarks'
+    return f"{item}Count", f"{item}Proof", f"ver_{item}Marks"
+
+
+def _section_b_defaults():
+    section = {}
+    for key, (category, items) in SECTION_B_CATEGORIES.items():
+        fields = {}
+        for item in items:
+            value_field, proof_field, verified_field = item_fields(item)
+            fields.update({value_field: 0, proof_field: '', verified_field: 0})
+        fields.update({'marks': 0, 'verified_marks': 0})
+        section[key] = {category: fields}
+    section.update({"total_marks": 0, "final_verified_marks": 0, "verifier_id": ""})
+    return section
+
+
+def _categorized_defaults(categories):
+    section = {key: {category: {**fields, "marks": 0}} for key, (category, fields) in categories.items()}
+    section["total_marks"] = 0
+    return section
+
+
+SECTION_DEFAULTS = {
+    'A': {**{key: {**fields, "total_marks": 0} for key, fields in SECTION_A_ITEMS.items()}, "total_marks": 0},
+    'B': _section_b_defaults(),
+    'C': _categorized_defaults(SECTION_C_CATEGORIES),
+    'D': SECTION_D_FIELDS,
+    'E': SECTION_E_FIELDS,
+}
+
+
+def section_defaults(section):
+    """Return a fresh copy of a section's default structure"""
+    return FRESH[section]()
+
+
+def empty_faculty_document(user_id, role):
+    """The document add_user creates for a new faculty member"""
+    document = {
+        "_id": user_id,
+        "status": "pending",
+        "isUpdated": False,
+        "grand_total": {
+            "grand_total": 0,
+            "status": "pending"
+        },
+        **{section: section_defaults(section) for section in SECTION_DEFAULTS}
+    }
+    document["A"]["5"]["cadre"] = role
+    return document
+
+
+# ---------------------------------------------------------------------------
+# Compiled merge and validation
+# ---------------------------------------------------------------------------
+
+def _is_mutable(value):
+    return isinstance(value, (dict, list))
+
+
+def _compile_defaults(defaults, prefix=()):
+    """Return (merge, fresh) functions for one level of a nested defaults dict"""
+    # The defaults are compiled to a literal, so a fresh copy is built at dict-display speed
+    fresh_code = compile(repr(defaults), '<appraisal defaults>', 'eval')
+    scalars = {key: value for key, value in defaults.items() if not _is_mutable(value)}
+    scalar_keys = scalars.keys()
+    containers = [(key, value) for key, value in defaults.items()
+                  if isinstance(value, list) or (isinstance(value, dict) and not value)]
+    nested = [(key,) + _compile_defaults(value, prefix + (key,)) for key, value in defaults.items()
+              if isinstance(value, dict) and value]
+
+    def fresh():
+        return eval(fresh_code)
+
+    def merge(data):
+        # A complete level costs one C-level key-set comparison
+        if not scalar_keys <= data.keys():
+            for key in scalar_keys - data.keys():
+                data[key] = scalars[key]
+        for key, value in containers:
+            if key not in data:
+                data[key] = copy.copy(value)
+        for key, child_merge, child_fresh in nested:
+            value = data.get(key)
+            if value:
+                if not isinstance(value, dict):
+                    raise ValueError(f"{'.'.join(prefix + (key,))}: expected dict, got {type(value).__name__}")
+                child_merge(value)
+            else:
+                data[key] = child_fresh()
+        return data
+
+    return merge, fresh
+
+
+def compile_merge(defaults):
+    """
+    Compile a nested defaults dict into a function that fills in missing keys.
+
+    The function fills the incoming dict in place and returns it. Missing subtrees are
+    built from a precompiled literal; present ones are checked with one key-set
+    comparison per level instead of one Python branch per field. A non-empty value
+    where the defaults hold an object raises ValueError.
+    """
+    return _compile_defaults(defaults)[0]
+
+
+def compile_fresh(defaults):
+    """Compile a nested defaults dict into a function returning a fresh copy of it"""
+    return _compile_defaults(defaults)[1]
+
+
+def _expected_type(value):
+    if isinstance(value, bool):
+        return (bool,)
+    if isinstance(value, (int, float)):
+        return (int, float)
+    return (type(value),)
+
+
+def compile_field_types(defaults, prefix=()):
+    """Flatten a defaults dict into {path tuple: accepted types} for every leaf field"""
+    types = {}
+    for key, value in defaults.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            types.update(compile_field_types(value, path))
+        else:
+            types[path] = _expected_type(value)
+    return types
+
+
+def check_value(path, value, expected):
+    """Return an error string when a value does not match its field type, else None"""
+    # bool is an int subclass, so numbers must reject it explicitly
+    if isinstance(value, expected) and not (isinstance(value, bool) and bool not in expected):
+        return None
+    return f"{'.'.join(path)}: expected {'/'.join(t.__name__ for t in expected)}, got {type(value).__name__}"
+
+
+def compile_validate(defaults):
+    """Compile a defaults dict into a function returning the type errors of a merged payload"""
+    checks = list(compile_field_types(defaults).items())
+
+    def validate(data):
+        errors = []
+        for path, expected in checks:
+            value = data
+            for key in path:
+                if not isinstance(value, dict) or key not in value:
+                    value = None
+                    break
+                value = value[key]
+            if value is None:
+                errors.append(f"{'.'.join(path)}: missing")
+                continue
+            error = check_value(path, value, expected)
+            if error:
+                errors.append(error)
+        return errors
+
+    return validate
+
+
+FRESH = {section: compile_fresh(defaults) for section, defaults in SECTION_DEFAULTS.items()}
+FIELD_TYPES = {section: compile_field_types(defaults) for section, defaults in SECTION_DEFAULTS.items()}
+MERGERS = {section: compile_merge(defaults) for section, defaults in SECTION_DEFAULTS.items()}
+VALIDATORS = {section: compile_validate(defaults) for section, defaults in SECTION_DEFAULTS.items()}
+
+
+def merge_section(section, data):
+    """Fill a posted section with its defaults, in place; raises ValueError on a malformed layout"""
+    return MERGERS[section](data)
+
+
+def validate_section(section, data):
+    """Return a list of type errors for a merged section, empty when valid"""
+    return VALIDATORS[section](data)
@@ -0,0 +1,87 @@
+"""
+Compare per-faculty Section A saves with the batched writes of the bulk import.
+
+Usage:
+    python -m benchmarks.bulk_import --uri mongodb://localhost:27017/fdw_bench --faculty 500
+    python -m benchmarks.bulk_import --in-memory        # smoke run, no network latency
+"""
+import argparse
+import os
+import time
+
+from pymongo import UpdateOne
+
+from appraisal_schema import section_defaults
+
+
+def section_a_payload(index):
+    data = section_defaults('A')
+    data['5'].update({"weeklyLoadSem1": 14 + index % 6, "weeklyLoadSem2": 12 + index % 4, "total_marks": 80})
+    data['7']["total_marks"] = 60
+    data["total_marks"] = 140
+    return data
+
+
+def one_by_one(collection, payloads):
+    # Imported after main() has chosen the servers db_config connects to
+    from section_store import SECTION_SAVE_OPTIONS, save_section
+    for user_id, data in payloads:
+        save_section(collection, user_id, "A", data, **SECTION_SAVE_OPTIONS["A"])
+
+
+def batched(collection, payloads, batch_size):
+    from section_store import SECTION_SAVE_OPTIONS, build_section_update
+    operations = [UpdateOne({"_id": user_id}, build_section_update("A", data, **SECTION_SAVE_OPTIONS["A"]),
+                            upsert=True)
+                  for user_id, data in payloads]
+    for start in range(0, len(operations), batch_size):
+        collection.bulk_write(operations[start:start + batch_size], ordered=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI_BENCH"), help="MongoDB URI of a scratch database")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock instead of a server")
+    parser.add_argument("--faculty", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    # section_store loads db_config through department_summary; keep it off the .env servers
+    os.environ.setdefault("MONGO_URI", args.uri or "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", args.uri or "mongodb://localhost:27017/fdw_bench")
+
+    if args.in_memory:
+        from benchmarks import inmemory
+        inmemory.install()
+        from pymongo import MongoClient
+        client = MongoClient()
+    elif args.uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+    else:
+        parser.error("pass --uri (or set MONGO_URI_BENCH) or --in-memory")
+    import section_store  # noqa: F401  loaded before any timing starts
+
+    db = client.get_database("fdw_bench") if args.in_memory else client.get_default_database("fdw_bench")
+    collection = db.bench_bulk_import
+    collection.drop()
+    payloads = [(f"BENCH{i:04d}", section_a_payload(i)) for i in range(args.faculty)]
+
+    try:
+        results = {}
+        for name, run in (("one save per faculty", lambda: one_by_one(collection, payloads)),
+                          ("unordered bulk_write", lambda: batched(collection, payloads, args.batch_size))):
+            collection.delete_many({})
+            start = time.perf_counter()
+            run()
+            results[name] = time.perf_counter() - start
+    finally:
+        collection.drop()
+
+    print(f"Section A import of {args.faculty} faculty")
+    for name, seconds in results.items():
+        print(f"  {name:<22} {seconds:8.3f} s   {args.faculty / seconds:10.1f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
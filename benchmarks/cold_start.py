@@ -0,0 +1,90 @@
+"""
+Measure serverless cold starts: importing app.py and serving the first request.
+
+Each sample runs in a fresh interpreter, like a new Vercel instance. The run fails
+when the median import time exceeds --max-import-ms, or when a dependency that should
+load lazily is imported at startup, so cold-start regressions are caught.
+
+Usage:
+    python -m benchmarks.cold_start --runs 10
+    python -m benchmarks.cold_start --server        # long-lived server mode, scheduler on
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules only document generation, mail, the cleanup scheduler or the final marks listing need
+LAZY_MODULES = ["docx", "docx2pdf", "pythoncom", "reportlab", "requests", "apscheduler", "mail", "smtplib",
+                "numpy"]
+
+PROBE = """
+import json, sys, threading, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/')
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (served - imported) * 1000,
+    "status": response.status_code,
+    "threads": threading.active_count(),
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+if app.scheduler is not None:
+    app.scheduler.shutdown(wait=False)
+""" % (LAZY_MODULES,)
+
+
+def run_probe(env):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--server", action="store_true", help="Measure long-lived server mode instead")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Fail above this median import time")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # No query runs during startup, so placeholder URIs are enough
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017/fdw_bench_users")
+    env.setdefault("MONGO_URI_FDW", "mongodb://localhost:27017/fdw_bench")
+    if args.server:
+        env.pop("VERCEL", None)
+        env["FDW_SERVERLESS"] = "0"
+    else:
+        env["FDW_SERVERLESS"] = "1"
+
+    samples = [run_probe(env) for _ in range(args.runs)]
+    import_ms = statistics.median(sample["import_ms"] for sample in samples)
+    first_request_ms = statistics.median(sample["first_request_ms"] for sample in samples)
+    loaded = sorted({name for sample in samples for name in sample["loaded"]})
+
+    print(f"Cold start, {'server' if args.server else 'serverless'} mode, {args.runs} fresh interpreters")
+    print(f"  import app:        {import_ms:8.1f} ms (median)")
+    print(f"  first request:     {first_request_ms:8.1f} ms (median)")
+    print(f"  threads at start:  {samples[-1]['threads']}")
+    print(f"  lazy modules loaded at startup: {', '.join(loaded) or 'none'}")
+
+    failed = False
+    if not args.server and loaded:
+        print("FAIL: lazily imported dependencies were loaded during a serverless start")
+        failed = True
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"FAIL: median import time above {args.max_import_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare filling the Word report template by re-reading and scanning it with the
+precompiled template in docx_template.
+
+Both fill the same placeholders, and the paragraph text of the two results is
+compared before timing.
+
+The legacy fill takes tens of seconds per report (row.cells is slow on the large
+tables), so it runs --legacy-iterations times only.
+
+Usage:
+    python -m benchmarks.docx_fill --iterations 20 --legacy-iterations 1
+"""
+import argparse
+import time
+
+from docx import Document
+
+from appraisal_report import build_report_data, report_placeholders
+from benchmarks.report_pdf import USER, report_documents
+from docx_template import CompiledTemplate
+
+TEMPLATE = "Faculty Self Appraisal Scheme -PCCoE-24-25.docx"
+
+
+def legacy_fill(placeholders):
+    """The fill loop formerly inlined in fill_template_document"""
+    doc = Document(TEMPLATE)
+    for paragraph in doc.paragraphs:
+        for placeholder, value in placeholders.items():
+            if placeholder in paragraph.text:
+                paragraph.text = paragraph.text.replace(placeholder, value)
+
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    for placeholder, value in placeholders.items():
+                        if placeholder in paragraph.text:
+                            paragraph.text = paragraph.text.replace(placeholder, value)
+    return doc
+
+
+def document_text(doc):
+    lines = [paragraph.text for paragraph in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                lines.extend(paragraph.text for paragraph in cell.paragraphs)
+    return lines
+
+
+def fills_per_second(fill, placeholders, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fill(placeholders)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--legacy-iterations", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    template = CompiledTemplate(TEMPLATE)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"Compiled {TEMPLATE}: {len(template.slots)} slots, "
+          f"{len(template.placeholders)} placeholders, {compile_ms:.1f} ms")
+
+    for name, document in report_documents().items():
+        placeholders = report_placeholders(build_report_data(document), USER, "Verifier Name")
+        if document_text(legacy_fill(placeholders)) != document_text(template.fill(placeholders)):
+            raise SystemExit(f"{name}: compiled template text differs from the legacy fill")
+
+        legacy = fills_per_second(legacy_fill, placeholders, args.legacy_iterations)
+        compiled = fills_per_second(template.fill, placeholders, args.iterations)
+        print(f"  {name:<8} legacy {legacy:8.3f} fills/s ({1000 / legacy:8.1f} ms)   "
+              f"compiled {compiled:8.3f} fills/s ({1000 / compiled:6.1f} ms)   x{compiled / legacy:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Drive the hot endpoints of the real Flask app against an in-memory MongoDB.
+
+Seeds a synthetic institute (departments x faculty, a share of them with filled
+sections) and reports p50/p95 latency, throughput and Mongo operations per request
+for each endpoint. --output writes the same numbers as JSON so runs can be diffed.
+
+Requires mongomock.
+
+Usage:
+    python -m benchmarks.endpoints --departments 4 --faculty 60 --filled 0.8
+    python -m benchmarks.endpoints --only section_post_B,faculty_list --output before.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+from benchmarks import inmemory
+
+BENCH_PASSWORD = "bench-password"
+DESIGNATIONS = ["Faculty"] * 8 + ["HOD", "Associate Dean"]
+ROLES = ["Professor", "Associate Professor", "Assistant Professor"]
+
+
+def seed_institute(app_module, departments, faculty, filled, rng):
+    """Write users, rosters, faculty documents, interaction marks and committees directly"""
+    import bcrypt
+    from appraisal_schema import empty_faculty_document, section_defaults
+    from benchmarks.payloads import large_section_b
+
+    password = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=4))
+    section_b = large_section_b()
+    roster_ids = {}
+
+    for department in departments:
+        collection = app_module.department_collections[department]
+        prefix = re.sub(r'[^A-Z]', '', department.upper())
+        user_ids = [f"{prefix}{index:04d}" for index in range(faculty)]
+        roles = {user_id: rng.choice(ROLES) for user_id in user_ids}
+        roster_ids[department] = user_ids
+
+        app_module.db_users.insert_many([{
+            "_id": user_id, "name": f"Faculty {user_id}", "role": roles[user_id], "dept": department,
+            "desg": rng.choice(DESIGNATIONS), "mail": f"{user_id.lower()}@bench.local", "mob": "9000000000",
+            "isInVerificationPanel": False, "facultyToVerify": {}
+        } for user_id in user_ids])
+        app_module.db_signin.insert_many([{"_id": user_id, "password": password} for user_id in user_ids])
+
+        documents = []
+        interaction_marks = {"_id": "interaction_marks"}
+        for user_id in user_ids:
+            document = empty_faculty_document(user_id, roles[user_id])
+            if rng.random() < filled:
+                document["A"] = section_defaults('A')
+                document["A"]["total_marks"] = rng.randint(150, 300)
+                document["B"] = json.loads(json.dumps(section_b))
+                document["C"]["total_marks"] = rng.randint(0, 100)
+                document["D"]["total_marks"] = rng.randint(0, 100)
+                document["E"]["total_marks"] = rng.randint(0, 50)
+                document["status"] = rng.choice(["pending", "verified", "done", "SentToDirector"])
+                document["grand_verified_marks"] = rng.randint(300, 900)
+                interaction_marks[user_id] = {
+                    "external_marks": {"external_id": "EXT01", "marks": rng.randint(50, 100), "comments": ""},
+                    "dean_marks": {"dean_id": "DEAN01", "marks": rng.randint(50, 100), "comments": ""},
+                    "hod_marks": rng.randint(50, 100),
+                }
+            documents.append(document)
+
+        collection.insert_one({"_id": "lookup", "data": roles})
+        collection.insert_many(documents)
+        collection.insert_one(interaction_marks)
+
+        heads = user_ids[:2]
+        collection.insert_one({"_id": "verification_team",
+                               **{f"{head} (Faculty {head})": [] for head in heads}})
+
+    return roster_ids
+
+
+def build_scenarios(departments, roster_ids):
+    """Return {endpoint name: function(iteration) -> (method, url, json body)}"""
+    from benchmarks.payloads import large_section_b
+
+    section_b = large_section_b()
+
+    def pick(iteration):
+        department = departments[iteration % len(departments)]
+        user_ids = roster_ids[department]
+        return department, user_ids[iteration % len(user_ids)]
+
+    def committee_assignment(iteration):
+        department = departments[iteration % len(departments)]
+        user_ids = roster_ids[department]
+        # Rotate the assigned faculty so every call changes the document
+        start = (iteration * 3) % max(len(user_ids) - 2, 1)
+        assigned = user_ids[2:][start:start + 5]
+        head = user_ids[0]
+        return "POST", f"/{department}/verification-committee/addfaculties", {f"{head} (Faculty {head})": assigned}
+
+    return {
+        "section_post_A": lambda i: ("POST", "/{}/{}/A".format(*pick(i)), {"total_marks": 220}),
+        "section_get_A": lambda i: ("GET", "/{}/{}/A".format(*pick(i)), None),
+        "section_post_B": lambda i: ("POST", "/{}/{}/B".format(*pick(i)), section_b),
+        "section_get_B": lambda i: ("GET", "/{}/{}/B".format(*pick(i)), None),
+        "section_patch_B": lambda i: ("PATCH", "/{}/{}/B".format(*pick(i)),
+                                      {"1.journalPapers.sciCount": i % 5, "total_marks": 1000 + i % 5}),
+        "sections_read": lambda i: ("GET", "/{}/{}/sections?fields=A,C,status,grand_total".format(*pick(i)), None),
+        "faculty_list": lambda i: ("GET", f"/faculty/{departments[i % len(departments)]}", None),
+        "all_faculties": lambda i: ("GET", "/all-faculties", None),
+        "final_marks": lambda i: ("GET", f"/{departments[i % len(departments)]}/all_faculties_final_marks", None),
+        "login": lambda i: ("POST", "/login", {"_id": pick(i)[1], "password": BENCH_PASSWORD}),
+        "committee_assign": committee_assignment,
+    }
+
+
+def run_endpoint(client, counter, scenario, requests):
+    samples = []
+    operations = []
+    statuses = {}
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for iteration in range(requests):
+            method, url, body = scenario(iteration)
+            counter.reset()
+            start = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            samples.append((time.perf_counter() - start) * 1000)
+            operations.append(counter.total)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(samples)
+    return {
+        "requests": requests,
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 3),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "mongo_ops_per_request": round(statistics.mean(operations), 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--departments", type=int, default=4, help="Number of departments (max 8)")
+    parser.add_argument("--faculty", type=int, default=60, help="Faculty per department")
+    parser.add_argument("--filled", type=float, default=0.8, help="Share of faculty with filled sections")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--only", help="Comma separated endpoint names")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    counter = inmemory.install()
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", "mongodb://localhost:27017/fdw_bench")
+    os.environ["FDW_SERVERLESS"] = "1"  # no cleanup scheduler thread during the run
+
+    import app as app_module
+    from db_config import DEPARTMENTS
+    from roster_cache import roster_cache
+
+    rng = random.Random(args.seed)
+    departments = list(DEPARTMENTS)[:max(1, min(args.departments, len(DEPARTMENTS)))]
+    roster_ids = seed_institute(app_module, departments, args.faculty, args.filled, rng)
+    roster_cache.invalidate()
+
+    scenarios = build_scenarios(departments, roster_ids)
+    if args.only:
+        names = [name.strip() for name in args.only.split(',')]
+        unknown = [name for name in names if name not in scenarios]
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+        scenarios = {name: scenarios[name] for name in names}
+
+    client = app_module.app.test_client()
+    results = {name: run_endpoint(client, counter, scenario, args.requests)
+               for name, scenario in scenarios.items()}
+
+    print(f"{len(departments)} departments x {args.faculty} faculty, {args.filled:.0%} filled, "
+          f"{args.requests} requests per endpoint")
+    print(f"  {'endpoint':<18}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}{'ops/req':>10}  statuses")
+    for name, result in results.items():
+        print(f"  {name:<18}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['throughput_rps']:>10.1f}{result['mongo_ops_per_request']:>10.2f}  {result['statuses']}")
+
+    if args.output:
+        report = {
+            "config": {"departments": departments, "faculty_per_department": args.faculty,
+                       "filled": args.filled, "requests": args.requests, "seed": args.seed,
+                       "python": sys.version.split()[0]},
+            "endpoints": results,
+        }
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Compare GET /faculty/<department> with the per-faculty lookups it replaced.
+
+Seeds one department of each size into an in-memory MongoDB, then times the
+endpoint and the former loop (one find_one on the department and one on users per
+roster entry). Every Mongo operation is delayed by --round-trip-ms to stand in for
+the network. The endpoint is walked page by page, PAGE_SIZE_MAX rows at a time, and
+must return the legacy listing in _id order. A few sorts and filters are then walked
+at a small page size and checked against the legacy listing sorted and filtered in
+Python.
+
+Requires mongomock.
+
+Usage:
+    python -m benchmarks.faculty_list --sizes 50 200 1000 --round-trip-ms 0.5
+"""
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import inmemory
+
+
+def legacy_faculty_list(collection, users, roster):
+    """The loop formerly in get_faculty_list: two point lookups per faculty member"""
+    faculty_list = []
+    for user_id, role in roster.items():
+        faculty_data = collection.find_one({"_id": user_id})
+        user_profile = users.find_one({"_id": user_id})
+        if faculty_data and user_profile:
+            faculty_list.append({
+                "_id": user_id,
+                "name": user_profile.get("name", ""),
+                "role": role,
+                "designation": user_profile.get("desg", "Faculty"),
+                "grand_marks": faculty_data.get("grand_total", 0),
+                "grand_verified_marks": faculty_data.get("grand_verified_marks", 0),
+                "status": faculty_data.get("status", "pending")
+            })
+    return faculty_list
+
+
+def walk(client, url):
+    """Every row of a paginated listing, following next_cursor"""
+    rows = []
+    cursor = None
+    while True:
+        response = client.get(f"{url}&cursor={cursor}" if cursor else url)
+        if response.status_code != 200:
+            return None
+        body = response.get_json()
+        rows.extend(body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+def expected_rows(legacy, sort, filters):
+    """The legacy listing filtered and ordered as the endpoint pages it"""
+    field = {"desg": "designation"}.get(sort.lstrip('-'), sort.lstrip('-'))
+    rows = [row for row in legacy
+            if all(str(row[{"desg": "designation"}.get(key, key)]) in values for key, values in filters.items())]
+    return sorted(rows, key=lambda row: (row[field] is not None, row[field] if row[field] is not None else 0,
+                                         row["_id"]), reverse=sort.startswith('-'))
+
+
+def measure(counter, function, repeat):
+    """Return (median ms, operations per call, last result)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        counter.reset()
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), counter.total, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--round-trip-ms", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    counter = inmemory.install(args.round_trip_ms)
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", "mongodb://localhost:27017/fdw_bench")
+    os.environ["FDW_SERVERLESS"] = "1"
+
+    import app as app_module
+    from benchmarks.endpoints import seed_institute
+    from db_config import DEPARTMENTS
+    from pagination import PAGE_SIZE_MAX
+    from roster_cache import roster_cache
+
+    departments = list(DEPARTMENTS)[:len(args.sizes)]
+    if len(departments) < len(args.sizes):
+        parser.error(f"at most {len(DEPARTMENTS)} sizes")
+    rng = random.Random(7)
+    for department, size in zip(departments, args.sizes):
+        seed_institute(app_module, [department], size, 0.8, rng)
+    roster_cache.invalidate()
+    client = app_module.app.test_client()
+
+    failed = False
+    print(f"GET /faculty/<department>, {args.round_trip_ms} ms per Mongo round trip")
+    print(f"  {'faculty':>8}{'legacy ms':>12}{'legacy ops':>12}{'batched ms':>12}{'batched ops':>13}{'speedup':>9}")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        rows = []
+        for department, size in zip(departments, args.sizes):
+            collection = app_module.department_collections[department]
+            roster = roster_cache.get(department, collection)
+            legacy_ms, legacy_ops, legacy = measure(
+                counter, lambda: legacy_faculty_list(collection, app_module.db_users, roster), args.repeat)
+            batched_ms, batched_ops, listing = measure(
+                counter, lambda: walk(client, f"/faculty/{department}?limit={PAGE_SIZE_MAX}"), args.repeat)
+            same = listing == sorted(legacy, key=lambda row: row["_id"])
+            for sort, filters in (("-grand_verified_marks", {}), ("name", {"status": ["done", "pending"]}),
+                                  ("status", {"desg": ["HOD", "Faculty"]}), ("-desg", {})):
+                query = "&".join([f"sort={sort}", "limit=7"] +
+                                 [f"{key}={value}" for key, values in filters.items() for value in values])
+                same = same and walk(client, f"/faculty/{department}?{query}") == \
+                    expected_rows(legacy, sort, filters)
+            rows.append((size, legacy_ms, legacy_ops, batched_ms, batched_ops, same))
+    for size, legacy_ms, legacy_ops, batched_ms, batched_ops, same in rows:
+        print(f"  {size:>8}{legacy_ms:>12.2f}{legacy_ops:>12}{batched_ms:>12.2f}{batched_ops:>13}"
+              f"{legacy_ms / batched_ms:>8.1f}x")
+        if not same:
+            print(f"FAIL: listing of {size} faculty differs from the legacy loop")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Compare GET /<department>/all_faculties_final_marks with the per-faculty loop it replaced.
+
+Two checks per department size:
+  - compute: final_marks called once per faculty member against final_marks_department
+    on the same random inputs, including faculty without reviews or verified marks and
+    totals over the 1000 cap.
+  - endpoint: the listing, walked page by page PAGE_SIZE_MAX rows at a time, against
+    the former loop (one find_one on users and one final_marks call per faculty
+    member) in _id order, with every Mongo operation delayed by --round-trip-ms to
+    stand in for the network.
+Both must produce the same values with the same types, i.e. the same JSON.
+
+Requires mongomock and numpy.
+
+Usage:
+    python -m benchmarks.final_marks --sizes 1000 10000 --round-trip-ms 0.5
+"""
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import inmemory
+
+
+def legacy_final_marks(collection, users, department):
+    """The loop formerly in get_all_faculties_marks, up to its summary"""
+    from scoring import designation_bonus, final_marks, scoring_table
+
+    marks_doc = collection.find_one({"_id": "interaction_marks"})
+    faculty_marks_list = []
+    table = scoring_table()
+    for faculty in collection.find({"status": {"$in": ["done", "SentToDirector"]}}):
+        faculty_id = faculty.get("_id")
+        if faculty_id not in marks_doc:
+            continue
+        marks = marks_doc[faculty_id]
+        user = users.find_one({"_id": faculty_id})
+        if not user:
+            continue
+        designation = user.get("desg", "Faculty")
+        extra_marks = designation_bonus(designation, table)
+        faculty_data = {
+            "faculty_info": {
+                "id": faculty_id,
+                "name": user.get("name", "Unknown"),
+                "designation": designation,
+                "role": user.get("role", "faculty"),
+                "department": department,
+                "status": faculty.get("status", "pending"),
+                "designation_bonus_given": extra_marks > 0,
+                "extra_marks_for_designation": extra_marks
+            },
+            "interaction_marks": {
+                "external": marks.get("external_marks", {"external_id": None, "marks": None, "comments": None}),
+                "dean": marks.get("dean_marks", {"dean_id": None, "marks": None, "comments": None}),
+                "hod": {"marks": marks.get("hod_marks"), "comments": marks.get("hod_comments")}
+            }
+        }
+        interaction_marks = []
+        if marks.get("external_marks", {}).get("marks"):
+            interaction_marks.append(marks["external_marks"]["marks"])
+        if marks.get("dean_marks", {}).get("marks"):
+            interaction_marks.append(marks["dean_marks"]["marks"])
+        if marks.get("hod_marks"):
+            interaction_marks.append(marks["hod_marks"])
+        interaction_avg = sum(interaction_marks) / len(interaction_marks) if interaction_marks else 0
+        faculty_data["interaction_marks"]["average"] = round(interaction_avg, 2)
+        faculty_data["interaction_marks"]["total_reviews"] = len(interaction_marks)
+        if faculty.get("grand_verified_marks"):
+            faculty_data["final_marks"] = final_marks(
+                faculty.get("grand_verified_marks", 0), interaction_avg, extra_marks, table)
+        else:
+            faculty_data["final_marks"] = {**final_marks(0, interaction_avg, extra_marks, table),
+                                           "missing_verified_marks": True}
+        faculty_marks_list.append(faculty_data)
+    return faculty_marks_list
+
+
+# Stored verified marks: ints, floats, missing, and values that hit the 1000 cap with a bonus
+VERIFIED_MARKS = [612, 845, 300, 733.25, 512.5, 899.99, 0, None, 950, 1000, 1040.5, 1100]
+
+
+def random_verified(rng):
+    return rng.choice(VERIFIED_MARKS)
+
+
+def random_review(rng):
+    return rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 1), rng.uniform(0, 100), None])
+
+
+def vary_department(collection, user_ids, rng):
+    """Give the seeded faculty varied statuses, verified marks and partial reviews"""
+    # One update_many per (status, verified marks) group keeps seeding fast at 10k faculty
+    groups = {}
+    for user_id in user_ids:
+        status = rng.choice(["done", "done", "SentToDirector", "verified"])
+        groups.setdefault((status, rng.randrange(len(VERIFIED_MARKS))), []).append(user_id)
+    for (status, verified), ids in groups.items():
+        collection.update_many({"_id": {"$in": ids}}, {"$set": {
+            "status": status, "grand_verified_marks": VERIFIED_MARKS[verified]
+        }})
+
+    interaction_marks = {"_id": "interaction_marks"}
+    for user_id in user_ids:
+        if rng.random() < 0.95:
+            interaction_marks[user_id] = {
+                "external_marks": {"external_id": "EXT01", "marks": random_review(rng), "comments": ""},
+                "dean_marks": {"dean_id": "DEAN01", "marks": random_review(rng), "comments": ""},
+                "hod_marks": random_review(rng),
+            }
+    collection.replace_one({"_id": "interaction_marks"}, interaction_marks)
+
+
+def compute_parity(size, rng, repeat):
+    """Time and compare final_marks per faculty member against final_marks_department"""
+    from scoring import final_marks, final_marks_department, interaction_averages, scoring_table
+
+    table = scoring_table()
+    reviews = [[mark for mark in (random_review(rng) for _ in range(3)) if mark] for _ in range(size)]
+    verified = [random_verified(rng) or 0 for _ in range(size)]
+    bonuses = [rng.choice([0, 0, 0, 50, 100]) for _ in range(size)]
+
+    def loop():
+        averages = [sum(marks) / len(marks) if marks else 0 for marks in reviews]
+        return averages, [final_marks(v, a, b, table) for v, a, b in zip(verified, averages, bonuses)]
+
+    def vectorized():
+        averages = interaction_averages(reviews)
+        return averages, final_marks_department(verified, averages, bonuses, table)
+
+    vectorized()  # Imports numpy, which the endpoint also only does once per process
+    loop_ms, expected = time_call(loop, repeat)
+    vector_ms, actual = time_call(vectorized, repeat)
+    same = repr(expected) == repr(actual)  # repr tells 80 from 80.0
+    return loop_ms, vector_ms, same
+
+
+def time_call(function, repeat, counter=None):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        if counter is not None:
+            counter.reset()
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--round-trip-ms", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    counter = inmemory.install(args.round_trip_ms)
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", "mongodb://localhost:27017/fdw_bench")
+    os.environ["FDW_SERVERLESS"] = "1"
+
+    import app as app_module
+    from benchmarks.endpoints import seed_institute
+    from benchmarks.faculty_list import walk
+    from db_config import DEPARTMENTS
+    from pagination import PAGE_SIZE_MAX
+
+    departments = list(DEPARTMENTS)[:len(args.sizes)]
+    if len(departments) < len(args.sizes):
+        parser.error(f"at most {len(DEPARTMENTS)} sizes")
+    rng = random.Random(25)
+    client = app_module.app.test_client()
+    serialize = app_module.app.json.dumps
+
+    failed = False
+    print("final_marks per faculty vs final_marks_department")
+    print(f"  {'faculty':>8}{'loop ms':>12}{'numpy ms':>12}{'speedup':>9}")
+    for size in args.sizes:
+        loop_ms, vector_ms, same = compute_parity(size, rng, args.repeat)
+        print(f"  {size:>8}{loop_ms:>12.2f}{vector_ms:>12.2f}{loop_ms / vector_ms:>8.1f}x")
+        if not same:
+            print(f"FAIL: final_marks_department differs from final_marks at {size} faculty")
+            failed = True
+
+    print(f"GET /<department>/all_faculties_final_marks, {args.round_trip_ms} ms per Mongo round trip")
+    print(f"  {'faculty':>8}{'legacy ms':>12}{'legacy ops':>12}{'new ms':>12}{'new ops':>10}{'speedup':>9}")
+    rows = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for department, size in zip(departments, args.sizes):
+            roster_ids = seed_institute(app_module, [department], size, 1.0, rng)
+            collection = app_module.department_collections[department]
+            vary_department(collection, roster_ids[department], rng)
+
+            legacy_ms, legacy = time_call(
+                lambda: legacy_final_marks(collection, app_module.db_users, department), args.repeat, counter)
+            legacy_ops = counter.total
+            new_ms, listing = time_call(
+                lambda: walk(client, f"/{department}/all_faculties_final_marks?limit={PAGE_SIZE_MAX}"),
+                args.repeat, counter)
+            new_ops = counter.total
+            same = serialize(listing) == serialize(sorted(legacy, key=lambda row: row["faculty_info"]["id"]))
+            rows.append((size, legacy_ms, legacy_ops, new_ms, new_ops, same))
+    for size, legacy_ms, legacy_ops, new_ms, new_ops, same in rows:
+        print(f"  {size:>8}{legacy_ms:>12.2f}{legacy_ops:>12}{new_ms:>12.2f}{new_ops:>10}"
+              f"{legacy_ms / new_ms:>8.1f}x")
+        if not same:
+            print(f"FAIL: listing of {size} faculty differs from the legacy loop")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
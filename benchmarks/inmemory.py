@@ -0,0 +1,104 @@
+"""
+In-memory MongoDB stand-in for the endpoint benchmarks (requires mongomock).
+
+install() must run before app.py or db_config is imported: it points every client
+the registry creates at one shared mongomock server and counts the collection
+operations each request performs. A round_trip_ms delay can be added to each
+operation to stand in for the network between the app and a real server.
+"""
+import functools
+import threading
+import time
+
+# Collection methods that each cost one round trip against a real server
+COUNTED_METHODS = [
+    "find", "find_one", "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write", "aggregate", "count_documents", "distinct",
+]
+
+
+class OpCounter:
+    """Counts top-level collection operations; calls mongomock makes internally are skipped"""
+
+    def __init__(self, round_trip_ms=0):
+        self.total = 0
+        self.by_method = {}
+        self.round_trip = round_trip_ms / 1000
+        self._local = threading.local()
+        self._lock = threading.Lock()  # requests may fan out to worker threads
+
+    def reset(self):
+        self.total = 0
+        self.by_method = {}
+
+    def wrap(self, name, method):
+        @functools.wraps(method)
+        def counted(*args, **kwargs):
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                with self._lock:
+                    self.total += 1
+                    self.by_method[name] = self.by_method.get(name, 0) + 1
+                if self.round_trip:
+                    time.sleep(self.round_trip)
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return counted
+
+
+def install(round_trip_ms=0):
+    """Route pymongo clients to a shared in-memory server and return its OpCounter"""
+    import mongomock
+    import mongomock.collection
+    import mongomock.gridfs
+    import pymongo
+    from mongomock.store import ServerStore
+
+    server = ServerStore()
+
+    class InMemoryClient(mongomock.MongoClient):
+        def __init__(self, host=None, *args, **kwargs):
+            # Pool options and listeners only apply to real servers
+            kwargs = {key: value for key, value in kwargs.items() if key in ("tz_aware", "document_class")}
+            super().__init__(host, _store=server, **kwargs)
+
+    pymongo.MongoClient = InMemoryClient
+    mongomock.gridfs.enable_gridfs_integration()
+
+    # pymongo 4.11 passes UpdateOne(sort=...) through to bulk builders that predate it
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    mongomock.collection.BulkOperationBuilder.add_update = add_update_without_sort
+
+    # mongomock has no $convert; the grand total pipeline converts section totals to double
+    import mongomock.aggregate
+    handle_conversion = mongomock.aggregate._Parser._handle_type_convertion_operator
+
+    def handle_conversion_with_convert(self, operator, values):
+        if operator != '$convert' or values.get('to') != 'double':
+            return handle_conversion(self, operator, values)
+        try:
+            value = self.parse(values['input'])
+        except KeyError:
+            value = None
+        if value is None:
+            return values.get('onNull')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return values.get('onError')
+
+    mongomock.aggregate._Parser._handle_type_convertion_operator = handle_conversion_with_convert
+
+    counter = OpCounter(round_trip_ms)
+    for name in COUNTED_METHODS:
+        setattr(mongomock.collection.Collection, name,
+                counter.wrap(name, getattr(mongomock.collection.Collection, name)))
+    return counter
@@ -0,0 +1,18 @@
+"""Synthetic appraisal payloads shared by the benchmarks."""
+from appraisal_schema import SECTION_B_CATEGORIES, item_fields, section_defaults
+
+
+def large_section_b(proof_length=400):
+    """A fully populated Section B with long proof links, the worst case for autosave"""
+    proof = "https://drive.google.com/file/d/" + "x" * proof_length
+    data = section_defaults('B')
+    for key, (category, items) in SECTION_B_CATEGORIES.items():
+        fields = data[key][category]
+        for item in items:
+            value_field, proof_field, verified_field = item_fields(item)
+            fields[value_field] = 400000 if item == 'amount' else 3
+            fields[proof_field] = proof
+            fields[verified_field] = 30
+        fields.update({"marks": 90, "verified_marks": 90})
+    data.update({"total_marks": 1500, "final_verified_marks": 1500})
+    return data
@@ -0,0 +1,80 @@
+"""
+Time the reportlab renderer of the appraisal report.
+
+Builds the report data for an empty and a fully populated faculty document, then
+renders each --iterations times. No database is needed. Exits non-zero when the
+median render time of either report exceeds --max-ms (200 ms by default).
+
+Usage:
+    python -m benchmarks.report_pdf --iterations 50
+    python -m benchmarks.report_pdf --output /tmp/report.pdf   # also keep one rendered report
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from appraisal_report import build_report_data, report_placeholders
+from appraisal_schema import empty_faculty_document, section_defaults
+from benchmarks.payloads import large_section_b
+from report_pdf import render_appraisal_pdf
+
+USER = {"_id": "BENCH0001", "name": "Faculty BENCH0001", "role": "Associate Professor",
+        "dept": "Computer", "desg": "HOD"}
+
+
+def report_documents():
+    empty = empty_faculty_document(USER["_id"], USER["role"])
+    filled = empty_faculty_document(USER["_id"], USER["role"])
+    filled["A"] = section_defaults('A')
+    filled["A"]["total_marks"] = 240
+    filled["B"] = large_section_b()
+    filled["D"]["instituteLevelPortfolio"] = "Admissions & Outreach"
+    filled["grand_total"] = {"grand_total": 780, "status": "pending"}
+    return {"empty": empty, "filled": filled}
+
+
+def time_render(document, iterations):
+    """Return (per-report milliseconds, PDF size) including the placeholder computation"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        pdf = render_appraisal_pdf(report_placeholders(build_report_data(document), USER, "Verifier Name"))
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples), len(pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--max-ms", type=float, default=200.0, help="Fail above this median time per report")
+    parser.add_argument("--output", help="Write the populated report to this path")
+    args = parser.parse_args()
+
+    documents = report_documents()
+    # Warm up font metrics and module caches, as a long-lived worker would be
+    render_appraisal_pdf(report_placeholders(build_report_data(documents["empty"]), USER))
+
+    failed = False
+    print(f"reportlab appraisal report, {args.iterations} renders each")
+    for name, document in documents.items():
+        samples, size = time_render(document, args.iterations)
+        median = statistics.median(samples)
+        p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+        print(f"  {name:<8} p50 {median:7.2f} ms   p95 {p95:7.2f} ms   "
+              f"{1000 / median:6.1f} reports/s   {size / 1024:.1f} KiB")
+        failed = failed or median > args.max_ms
+
+    if args.output:
+        with open(args.output, 'wb') as output:
+            output.write(render_appraisal_pdf(
+                report_placeholders(build_report_data(documents["filled"]), USER, "Verifier Name")))
+        print(f"Wrote {args.output}")
+
+    if failed:
+        print(f"FAIL: median render time above {args.max_ms} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
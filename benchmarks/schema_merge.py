@@ -0,0 +1,83 @@
+"""
+Compare the compiled Section B default merge with the nested loops it replaced.
+
+Runs both on a fully empty payload and on a fully populated one.
+
+Usage:
+    python -m benchmarks.schema_merge --iterations 20000
+"""
+import argparse
+import contextlib
+import copy
+import os
+import timeit
+
+from appraisal_schema import SECTION_DEFAULTS, merge_section
+from benchmarks.payloads import large_section_b
+
+# handle_post_B rebuilt its category defaults from a dict literal on every request;
+# compiling the same literal reproduces that cost
+LEGACY_SECTIONS = compile(
+    repr({key: value for key, value in SECTION_DEFAULTS['B'].items() if isinstance(value, dict)}),
+    '<legacy sections>', 'eval'
+)
+
+
+def legacy_merge(data):
+    """The three-level merge loop formerly inlined in handle_post_B, prints included"""
+    sections = eval(LEGACY_SECTIONS)
+    for section, default_data in sections.items():
+        if section not in data:
+            print(f"Adding default value for {section}")
+            data[section] = default_data
+        else:
+            for category, category_data in default_data.items():
+                if category not in data[section]:
+                    print(f"Adding default value for {section} -> {category}")
+                    data[section][category] = category_data
+                else:
+                    for field, default_value in category_data.items():
+                        if field not in data[section][category]:
+                            print(f"Adding default value for {section} - {category} - {field}")
+                            data[section][category][field] = default_value
+    checkData = {"total_marks": 0, "final_verified_marks": 0, "verifier_id": ""}
+    for field, value in checkData.items():
+        if field not in data:
+            print(f"{field} is not present")
+            data[field] = value
+    return data
+
+
+def compiled_merge(data):
+    return merge_section('B', data)
+
+
+def time_merge(merge, payload, iterations):
+    # Each run gets its own copy since both merges mutate their input
+    copies = [copy.deepcopy(payload) for _ in range(iterations)]
+    it = iter(copies)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        seconds = timeit.timeit(lambda: merge(next(it)), number=iterations)
+    return seconds / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    payloads = {"empty": {}, "populated": large_section_b()}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for payload in payloads.values():
+            assert legacy_merge(copy.deepcopy(payload)) == compiled_merge(copy.deepcopy(payload))
+
+    print(f"Section B default merge, {args.iterations} iterations (printing to /dev/null)")
+    for name, payload in payloads.items():
+        legacy = time_merge(legacy_merge, payload, args.iterations)
+        compiled = time_merge(compiled_merge, payload, args.iterations)
+        print(f"  {name:<10} legacy {legacy:8.2f} us   compiled {compiled:8.2f} us   "
+              f"speedup {legacy / compiled:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Time the scoring engine over synthetic departments.
+
+Scores each department once per faculty member with score_faculty, as a loop over
+single requests would, and once with score_department, which marks a faculty x rule
+matrix with NumPy. Both must give the same marks with the same types, i.e. the same
+JSON. Requires numpy; no database is needed.
+
+Usage:
+    python -m benchmarks.scoring --sizes 120 1000 --repeat 5
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from appraisal_schema import SECTION_B_CATEGORIES, empty_faculty_document, item_fields, section_defaults
+from scoring import score_department, score_faculty
+
+ROLES = ["Professor", "Associate Professor", "Assistant Professor"]
+DESIGNATIONS = ["Faculty", "Faculty", "Faculty", "HOD", "Dean", "Associate Dean"]
+
+
+def synthetic_department(size, seed=0):
+    """Return (faculty documents, {id: users document}) with random Section B counts"""
+    rng = random.Random(seed)
+    faculty_docs = []
+    users = {}
+    for index in range(size):
+        user_id = f"BENCH{index:05d}"
+        role = rng.choice(ROLES)
+        document = empty_faculty_document(user_id, role)
+        document["A"] = section_defaults('A')
+        document["A"]["total_marks"] = rng.uniform(0, 300)
+        for key, (category, items) in SECTION_B_CATEGORIES.items():
+            for item in items:
+                value = rng.randint(0, 900000) if item == 'amount' else rng.randint(0, 6)
+                document["B"][key][category][item_fields(item)[0]] = value
+        document["grand_total"] = {"grand_total": rng.uniform(0, 1100), "status": "pending"}
+        document["grand_verified_marks"] = rng.uniform(0, 1000)
+        faculty_docs.append(document)
+        users[user_id] = {"_id": user_id, "role": role, "desg": rng.choice(DESIGNATIONS)}
+    return faculty_docs, users
+
+
+def time_call(function, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'faculty':>8} {'per faculty':>14} {'department':>14} {'speedup':>8}")
+    for size in args.sizes:
+        faculty_docs, users = synthetic_department(size)
+        score_department(faculty_docs[:1], users)  # Imports numpy, once per process like the endpoint
+        single_ms, single = time_call(
+            lambda: {doc["_id"]: score_faculty(doc, users[doc["_id"]]) for doc in faculty_docs}, args.repeat)
+        batch_ms, batch = time_call(lambda: score_department(faculty_docs, users), args.repeat)
+        if repr(single) != repr(batch):  # repr tells 80 from 80.0
+            print(f"FAIL: score_department differs from score_faculty at {size} faculty")
+            failed = True
+        print(f"{size:>8} {single_ms:>11.2f} ms {batch_ms:>11.2f} ms {single_ms / batch_ms:>7.2f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
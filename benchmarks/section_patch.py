@@ -0,0 +1,82 @@
+"""
+Compare a whole-section Section B save with a single-field PATCH.
+
+Reports the request body size and the write latency of each, for an autosave
+that changes one count on a fully populated Section B.
+
+Usage:
+    python -m benchmarks.section_patch --uri mongodb://localhost:27017/fdw_bench
+    python -m benchmarks.section_patch --in-memory        # smoke run, no network latency
+"""
+import argparse
+import json
+import os
+
+from benchmarks.payloads import large_section_b
+from benchmarks.section_save import summarize, time_saves
+
+PATCH_BODY = {"1.journalPapers.sciCount": 4}
+
+
+def full_save(collection, user_id, data):
+    # Imported after main() has chosen the servers db_config connects to
+    from section_store import save_section
+    data["1"]["journalPapers"]["sciCount"] = 4
+    data["total_marks"] = 1600
+    return save_section(collection, user_id, "B", data)
+
+
+def partial_save(collection, user_id, body):
+    from section_store import patch_section, resolve_patch_paths
+    updates, errors = resolve_patch_paths("B", body)
+    if errors:
+        raise ValueError(errors)
+    return patch_section(collection, user_id, "B", updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI_BENCH"), help="MongoDB URI of a scratch database")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock instead of a server")
+    parser.add_argument("--faculty", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--proof-length", type=int, default=400)
+    args = parser.parse_args()
+
+    # section_store loads db_config through department_summary; keep it off the .env servers
+    os.environ.setdefault("MONGO_URI", args.uri or "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", args.uri or "mongodb://localhost:27017/fdw_bench")
+
+    if args.in_memory:
+        from benchmarks import inmemory
+        inmemory.install()
+        from pymongo import MongoClient
+        client = MongoClient()
+    elif args.uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+    else:
+        parser.error("pass --uri (or set MONGO_URI_BENCH) or --in-memory")
+    import section_store  # noqa: F401  loaded before any timing starts
+
+    db = client.get_database("fdw_bench") if args.in_memory else client.get_default_database("fdw_bench")
+    collection = db.bench_section_patch
+    collection.drop()
+
+    user_ids = [f"BENCH{i:04d}" for i in range(args.faculty)]
+    data = large_section_b(args.proof_length)
+    collection.insert_many([{"_id": user_id, "B": data, "status": "pending"} for user_id in user_ids])
+
+    try:
+        full = summarize(time_saves(full_save, collection, user_ids, data, args.rounds))
+        partial = summarize(time_saves(partial_save, collection, user_ids, PATCH_BODY, args.rounds))
+    finally:
+        collection.drop()
+
+    print(f"Section B autosave of one field, {args.faculty} faculty x {args.rounds} rounds")
+    print(f"  POST body:  {len(json.dumps(data)):>7} bytes   {full}")
+    print(f"  PATCH body: {len(json.dumps(PATCH_BODY)):>7} bytes   {partial}")
+
+
+if __name__ == '__main__':
+    main()
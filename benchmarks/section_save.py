@@ -0,0 +1,112 @@
+"""
+Measure the latency saved by single-round-trip section saves on large Section B payloads.
+
+Compares the old save path (lookup read, section update, full document read,
+grand total update) with section_store.save_section.
+
+Usage:
+    python -m benchmarks.section_save --uri mongodb://localhost:27017/fdw_bench
+    python -m benchmarks.section_save --in-memory        # smoke run, no network latency
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.payloads import large_section_b
+from roster_cache import roster_cache
+
+
+def legacy_save(collection, user_id, data):
+    """The four round trips handle_post_B used to make"""
+    lookup = collection.find_one({"_id": "lookup"}).get("data")
+    if user_id not in lookup:
+        raise KeyError(user_id)
+    collection.update_one({"_id": user_id}, {"$set": {"B": data, "isUpdated": True}}, upsert=True)
+    updated_doc = collection.find_one({"_id": user_id})
+    grand_total = sum(float(updated_doc[s]['total_marks']) for s in 'ABCDE' if s in updated_doc)
+    collection.update_one({"_id": user_id},
+                          {"$set": {"grand_total": {"grand_total": grand_total, "status": "pending"}}})
+    return grand_total
+
+
+def single_trip_save(collection, user_id, data):
+    """The current path: cached roster check plus one findAndModify"""
+    # Imported after main() has chosen the servers db_config connects to
+    from section_store import save_section
+    if roster_cache.role_of("bench", collection, user_id) is None:
+        raise KeyError(user_id)
+    return save_section(collection, user_id, "B", data)["grand_total"]
+
+
+def time_saves(save, collection, user_ids, data, rounds):
+    samples = []
+    for _ in range(rounds):
+        for user_id in user_ids:
+            start = time.perf_counter()
+            save(collection, user_id, data)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI_BENCH"), help="MongoDB URI of a scratch database")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock instead of a server")
+    parser.add_argument("--faculty", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--proof-length", type=int, default=400)
+    args = parser.parse_args()
+
+    # section_store loads db_config through department_summary; keep it off the .env servers
+    os.environ.setdefault("MONGO_URI", args.uri or "mongodb://localhost:27017/fdw_bench_users")
+    os.environ.setdefault("MONGO_URI_FDW", args.uri or "mongodb://localhost:27017/fdw_bench")
+
+    if args.in_memory:
+        from benchmarks import inmemory
+        inmemory.install()
+        from pymongo import MongoClient
+        client = MongoClient()
+    elif args.uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+    else:
+        parser.error("pass --uri (or set MONGO_URI_BENCH) or --in-memory")
+    import section_store  # noqa: F401  loaded before any timing starts
+
+    db = client.get_database("fdw_bench") if args.in_memory else client.get_default_database("fdw_bench")
+    collection = db.bench_section_save
+    collection.drop()
+
+    user_ids = [f"BENCH{i:04d}" for i in range(args.faculty)]
+    collection.insert_one({"_id": "lookup", "data": {user_id: "Professor" for user_id in user_ids}})
+    collection.insert_many([
+        {"_id": user_id, "A": {"total_marks": 300}, "C": {"total_marks": 80}, "status": "pending"}
+        for user_id in user_ids
+    ])
+    data = large_section_b(args.proof_length)
+
+    try:
+        legacy = summarize(time_saves(legacy_save, collection, user_ids, data, args.rounds))
+        single = summarize(time_saves(single_trip_save, collection, user_ids, data, args.rounds))
+    finally:
+        collection.drop()
+        roster_cache.invalidate("bench")
+
+    print(f"Section B save, {args.faculty} faculty x {args.rounds} rounds")
+    print(f"  legacy (4 round trips):  {legacy}")
+    print(f"  single round trip:       {single}")
+    print(f"  saved per save (mean):   {round(legacy['mean_ms'] - single['mean_ms'], 3)} ms")
+
+
+if __name__ == '__main__':
+    main()
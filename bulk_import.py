@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+import os
+import time
+
+from flask import Blueprint, jsonify, request
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from appraisal_schema import FIELD_TYPES, faculty_entry, merge_section, validate_section
+from roster_cache import roster_cache
+from section_store import (SECTION_SAVE_OPTIONS, build_patch_update, build_section_update,
+                           resolve_patch_paths)
+
+# Operations sent per bulk_write call to one department collection
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+
+TRUE_VALUES = {"true", "1", "yes", "y"}
+FALSE_VALUES = {"false", "0", "no", "n"}
+
+
+def parse_cell(section, path, text):
+    """Convert a CSV cell to the type its section field expects"""
+    expected = FIELD_TYPES[section].get(tuple(path.split('.')))
+    if expected is None:
+        # Unknown paths are left as text and reported by resolve_patch_paths
+        return text
+    if bool in expected:
+        lowered = text.strip().lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise ValueError(f"{path}: expected true/false, got {text!r}")
+    if int in expected:
+        try:
+            number = float(text)
+        except ValueError:
+            raise ValueError(f"{path}: expected a number, got {text!r}")
+        return int(number) if number.is_integer() else number
+    if expected[0] in (list, dict):
+        return json.loads(text)
+    return text
+
+
+def iter_csv_rows(stream, section):
+    """
+    Yield (row number, department, user_id, field updates, error) from a CSV upload.
+
+    Columns other than department and user_id are dotted paths relative to the
+    section, e.g. 5.weeklyLoadSem1. Empty cells are left untouched.
+    """
+    reader = csv.DictReader(stream)
+    for row_number, row in enumerate(reader, start=1):
+        department = (row.pop("department", None) or "").strip()
+        user_id = (row.pop("user_id", None) or "").strip()
+        try:
+            fields = {path: parse_cell(section, path, text)
+                      for path, text in row.items() if path and text not in (None, "")}
+        except ValueError as e:
+            yield row_number, department, user_id, None, str(e)
+            continue
+        yield row_number, department, user_id, fields, None
+
+
+def iter_jsonl_rows(stream):
+    """
+    Yield (row number, department, user_id, section payload, error) from a JSON-lines upload.
+
+    Each line is {"department": ..., "user_id": ..., "data": {...whole section...}}.
+    """
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, None, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, None, None, "Each line must be a JSON object"
+            continue
+        yield row_number, row.get("department"), row.get("user_id"), row.get("data"), None
+
+
+def create_bulk_import_blueprint(department_collections, summary=None):
+    """
+    Args:
+        department_collections (dict): Department name -> collection
+        summary (DepartmentSummary): Rebuilt for every department an import wrote to
+    """
+    bulk_import_bp = Blueprint('bulk_import', __name__)
+
+    @bulk_import_bp.route('/bulk-import/<section>', methods=['POST'])
+    def bulk_import_section(section):
+        """
+        Apply section payloads for many faculty in one upload.
+
+        The body is streamed row by row: text/csv rows are partial updates of dotted
+        fields, application/x-ndjson rows are whole sections merged with the defaults
+        like the section POST handlers. Valid rows are written with unordered bulk_write
+        batches per department; invalid rows are reported and skipped.
+        """
+        try:
+            if section not in SECTION_SAVE_OPTIONS:
+                return jsonify({"error": "Invalid section"}), 400
+
+            content_type = request.mimetype
+            if content_type == 'text/csv':
+                is_csv = True
+            elif content_type in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+                is_csv = False
+            else:
+                return jsonify({"error": "Send text/csv or application/x-ndjson"}), 415
+
+            options = SECTION_SAVE_OPTIONS[section]
+            stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='' if is_csv else None)
+            rows = iter_csv_rows(stream, section) if is_csv else iter_jsonl_rows(stream)
+
+            started = time.perf_counter()
+            rosters = {}   # department -> roster, refreshed once per import
+            pending = {}   # department -> ([operations], [row numbers])
+            errors = []
+            counts = {"rows": 0, "applied": 0, "unmatched": 0}
+
+            def flush(department):
+                operations, row_numbers = pending.pop(department)
+                try:
+                    result = department_collections[department].bulk_write(operations, ordered=False)
+                    write_errors = []
+                except BulkWriteError as e:
+                    result = None
+                    write_errors = e.details.get("writeErrors", [])
+                    # Rows that neither failed nor matched or upserted a document found no faculty form
+                    applied = e.details.get("nMatched", 0) + len(e.details.get("upserted", []))
+                    counts["applied"] += applied
+                    counts["unmatched"] += len(operations) - len(write_errors) - applied
+                for error in write_errors:
+                    errors.append({"row": row_numbers[error["index"]], "error": error.get("errmsg")})
+                if result is not None:
+                    counts["applied"] += result.matched_count + result.upserted_count
+                    counts["unmatched"] += len(operations) - result.matched_count - result.upserted_count
+
+            for row_number, department, user_id, payload, error in rows:
+                counts["rows"] += 1
+                if error:
+                    errors.append({"row": row_number, "error": error})
+                    continue
+
+                collection = department_collections.get(department)
+                if collection is None:
+                    errors.append({"row": row_number, "error": f"Invalid department: {department}"})
+                    continue
+                if department not in rosters:
+                    rosters[department] = roster_cache.refresh(department, collection) or {}
+                if user_id not in rosters[department]:
+                    errors.append({"row": row_number, "error": f"Invalid user: {user_id}"})
+                    continue
+                if not isinstance(payload, dict) or not payload:
+                    errors.append({"row": row_number, "error": "Empty section data"})
+                    continue
+
+                if is_csv:
+                    updates, row_errors = resolve_patch_paths(section, payload)
+                    operation = UpdateOne({"_id": user_id}, build_patch_update(section, updates, **options))
+                else:
+                    # Verification fields start from their defaults, as in the section POST handlers
+                    entry = faculty_entry(section, payload)
+                    if not entry:
+                        errors.append({"row": row_number, "error": "No faculty fields in section data"})
+                        continue
+                    try:
+                        data = merge_section(section, entry)
+                    except ValueError as e:
+                        errors.append({"row": row_number, "error": str(e)})
+                        continue
+                    row_errors = validate_section(section, data)
+                    operation = UpdateOne({"_id": user_id}, build_section_update(section, data, **options),
+                                          upsert=True)
+                if row_errors:
+                    errors.append({"row": row_number, "error": "; ".join(row_errors)})
+                    continue
+
+                operations, row_numbers = pending.setdefault(department, ([], []))
+                operations.append(operation)
+                row_numbers.append(row_number)
+                if len(operations) >= BULK_IMPORT_BATCH_SIZE:
+                    flush(department)
+
+            for department in list(pending):
+                flush(department)
+
+            # bulk_write does not return the documents, so touched departments are recounted
+            if summary is not None:
+                for department in rosters:
+                    summary.reconcile(department)
+
+            elapsed = time.perf_counter() - started
+            return jsonify({
+                "rows": counts["rows"],
+                "applied": counts["applied"],
+                "unmatched": counts["unmatched"],
+                "failed": len(errors),
+                "errors": errors,
+                "elapsed_seconds": round(elapsed, 3),
+                "rows_per_second": round(counts["rows"] / elapsed, 1) if elapsed else None
+            }), 200
+
+        except Exception as e:
+            print(f"Error in bulk import of section {section}: {str(e)}")
+            return jsonify({"error": str(e)}), 500
+
+    return bulk_import_bp
@@ -1,14 +1,198 @@
-from flask import Flask
-from flask_pymongo import PyMongo
+"""
+Process-wide MongoDB connections.
 
-mongo = PyMongo()
+app.py and every blueprint take their handles from this module instead of building
+their own clients, so the process holds one connection pool (and one set of
+monitor threads) per MongoDB URI.
+
+Pool settings come from the environment:
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_READ_PREFERENCE
+"""
+import os
+import threading
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+
+from request_metrics import request_metrics
+
+load_dotenv()
+
+# Department name -> collection name in the FDW database
+DEPARTMENTS = {
+    "AIML": "AIML",
+    "ASH": "ASH",
+    "Civil": "Civil",
+    "Computer": "Computer",
+    "Computer(Regional)": "Computer_Regional",
+    "ENTC": "ENTC",
+    "IT": "IT",
+    "Mechanical": "Mechanical"
+}
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def pool_options_from_env():
+    """MongoClient keyword arguments for the shared pools"""
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 50),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 60000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        # Fail a request within seconds when the cluster is unreachable, not after pymongo's 30s
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    }
+    wait_queue_timeout = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", None)
+    if wait_queue_timeout is not None:
+        options["waitQueueTimeoutMS"] = wait_queue_timeout
+    socket_timeout = _env_int("MONGO_SOCKET_TIMEOUT_MS", None)
+    if socket_timeout is not None:
+        options["socketTimeoutMS"] = socket_timeout
+    return options
+
+
+class PoolStatsListener(ConnectionPoolListener):
+    """Counts connection pool events per server address"""
+
+    FIELDS = ("created", "closed", "checked_out", "checked_in", "check_out_failed", "cleared")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def _add(self, address, field):
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            counts = self._counts.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(event.address, "cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(event.address, "created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, "closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add(event.address, "check_out_failed")
+
+    def connection_checked_out(self, event):
+        self._add(event.address, "checked_out")
+
+    def connection_checked_in(self, event):
+        self._add(event.address, "checked_in")
+
+    def snapshot(self):
+        """Return {address: counters} including currently open and in-use connections"""
+        with self._lock:
+            return {
+                address: {
+                    **counts,
+                    "open": counts["created"] - counts["closed"],
+                    "in_use": counts["checked_out"] - counts["checked_in"],
+                }
+                for address, counts in self._counts.items()
+            }
+
+
+class MongoHandle:
+    """A shared client and its default database, with the .cx/.db shape of flask_pymongo.PyMongo"""
+
+    def __init__(self, registry, uri):
+        self._registry = registry
+        self.uri = uri
+        self._db = None
+
+    @property
+    def cx(self):
+        return self._registry.client(self.uri)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self.cx.get_default_database()
+        return self._db
+
+
+class ConnectionRegistry:
+    """One MongoClient per URI for the whole process"""
+
+    def __init__(self, options=None, listeners=()):
+        self.options = options if options is not None else pool_options_from_env()
+        self.pool_listener = PoolStatsListener()
+        self.listeners = [self.pool_listener, *listeners]
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def client(self, uri):
+        """Return the shared client for a URI, creating it on first use"""
+        client = self._clients.get(uri)
+        if client is not None:
+            return client
+        with self._lock:
+            if uri not in self._clients:
+                # connect=False defers the monitor threads and the first connection to the first query
+                self._clients[uri] = MongoClient(
+                    uri,
+                    connect=False,
+                    event_listeners=self.listeners,
+                    **self.options
+                )
+            return self._clients[uri]
+
+    def handle(self, uri):
+        return MongoHandle(self, uri)
+
+    def stats(self):
+        """Pool settings and per-server connection counters"""
+        with self._lock:
+            clients = len(self._clients)
+        return {
+            "clients": clients,
+            "options": self.options,
+            "pools": self.pool_listener.snapshot()
+        }
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+# Command events feed the per-route metrics served at /metrics
+registry = ConnectionRegistry(listeners=[request_metrics.listener])
+
+# Handles for the users database (MONGO_URI) and the appraisal database (MONGO_URI_FDW)
+mongo = registry.handle(os.getenv("MONGO_URI"))
+mongo_fdw = registry.handle(os.getenv("MONGO_URI_FDW"))
 
 department_collections = {
-    'Computer': mongo.db.computer,
-    'IT': mongo.db.it,
-    'EnTC': mongo.db.entc,
-    'Mechanical': mongo.db.mechanical,
-    'Civil': mongo.db.civil,
-    'AI&DS': mongo.db.aids,
-    'FE': mongo.db.fe
-}
\ No newline at end of file
+    department: mongo_fdw.db[name] for department, name in DEPARTMENTS.items()
+}
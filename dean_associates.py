@@ -1,24 +1,12 @@
 import logging
 from flask import Blueprint, jsonify
-from flask_pymongo import PyMongo
-from flask import current_app as app
+from db_config import mongo, department_collections
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 dean_associates = Blueprint('dean_associates', __name__)
 
-DEPARTMENTS = {
-    "AIML": "AIML",
-    "ASH": "ASH",
-    "Civil": "Civil",
-    "Computer": "Computer",
-    "Computer(Regional)": "Computer_Regional",
-    "ENTC": "ENTC",
-    "IT": "IT",
-    "Mechanical": "Mechanical"
-}
-
 DEFAULT_STATUS = "pending"
 
 @dean_associates.route('/dean/<dean_id>/associates', methods=['GET'])
@@ -33,28 +21,6 @@ def get_associate_deans(dean_id):
         tuple: JSON response with associate dean information and HTTP status code
     """
     try:
-        mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-        mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": "Database connection failed",
-            "details": str(e)
-        }), 500
-
-    try:
-        department_collections = {
-            "AIML": mongo_fdw.db.AIML,
-            "ASH": mongo_fdw.db.ASH,
-            "Civil": mongo_fdw.db.Civil,
-            "Computer": mongo_fdw.db.Computer,
-            "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-            "ENTC": mongo_fdw.db.ENTC,
-            "IT": mongo_fdw.db.IT,
-            "Mechanical": mongo_fdw.db.Mechanical
-        }
-        # Initialize MongoDB connection
-        
         # Get the lookup document for deans
         lookup_doc = mongo.db.lookup.find_one({"_id": "deans"})
         if not lookup_doc:
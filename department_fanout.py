@@ -0,0 +1,77 @@
+"""
+Concurrent per-department reads for institute-wide endpoints.
+
+fan_out runs one function per department on a shared pool of FANOUT_WORKERS threads
+and waits at most FANOUT_TIMEOUT seconds for all of them. Departments that fail or
+run past the timeout are reported next to the ones that answered, so one slow
+collection degrades the response instead of serializing or failing it. Each call
+runs in a copy of the request's context, so its Mongo commands still count towards
+the request in /metrics.
+
+Settings come from the environment:
+    FANOUT_WORKERS (default 8), FANOUT_TIMEOUT (default 10)
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "8"))
+FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", "10"))
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _pool():
+    # Created on first use so importing the app starts no threads
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+        return _executor
+
+
+def _timed(fetch, name, value):
+    start = time.perf_counter()
+    result = fetch(name, value)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def fan_out(items, fetch, timeout=None):
+    """
+    Call fetch(name, value) for every item of a dict concurrently.
+
+    Args:
+        items (dict): Name -> value, e.g. department_collections
+        fetch (callable): Returns the result for one department
+        timeout (float): Seconds to wait for all calls, FANOUT_TIMEOUT by default
+    Returns:
+        tuple: ({name: result} for the calls that succeeded, in the order of items,
+                {name: {"status": "ok" | "error" | "timeout", "ms": ..., "error": ...}})
+    """
+    started = time.perf_counter()
+    futures = {
+        name: _pool().submit(contextvars.copy_context().run, _timed, fetch, name, value)
+        for name, value in items.items()
+    }
+    wait(futures.values(), timeout=FANOUT_TIMEOUT if timeout is None else timeout)
+
+    results = {}
+    timings = {}
+    for name, future in futures.items():
+        if not future.done():
+            # The call keeps its worker until it returns; its result is dropped
+            timings[name] = {"status": "timeout", "ms": round((time.perf_counter() - started) * 1000, 2)}
+            continue
+        try:
+            result, ms = future.result()
+        except Exception as e:
+            print(f"Fan-out to {name} failed: {str(e)}")
+            timings[name] = {"status": "error", "error": str(e),
+                             "ms": round((time.perf_counter() - started) * 1000, 2)}
+            continue
+        results[name] = result
+        timings[name] = {"status": "ok", "ms": round(ms, 2)}
+    return results, timings
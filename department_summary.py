@@ -0,0 +1,222 @@
+"""
+Per-department dashboard summary, maintained incrementally.
+
+One document per department in department_summaries holds the number of faculty
+forms, the count per workflow status, the sums of grand_total and
+grand_verified_marks, and how many faculty have all interaction reviews in. Every
+writer that changes one of those fields passes the faculty document's values before
+and after the write to department_summary.record(), which applies the difference
+with a single $inc, so GET /<department>/summary answers from one small read.
+
+reconcile() rebuilds a department from its faculty documents. It corrects drift from
+writes that bypass the hooks (bulk imports reconcile when they finish), increments
+lost to a failed request, or float rounding in the sums, and runs every
+DEPARTMENT_SUMMARY_RECONCILE_HOURS with the scheduler.
+
+Settings come from the environment:
+    DEPARTMENT_SUMMARY_RECONCILE_HOURS (default 6)
+"""
+import functools
+import os
+from datetime import datetime
+
+from flask import Blueprint, jsonify
+
+from db_config import mongo_fdw, department_collections
+
+DEPARTMENT_SUMMARY_RECONCILE_HOURS = float(os.getenv("DEPARTMENT_SUMMARY_RECONCILE_HOURS", "6"))
+
+# Faculty document fields the summary is built from
+SUMMARY_PROJECTION = {"status": 1, "grand_total": 1, "grand_verified_marks": 1, "interaction_review_status": 1}
+
+
+def _number(value):
+    # grand_total is a bare number for sections A and E and {"grand_total": ...} for B-D
+    if isinstance(value, dict):
+        value = value.get("grand_total")
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def summary_values(doc):
+    """What one faculty document contributes to its department's summary, or None if it is not a form"""
+    if not doc or doc.get("status") is None:
+        return None
+    return {
+        "status": doc["status"],
+        "grand_total": _number(doc.get("grand_total")),
+        "grand_verified_marks": _number(doc.get("grand_verified_marks")),
+        "reviews_completed": doc.get("interaction_review_status") == "completed",
+    }
+
+
+def _add(inc, values, sign):
+    if values is None:
+        return
+    inc["faculty"] = inc.get("faculty", 0) + sign
+    status_key = f"status.{values['status']}"
+    inc[status_key] = inc.get(status_key, 0) + sign
+    inc["grand_total_sum"] = inc.get("grand_total_sum", 0) + sign * values["grand_total"]
+    inc["grand_verified_sum"] = inc.get("grand_verified_sum", 0) + sign * values["grand_verified_marks"]
+    inc["reviews_completed"] = inc.get("reviews_completed", 0) + sign * int(values["reviews_completed"])
+
+
+class DepartmentSummary:
+    """Keeps one summary document per department in step with the faculty documents"""
+
+    def __init__(self, summaries, department_collections):
+        """
+        Args:
+            summaries (Collection): Where the summary documents are stored, keyed by department
+            department_collections (dict): Department name -> collection, for reconciliation
+        """
+        self.summaries = summaries
+        self.department_collections = department_collections
+
+    def record(self, department, before, after):
+        """
+        Apply the change of one faculty document to its department's summary.
+
+        before and after are the document's summary fields around the write (None when
+        it did not exist). Never raises, so a write is not failed by its summary.
+        """
+        inc = {}
+        _add(inc, summary_values(before), -1)
+        _add(inc, summary_values(after), 1)
+        self._apply(department, inc)
+
+    def recorder(self, department):
+        """on_change callback for section saves, see section_store.save_section"""
+        return functools.partial(self.record, department)
+
+    def transition(self, department, old_status, new_status, count=1):
+        """Move `count` forms between statuses when nothing else in the summary changes"""
+        if not count or old_status == new_status:
+            return
+        inc = {f"status.{new_status}": count}
+        if old_status is None:
+            inc["faculty"] = count
+        else:
+            inc[f"status.{old_status}"] = -count
+        self._apply(department, inc)
+
+    def _apply(self, department, inc):
+        inc = {field: value for field, value in inc.items() if value}
+        if not inc:
+            return
+        try:
+            self.summaries.update_one(
+                {"_id": department},
+                {"$inc": inc, "$set": {"updated_at": datetime.now()}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Summary update for {department} failed: {str(e)}")
+
+    def reconcile(self, department):
+        """Rebuild a department's summary from its faculty documents and return it"""
+        collection = self.department_collections[department]
+        inc = {}
+        for doc in collection.find({"status": {"$exists": True}}, SUMMARY_PROJECTION):
+            _add(inc, summary_values(doc), 1)
+
+        now = datetime.now()
+        summary = {
+            "faculty": inc.get("faculty", 0),
+            "status": {key.split('.', 1)[1]: value for key, value in inc.items()
+                       if key.startswith("status.") and value},
+            "grand_total_sum": inc.get("grand_total_sum", 0.0),
+            "grand_verified_sum": inc.get("grand_verified_sum", 0.0),
+            "reviews_completed": inc.get("reviews_completed", 0),
+            "updated_at": now,
+            "reconciled_at": now,
+        }
+        # Increments that land between the read and this write are lost until the next run
+        self.summaries.replace_one({"_id": department}, summary, upsert=True)
+        summary["_id"] = department
+        return summary
+
+    def reconcile_all(self):
+        """Rebuild every department; returns {department: "ok" or the error}"""
+        results = {}
+        for department in self.department_collections:
+            try:
+                self.reconcile(department)
+                results[department] = "ok"
+            except Exception as e:
+                print(f"Summary reconciliation of {department} failed: {str(e)}")
+                results[department] = str(e)
+        return results
+
+    def get(self, department):
+        """The stored summary, built on first use"""
+        summary = self.summaries.find_one({"_id": department})
+        # Increments applied before the first reconciliation only cover part of the department
+        if summary is None or summary.get("reconciled_at") is None:
+            summary = self.reconcile(department)
+        return summary
+
+
+def summary_response(department, summary):
+    faculty = summary.get("faculty", 0)
+    reviews_completed = summary.get("reviews_completed", 0)
+
+    def average(total):
+        return round(total / faculty, 2) if faculty else 0
+
+    return {
+        "department": department,
+        "faculty": faculty,
+        "status": {status: count for status, count in summary.get("status", {}).items() if count},
+        "grand_total": {
+            "sum": round(summary.get("grand_total_sum", 0), 2),
+            "average": average(summary.get("grand_total_sum", 0)),
+        },
+        "grand_verified_marks": {
+            "sum": round(summary.get("grand_verified_sum", 0), 2),
+            "average": average(summary.get("grand_verified_sum", 0)),
+        },
+        "reviews": {
+            "completed": reviews_completed,
+            "outstanding": faculty - reviews_completed,
+        },
+        "updated_at": summary["updated_at"].isoformat() if summary.get("updated_at") else None,
+        "reconciled_at": summary["reconciled_at"].isoformat() if summary.get("reconciled_at") else None,
+    }
+
+
+department_summary = DepartmentSummary(mongo_fdw.db.department_summaries, department_collections)
+
+
+def create_department_summary_blueprint(summary):
+    """
+    Department dashboard summary and its reconciliation.
+
+    Args:
+        summary (DepartmentSummary): The summaries to expose
+    """
+    department_summary_bp = Blueprint('department_summary', __name__)
+
+    @department_summary_bp.route('/<department>/summary', methods=['GET'])
+    def get_department_summary(department):
+        """Status counts, mark totals and averages and review completion of a department"""
+        try:
+            if department not in summary.department_collections:
+                return jsonify({"error": "Invalid department"}), 400
+            return jsonify(summary_response(department, summary.get(department))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @department_summary_bp.route('/<department>/summary/reconcile', methods=['POST'])
+    def reconcile_department_summary(department):
+        """Rebuild the summary from the faculty documents"""
+        try:
+            if department not in summary.department_collections:
+                return jsonify({"error": "Invalid department"}), 400
+            return jsonify(summary_response(department, summary.reconcile(department))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    return department_summary_bp
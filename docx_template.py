@@ -0,0 +1,100 @@
+"""
+Precompiled DOCX report templates.
+
+A template is parsed once. Placeholders that Word split over several runs are merged into
+their first run, and the run holding each placeholder is recorded. Filling a report then
+clones the parsed document and rewrites only those runs, instead of reading the file and
+scanning every paragraph for every placeholder.
+"""
+import copy
+import re
+import threading
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+PLACEHOLDER = re.compile(r'\{[A-Za-z0-9_]+\}')
+
+
+def _paragraph_elements(document):
+    # Body paragraphs and table cell paragraphs, in document order
+    return list(document.element.body.iter(qn('w:p')))
+
+
+def _merge_split_placeholders(paragraph):
+    """Move every placeholder that spans several runs into its first run, keeping that run's formatting"""
+    while True:
+        runs = paragraph.runs
+        texts = [run.text for run in runs]
+        owners = [index for index, text in enumerate(texts) for _ in text]
+        for match in PLACEHOLDER.finditer(''.join(texts)):
+            first, last = owners[match.start()], owners[match.end() - 1]
+            if first != last:
+                runs[first].text = ''.join(texts[first:last + 1])
+                for run in runs[first + 1:last + 1]:
+                    run.text = ''
+                break
+        else:
+            return
+
+
+class CompiledTemplate:
+    """A parsed DOCX template and the location of each of its placeholders"""
+
+    def __init__(self, path):
+        self.path = path
+        self.document = Document(path)
+        # (paragraph index, run index or None for the whole paragraph, placeholders)
+        self.slots = []
+
+        for paragraph_index, element in enumerate(_paragraph_elements(self.document)):
+            paragraph = Paragraph(element, None)
+            if not PLACEHOLDER.search(paragraph.text):
+                continue
+            if ''.join(run.text for run in paragraph.runs) != paragraph.text:
+                # Text outside plain runs (e.g. inside hyperlinks) is replaced paragraph-wide
+                self.slots.append((paragraph_index, None, tuple(PLACEHOLDER.findall(paragraph.text))))
+                continue
+            _merge_split_placeholders(paragraph)
+            for run_index, run in enumerate(paragraph.runs):
+                found = PLACEHOLDER.findall(run.text)
+                if found:
+                    self.slots.append((paragraph_index, run_index, tuple(found)))
+
+    @property
+    def placeholders(self):
+        return {placeholder for _, _, found in self.slots for placeholder in found}
+
+    def fill(self, placeholders):
+        """
+        Return a new Document with the placeholders replaced.
+
+        Placeholders missing from the dict are left in the text, as before.
+        """
+        document = copy.deepcopy(self.document)
+        elements = _paragraph_elements(document)
+        for paragraph_index, run_index, found in self.slots:
+            paragraph = Paragraph(elements[paragraph_index], None)
+            target = paragraph if run_index is None else paragraph.runs[run_index]
+            text = target.text
+            for placeholder in found:
+                if placeholder in placeholders:
+                    text = text.replace(placeholder, placeholders[placeholder])
+            target.text = text
+        return document
+
+
+_templates = {}
+_lock = threading.Lock()
+
+
+def get_template(path):
+    """Return the compiled template for a path, compiling it on first use"""
+    template = _templates.get(path)
+    if template is not None:
+        return template
+    with _lock:
+        if path not in _templates:
+            _templates[path] = CompiledTemplate(path)
+        return _templates[path]
@@ -1,40 +1,24 @@
-from flask import Blueprint, request, jsonify, Flask
-from flask_pymongo import PyMongo
+from flask import Blueprint, request, jsonify
 from bson.json_util import dumps
 import re
-import os
 import datetime
 import bcrypt
-from mail import send_username_password_mail
+from db_config import mongo, mongo_fdw, department_collections
+from pymongo import ReturnDocument
+from report_prerender import report_prerender
+from department_summary import SUMMARY_PROJECTION, department_summary
+from scoring import (designation_bonus, distribution_by, final_marks_department, interaction_averages,
+                     rank_totals, scoring_table)
+from pagination import PaginationError, filter_ids, page_fields, paginate_query, paginate_rows, parse_page
+from faculty_list import ensure_listing_indexes, find_by_ids
 
-app = Flask(__name__)
 externals = Blueprint('externals', __name__)
 
-
-# MongoDB Configuration
-app.config["MONGO_URI"] = os.getenv("MONGO_URI")
-app.config["MONGO_URI_FDW"] = os.getenv("MONGO_URI_FDW")
-
-mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-
 # Collections
 db_users = mongo.db.users
 db_signin = mongo.db.signin
 
-# Department-based collections in the FDW database
-department_collections = {
-    "AIML": mongo_fdw.db.AIML,
-    "ASH": mongo_fdw.db.ASH,
-    "Civil": mongo_fdw.db.Civil,
-    "Computer": mongo_fdw.db.Computer,
-    "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-    "ENTC": mongo_fdw.db.ENTC,
-    "IT": mongo_fdw.db.IT,
-    "Mechanical": mongo_fdw.db.Mechanical
-}
-
-def check_and_update_review_completion(collection, faculty_id):
+def check_and_update_review_completion(collection, faculty_id, department):
     """Check if all three reviews are present and update status"""
     try:
         # Get marks document
@@ -54,15 +38,18 @@ def check_and_update_review_completion(collection, faculty_id):
 
         if has_external and has_dean and has_hod:
             # Update faculty document status
-            collection.update_one(
+            completion = {
+                "interaction_review_status": "completed",
+                "status": "done"  # Update the main status field
+            }
+            before = collection.find_one_and_update(
                 {"_id": faculty_id},
-                {
-                    "$set": {
-                        "interaction_review_status": "completed",
-                        "status": "done"  # Update the main status field
-                    }
-                }
+                {"$set": completion},
+                projection=SUMMARY_PROJECTION,
+                return_document=ReturnDocument.BEFORE
             )
+            if before is not None:
+                department_summary.record(department, before, {**before, **completion})
 
             # Update interaction_marks document status
             collection.update_one(
@@ -240,6 +227,7 @@ def create_external(department):
         )
 
         # Send credentials via email
+        from mail import send_username_password_mail
         email_sent = send_username_password_mail(
             data['mail'],
             external_id,
@@ -322,6 +310,7 @@ def create_college_external():
         )
 
         # Send credentials via email
+        from mail import send_username_password_mail
         email_sent = send_username_password_mail(
             data['mail'],
             external_id,
@@ -908,7 +897,7 @@ def externalFacultyMarks(department,external_id,faculty_id) :
             },
             array_filters=[{"elem._id": faculty_id}]
         )
-        isCompleted = check_and_update_review_completion(collection, faculty_id)
+        isCompleted = check_and_update_review_completion(collection, faculty_id, department)
         if isCompleted : 
             collection.update_one(
             {"_id": faculty_id},
@@ -916,6 +905,7 @@ def externalFacultyMarks(department,external_id,faculty_id) :
                 "status": "done"
             }}
         )
+            report_prerender.milestone(department, faculty_id, "done")
         return jsonify({"message": "Marks and comments updated successfully"}), 200
     except Exception as e:
         print(f"Error updating marks and comments: {str(e)}")
@@ -955,12 +945,17 @@ def externalAuthorityMarks(department, external_id, faculty_id):
         print("Is Completed: ", isCompleted)
         if isCompleted :
             print("Updating status to done")
-            DeptCollection.update_one(
+            before = DeptCollection.find_one_and_update(
                 {"_id": faculty_id},
                 {"$set": {
                     "status": "done"
-                }}
+                }},
+                projection={"status": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            if before is not None:
+                department_summary.transition(department, before.get("status"), "done")
+            report_prerender.milestone(department, faculty_id, "done")
         else :
             print("Not all reviews completed yet")
         return jsonify({"message": "Marks and comments updated successfully"}), 200
@@ -1017,7 +1012,7 @@ def deanFacultyMarks(department,dean_id,faculty_id,external_id) :
             array_filters=[{"elem._id": faculty_id}],
             upsert=True
         )
-        isCompleted = check_and_update_review_completion(collection, faculty_id)
+        isCompleted = check_and_update_review_completion(collection, faculty_id, department)
         if isCompleted : 
             collection.update_one(
             {"_id": faculty_id},
@@ -1025,6 +1020,7 @@ def deanFacultyMarks(department,dean_id,faculty_id,external_id) :
                 "status": "done"
             }}
         )
+            report_prerender.milestone(department, faculty_id, "done")
         return jsonify({"message": "Marks and comments updated successfully"}), 200
     except Exception as e:
         print(f"Error updating marks and comments: {str(e)}")
@@ -1089,7 +1085,7 @@ def facultyHodMarks(department,external_id, faculty_id):
             }},
             upsert=True
         )
-        isCompleted = check_and_update_review_completion(collection, faculty_id)
+        isCompleted = check_and_update_review_completion(collection, faculty_id, department)
         if isCompleted : 
             collection.update_one(
             {"_id": faculty_id},
@@ -1097,6 +1093,7 @@ def facultyHodMarks(department,external_id, faculty_id):
                 "status": "done"
             }}
         )
+            report_prerender.milestone(department, faculty_id, "done")
         
         return jsonify({"message": "Marks and comments updated successfully"}), 200
     except Exception as e:
@@ -1166,10 +1163,15 @@ def facultyDirectorMarks(department, faculty_id):
         # Mark status as done if all reviews are complete
         isCompleted = check_and_update_authorities_review_completion(collection_marks, faculty_id)
         if isCompleted:
-            collection_dept.update_one(
+            before = collection_dept.find_one_and_update(
                 {"_id": faculty_id},
-                {"$set": {"status": "done"}}
+                {"$set": {"status": "done"}},
+                projection={"status": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            if before is not None:
+                department_summary.transition(department, before.get("status"), "done")
+            report_prerender.milestone(department, faculty_id, "done")
 
         return jsonify({"message": "Director marks and comments updated successfully"}), 200
     except Exception as e:
@@ -1296,10 +1298,56 @@ def get_all_interaction_marks(department, faculty_id):
         print(f"Error retrieving interaction marks: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Sort keys and filters of the paginated final marks listing, by the collection that
+# holds them. total_marks is computed, so that sort pages the computed rows instead
+FINAL_MARKS_SORT_KEYS = ["_id", "name", "status", "total_marks"]
+FINAL_MARKS_FILTER_KEYS = ["status", "role", "desg"]
+FINAL_MARKS_DOC_SORT_FIELDS = {"_id": "_id", "status": "status"}
+FINAL_MARKS_DOC_FILTER_FIELDS = {"status": "status"}
+FINAL_MARKS_USER_SORT_FIELDS = {"name": "name"}
+FINAL_MARKS_USER_FILTER_FIELDS = {"role": "role", "desg": "desg"}
+FINAL_MARKS_SORT_GETTERS = {"total_marks": lambda row: row["final_marks"]["total_marks"]}
+FINAL_MARKS_FILTER_GETTERS = {
+    "status": lambda row: row["faculty_info"]["status"],
+    "role": lambda row: row["faculty_info"]["role"],
+    "desg": lambda row: row["faculty_info"]["designation"],
+}
+# Fields the final marks listing reads from faculty and users documents; names are
+# only read for the faculty on the page
+FINAL_MARKS_PROJECTION = {"status": 1, "grand_verified_marks": 1}
+FINAL_MARKS_USER_PROJECTION = {"desg": 1, "role": 1}
+FINAL_MARKS_NAME_PROJECTION = {"name": 1}
+
+
+def final_marks_page(page, collection, ids):
+    """
+    Ids of one page of the final marks listing, read from Mongo, and the next cursor.
+
+    The page comes from the collection that holds the sort key; filters on the other
+    collection are resolved to ids first. Returns (ids, next cursor, {id: name} for
+    the page when the names were read with it).
+    """
+    ensure_listing_indexes(db_users, FINAL_MARKS_USER_SORT_FIELDS.values())
+    ensure_listing_indexes(collection, FINAL_MARKS_DOC_SORT_FIELDS.values())
+    if page.sort in FINAL_MARKS_USER_SORT_FIELDS:
+        ids = filter_ids(collection, ids, page, FINAL_MARKS_DOC_FILTER_FIELDS)
+        users, next_cursor = paginate_query(
+            db_users, page, FINAL_MARKS_USER_SORT_FIELDS, FINAL_MARKS_USER_FILTER_FIELDS,
+            {"_id": {"$in": ids}}, FINAL_MARKS_NAME_PROJECTION)
+        names = {user["_id"]: user.get("name", "Unknown") for user in users}
+        return [user["_id"] for user in users], next_cursor, names
+    ids = filter_ids(db_users, ids, page, FINAL_MARKS_USER_FILTER_FIELDS)
+    faculty_docs, next_cursor = paginate_query(
+        collection, page, FINAL_MARKS_DOC_SORT_FIELDS, FINAL_MARKS_DOC_FILTER_FIELDS,
+        {"_id": {"$in": ids}}, {"status": 1})  # The next cursor is read from the sort field
+    return [faculty["_id"] for faculty in faculty_docs], next_cursor, None
+
+
 @externals.route('/<department>/all_faculties_final_marks', methods=['GET'])
 def get_all_faculties_marks(department):
     """Get interaction marks and final calculated marks for all faculties"""
     try:
+        page = parse_page(request.args, FINAL_MARKS_SORT_KEYS, FINAL_MARKS_FILTER_KEYS)
         collection = department_collections.get(department)
         if collection is None:
             return jsonify({"error": "Invalid department"}), 400
@@ -1310,24 +1358,30 @@ def get_all_faculties_marks(department):
             return jsonify({
                 "message": "No marks found for any faculty",
                 "department": department,
+                "faculty_count": 0,
                 "data": []
             }), 200
 
-        # Get all faculties with status "done" or "SentToDirector"
-        completed_faculties = list(collection.find({
-            "status": {"$in": ["done", "SentToDirector"]}
-        }))
-        
+        # Get all faculties with status "done" or "SentToDirector", with only the fields the marks use
+        completed_faculties = [
+            faculty for faculty in collection.find(
+                {"status": {"$in": ["done", "SentToDirector"]}}, FINAL_MARKS_PROJECTION
+            )
+            if faculty.get("_id") in marks_doc
+        ]
+        ids = [faculty["_id"] for faculty in completed_faculties]
+        users = {user["_id"]: user for user in db_users.find({"_id": {"$in": ids}}, FINAL_MARKS_USER_PROJECTION)}
+
         faculty_marks_list = []
+        reviews = []
+        verified_marks = []
+        bonuses = []
+        table = scoring_table()
         
         for faculty in completed_faculties:
             faculty_id = faculty.get("_id")
-            # Skip if faculty_id is not in marks document
-            if faculty_id not in marks_doc:
-                continue
-                
             marks = marks_doc[faculty_id]
-            user = db_users.find_one({"_id": faculty_id})
+            user = users.get(faculty_id)
             
             if not user:
                 continue
@@ -1336,20 +1390,14 @@ def get_all_faculties_marks(department):
             designation = user.get("desg", "Faculty")
             
             # Calculate extra marks based on designation
-            extra_marks = 0
-            designation_bonus_given = False
-            if designation == "HOD" or designation == "Dean":
-                extra_marks = 100
-                designation_bonus_given = True
-            elif designation == "Associate Dean":
-                extra_marks = 50
-                designation_bonus_given = True
+            extra_marks = designation_bonus(designation, table)
+            designation_bonus_given = extra_marks > 0
                 
             # Basic faculty info
             faculty_data = {
                 "faculty_info": {
                     "id": faculty_id,
-                    "name": user.get("name", "Unknown"),
+                    "name": "Unknown",  # Filled in for the faculty on the page
                     "designation": designation,
                     "role": user.get("role", "faculty"),
                     "department": department,
@@ -1375,7 +1423,7 @@ def get_all_faculties_marks(department):
                 }
             }
 
-            # Calculate interaction average
+            # Collect the interaction marks given so far
             interaction_marks = []
             if marks.get("external_marks", {}).get("marks"):
                 interaction_marks.append(marks["external_marks"]["marks"])
@@ -1383,65 +1431,33 @@ def get_all_faculties_marks(department):
                 interaction_marks.append(marks["dean_marks"]["marks"])
             if marks.get("hod_marks"):
                 interaction_marks.append(marks["hod_marks"])
-            
-            interaction_avg = sum(interaction_marks) / len(interaction_marks) if interaction_marks else 0
-            faculty_data["interaction_marks"]["average"] = round(interaction_avg, 2)
-            faculty_data["interaction_marks"]["total_reviews"] = len(interaction_marks)
 
-            # Add final marks calculation if grand_verified_marks exists
-            if faculty.get("grand_verified_marks"):
-                verified_marks = faculty.get("grand_verified_marks", 0)
-                # Add extra marks to verified marks based on designation
-                verified_marks_with_bonus = verified_marks + extra_marks
-                
-                # Ensure verified_marks_with_bonus doesn't exceed 1000
-                capped_verified_marks = min(verified_marks_with_bonus, 1000)
-                
-                scaled_verified = (capped_verified_marks / 1000) * 850  # Scale verified marks to 85%
-                scaled_interaction = (interaction_avg / 100) * 150  # Scale interaction to 15%
-                
-                # Calculate total and cap at 1000
-                calculated_total = scaled_verified + scaled_interaction
-                final_total = min(calculated_total, 1000)
-                
-                faculty_data["final_marks"] = {
-                    "verified_marks": verified_marks,
-                    "extra_marks_for_designation": extra_marks,
-                    "verified_marks_with_bonus": verified_marks_with_bonus,
-                    "capped_verified_marks": capped_verified_marks,
-                    "scaled_verified_marks": round(scaled_verified, 2),
-                    "interaction_average": interaction_avg,
-                    "scaled_interaction_marks": round(scaled_interaction, 2),
-                    "calculated_total": round(calculated_total, 2),
-                    "total_marks": round(final_total, 2),
-                    "is_capped_at_1000": final_total == 1000
-                }
-            else:
-                # Add placeholder for faculty without verified marks
-                verified_marks_with_bonus = extra_marks
-                capped_verified_marks = min(verified_marks_with_bonus, 1000)
-                scaled_verified = (capped_verified_marks / 1000) * 850
-                scaled_interaction = (interaction_avg / 100) * 150
-                
-                calculated_total = scaled_verified + scaled_interaction
-                final_total = min(calculated_total, 1000)
-                
-                faculty_data["final_marks"] = {
-                    "verified_marks": 0,
-                    "extra_marks_for_designation": extra_marks,
-                    "verified_marks_with_bonus": verified_marks_with_bonus,
-                    "capped_verified_marks": capped_verified_marks,
-                    "scaled_verified_marks": round(scaled_verified, 2),
-                    "interaction_average": interaction_avg,
-                    "scaled_interaction_marks": round(scaled_interaction, 2),
-                    "calculated_total": round(calculated_total, 2),
-                    "total_marks": round(final_total, 2),
-                    "missing_verified_marks": True,
-                    "is_capped_at_1000": final_total == 1000
-                }
-                
+            reviews.append(interaction_marks)
+            # Faculty without verified marks are scored from 0 and flagged below
+            verified_marks.append(faculty.get("grand_verified_marks") or 0)
+            bonuses.append(extra_marks)
             faculty_marks_list.append(faculty_data)
 
+        # Interaction averages and final marks of the whole department in one vectorized pass
+        averages = interaction_averages(reviews)
+        department_marks = final_marks_department(verified_marks, averages, bonuses, table)
+        for faculty_data, interaction_marks, interaction_avg, marks in zip(
+                faculty_marks_list, reviews, averages, department_marks):
+            faculty_data["interaction_marks"]["average"] = round(interaction_avg, 2)
+            faculty_data["interaction_marks"]["total_reviews"] = len(interaction_marks)
+            if not marks["verified_marks"]:
+                marks["missing_verified_marks"] = True
+            faculty_data["final_marks"] = marks
+
+        # Rank on the final total and describe its spread per role
+        totals = [f["final_marks"]["total_marks"] for f in faculty_marks_list]
+        ranks, percentiles = rank_totals(totals)
+        ranking = {
+            f["faculty_info"]["id"]: {"rank": rank, "percentile": percentile}
+            for f, rank, percentile in zip(faculty_marks_list, ranks, percentiles)
+        }
+        distribution = distribution_by(totals, [f["faculty_info"]["role"] for f in faculty_marks_list])
+
         # Calculate summary statistics
         completed_reviews = sum(1 for f in faculty_marks_list if f["interaction_marks"]["total_reviews"] == 3)
         partial_reviews = sum(1 for f in faculty_marks_list if 0 < f["interaction_marks"]["total_reviews"] < 3)
@@ -1451,11 +1467,36 @@ def get_all_faculties_marks(department):
         designation_bonus_count = sum(1 for f in faculty_marks_list if f["faculty_info"]["designation_bonus_given"])
         capped_marks_count = sum(1 for f in faculty_marks_list if f.get("final_marks", {}).get("is_capped_at_1000", False))
 
+        # The summary covers the whole department; a page only cuts the data
+        total_faculty = len(faculty_marks_list)
+        names = None
+        if page.sort in FINAL_MARKS_SORT_GETTERS:
+            faculty_marks_list, next_cursor = paginate_rows(
+                faculty_marks_list, page, FINAL_MARKS_SORT_GETTERS, FINAL_MARKS_FILTER_GETTERS,
+                id_getter=lambda row: row["faculty_info"]["id"]
+            )
+        else:
+            rows = {f["faculty_info"]["id"]: f for f in faculty_marks_list}
+            page_ids, next_cursor, names = final_marks_page(page, collection, list(rows))
+            faculty_marks_list = [rows[faculty_id] for faculty_id in page_ids]
+        if names is None:
+            users = find_by_ids(db_users, [f["faculty_info"]["id"] for f in faculty_marks_list],
+                                FINAL_MARKS_NAME_PROJECTION)
+            names = {faculty_id: user.get("name", "Unknown") for faculty_id, user in users.items()}
+        for f in faculty_marks_list:
+            f["faculty_info"]["name"] = names.get(f["faculty_info"]["id"], "Unknown")
+
         return jsonify({
             "message": "All faculty marks retrieved successfully",
             "department": department,
-            "total_faculty": len(faculty_marks_list),
+            # The whole department, and the faculty on this page
+            "total_faculty": total_faculty,
+            "faculty_count": len(faculty_marks_list),
             "data": faculty_marks_list,
+            **page_fields(page, next_cursor),
+            # Ranks are over the whole department; only the faculty of this page are listed
+            "ranking": {f["faculty_info"]["id"]: ranking[f["faculty_info"]["id"]] for f in faculty_marks_list},
+            "distribution_by_role": distribution,
             "summary": {
                 "total_reviewed": completed_reviews,
                 "partially_reviewed": partial_reviews,
@@ -1467,6 +1508,8 @@ def get_all_faculties_marks(department):
             }
         }), 200
 
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error retrieving all faculty marks: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1,31 +1,109 @@
-import os
 from datetime import datetime, UTC  # Updated import
-from flask import Blueprint, Flask, jsonify
-from flask_pymongo import PyMongo
+from flask import Blueprint, jsonify, request
 from bson import ObjectId
+from roster_cache import roster_cache
+from department_fanout import fan_out
+from pagination import (PaginationError, filter_ids, keyset_find, merge_pages, page_fields, paginate_query,
+                        parse_page)
+from report_prerender import report_prerender
+from department_summary import department_summary
+from db_config import mongo, department_collections
 
 
 faculty_list = Blueprint('faculty_list', __name__)
 
-app = Flask(__name__)
-# MongoDB Configuration
-app.config["MONGO_URI"] = os.getenv("MONGO_URI")
-app.config["MONGO_URI_FDW"] = os.getenv("MONGO_URI_FDW")
-
-# Initialize MongoDB connections
-mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-
-department_collections = {
-    "AIML": mongo_fdw.db.AIML,
-    "ASH": mongo_fdw.db.ASH,
-    "Civil": mongo_fdw.db.Civil,
-    "Computer": mongo_fdw.db.Computer,
-    "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-    "ENTC": mongo_fdw.db.ENTC,
-    "IT": mongo_fdw.db.IT,
-    "Mechanical": mongo_fdw.db.Mechanical
-}
+# Fields the listings read from department documents and from users; user fields
+# include every sort key, which the next cursor is taken from
+FACULTY_LIST_PROJECTION = {"grand_total": 1, "grand_verified_marks": 1, "status": 1}
+FACULTY_USER_PROJECTION = {"name": 1, "desg": 1, "role": 1, "dept": 1}
+
+
+# Sort keys and filters of the paginated listings, by the collection that holds them.
+# Role filters and the institute's department filter are answered from the rosters.
+FACULTY_DOC_SORT_FIELDS = {"status": "status", "grand_verified_marks": "grand_verified_marks"}
+FACULTY_DOC_FILTER_FIELDS = {"status": "status"}
+FACULTY_USER_SORT_FIELDS = {"_id": "_id", "name": "name", "role": "role", "desg": "desg", "department": "dept"}
+FACULTY_USER_FILTER_FIELDS = {"desg": "desg"}
+DEPARTMENT_FACULTY_SORT_KEYS = ["_id", "name", "role", "desg", "status", "grand_verified_marks"]
+DEPARTMENT_FACULTY_FILTER_KEYS = ["status", "role", "desg"]
+INSTITUTE_FACULTY_SORT_KEYS = ["_id", "name", "role", "desg", "status", "department"]
+INSTITUTE_FACULTY_FILTER_KEYS = ["status", "role", "desg", "department"]
+
+_indexed_collections = set()
+
+
+def ensure_listing_indexes(collection, fields):
+    """(field, _id) indexes behind the listings' sort keys, created once per collection on first use"""
+    key = (collection.database.name, collection.name)
+    if key not in _indexed_collections:
+        for field in fields:
+            if field != "_id":
+                collection.create_index([(field, 1), ("_id", 1)])
+        _indexed_collections.add(key)
+
+
+def find_by_ids(collection, ids, projection):
+    """Return {_id: document} for the given ids, in one $in query"""
+    if not ids:
+        return {}
+    return {document["_id"]: document for document in collection.find({"_id": {"$in": list(ids)}}, projection)}
+
+
+def roster_ids(roster, page):
+    """Roster members that pass the page's role filter"""
+    roles = page.filters.get("role")
+    return [user_id for user_id, role in roster.items() if roles is None or role in roles]
+
+
+def faculty_page(page, collections, ids):
+    """
+    One page of a faculty listing joined from department documents and users.
+
+    The page is read from the collection that holds the sort key, with the filters on
+    the other side resolved to ids first. Members without a department document or a
+    user profile are left out, so a page can come back short.
+
+    Args:
+        collections (dict): Department name -> collection
+        ids (dict): Department name -> candidate faculty ids
+    Returns:
+        tuple: ([(department, user id, department document, user profile)] in page order,
+                next cursor, {department: fan-out timing})
+    """
+    users = mongo.db.users
+    ensure_listing_indexes(users, FACULTY_USER_SORT_FIELDS.values())
+    for collection in collections.values():
+        ensure_listing_indexes(collection, FACULTY_DOC_SORT_FIELDS.values())
+
+    if page.sort in FACULTY_DOC_SORT_FIELDS:
+        candidates = {department: filter_ids(users, ids[department], page, FACULTY_USER_FILTER_FIELDS)
+                      for department in collections}
+        shards, timings = fan_out(collections, lambda department, collection: [
+            {**document, "department": department} for document in keyset_find(
+                collection, page, FACULTY_DOC_SORT_FIELDS, FACULTY_DOC_FILTER_FIELDS,
+                {"_id": {"$in": candidates[department]}}, FACULTY_LIST_PROJECTION)
+        ])
+        faculty_docs, next_cursor = merge_pages(page, shards.values(), FACULTY_DOC_SORT_FIELDS)
+        profiles = find_by_ids(users, [document["_id"] for document in faculty_docs], FACULTY_USER_PROJECTION)
+        rows = [(document["department"], document["_id"], document, profiles.get(document["_id"]))
+                for document in faculty_docs]
+    else:
+        candidates, timings = fan_out(collections, lambda department, collection: filter_ids(
+            collection, ids[department], page, FACULTY_DOC_FILTER_FIELDS))
+        member_of = {user_id: department for department, members in candidates.items() for user_id in members}
+        profiles, next_cursor = paginate_query(
+            users, page, FACULTY_USER_SORT_FIELDS, FACULTY_USER_FILTER_FIELDS,
+            {"_id": {"$in": list(member_of)}}, FACULTY_USER_PROJECTION)
+        on_page = {}
+        for profile in profiles:
+            on_page.setdefault(member_of[profile["_id"]], []).append(profile["_id"])
+        faculty_docs = {}
+        for department, members in on_page.items():
+            faculty_docs.update(find_by_ids(collections[department], members, FACULTY_LIST_PROJECTION))
+        rows = [(member_of[profile["_id"]], profile["_id"], faculty_docs.get(profile["_id"]), profile)
+                for profile in profiles]
+    return [row for row in rows if row[2] and row[3]], next_cursor, timings
+
 
 def calculate_grand_total(data):
     """Calculate grand total and verified marks from all sections"""
@@ -56,56 +134,47 @@ def calculate_grand_total(data):
 
 @faculty_list.route('/faculty/<department>', methods=['GET'])
 def get_faculty_list(department):
+    """One page of a department's faculty with their marks and status (see pagination.py)"""
     try:
+        page = parse_page(request.args, DEPARTMENT_FACULTY_SORT_KEYS, DEPARTMENT_FACULTY_FILTER_KEYS)
+
         # Get the department collection
-        department_collection = {
-            "AIML": mongo_fdw.db.AIML,
-            "ASH": mongo_fdw.db.ASH,
-            "Civil": mongo_fdw.db.Civil,
-            "Computer": mongo_fdw.db.Computer,
-            "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-            "ENTC": mongo_fdw.db.ENTC,
-            "IT": mongo_fdw.db.IT,
-            "Mechanical": mongo_fdw.db.Mechanical
-        }.get(department)
+        department_collection = department_collections.get(department)
 
         if department_collection is None:
             return jsonify({"error": "Invalid department"}), 400
 
-        # Get the lookup document for the department
-        lookup_doc = department_collection.find_one({"_id": "lookup"})
-        if not lookup_doc or "data" not in lookup_doc:
+        # Get the department roster (cached lookup document)
+        roster = roster_cache.get(department, department_collection)
+        if roster is None:
             return jsonify({"error": "No faculty found in department"}), 404
 
-        faculty_list = []
-        
-        # Iterate through faculty in lookup data
-        for user_id, role in lookup_doc["data"].items():
-            # Get faculty data from department collection
-            faculty_data = department_collection.find_one({"_id": user_id})
-            
-            # Get user profile data from users collection
-            user_profile = mongo.db.users.find_one({"_id": user_id})
-
-            if faculty_data and user_profile:
-                faculty_info = {
-                    "_id": user_id,
-                    "name": user_profile.get("name", ""),
-                    "role": role,
-                    "designation": user_profile.get("desg", "Faculty"),  # Added designation field
-                    "grand_marks": faculty_data.get("grand_total", 0),
-                    "grand_verified_marks": faculty_data.get("grand_verified_marks", 0),
-                    "status": faculty_data.get("status", "pending")
-                }
-                faculty_list.append(faculty_info)
+        rows, next_cursor, _ = faculty_page(
+            page, {department: department_collection}, {department: roster_ids(roster, page)})
+        faculty_list = [
+            {
+                "_id": user_id,
+                "name": user_profile.get("name", ""),
+                "role": roster[user_id],
+                "designation": user_profile.get("desg", "Faculty"),  # Added designation field
+                "grand_marks": faculty_data.get("grand_total", 0),
+                "grand_verified_marks": faculty_data.get("grand_verified_marks", 0),
+                "status": faculty_data.get("status", "pending")
+            }
+            for _, user_id, faculty_data, user_profile in rows
+        ]
 
         return jsonify({
             "status": "success",
             "department": department,
+            # Faculty on this page
             "faculty_count": len(faculty_list),
-            "data": faculty_list
+            "data": faculty_list,
+            **page_fields(page, next_cursor)
         }), 200
 
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -116,22 +185,8 @@ def get_faculty_list(department):
 @faculty_list.route('/total_marks/<department>/<faculty_id>', methods=['GET'])
 def get_total_marks(department, faculty_id):
     try:
-        # Access Flask app context for MongoDB connections
-        from flask import current_app as app
-        mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-        mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-        
         # Get the department collection
-        department_collection = {
-            "AIML": mongo_fdw.db.AIML,
-            "ASH": mongo_fdw.db.ASH,
-            "Civil": mongo_fdw.db.Civil,
-            "Computer": mongo_fdw.db.Computer,
-            "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-            "ENTC": mongo_fdw.db.ENTC,
-            "IT": mongo_fdw.db.IT,
-            "Mechanical": mongo_fdw.db.Mechanical
-        }.get(department)
+        department_collection = department_collections.get(department)
 
         if department_collection is None:
             return jsonify({"error": "Invalid department"}), 400
@@ -152,6 +207,7 @@ def get_total_marks(department, faculty_id):
                 "status": "pending"
             }
             department_collection.insert_one(initial_faculty_data)
+            department_summary.record(department, None, initial_faculty_data)
             faculty_data = initial_faculty_data
 
         # Get user profile data
@@ -170,6 +226,9 @@ def get_total_marks(department, faculty_id):
                 "grand_verified_marks": grand_total_data["grand_verified_marks"]
             }}
         )
+        department_summary.record(department, faculty_data, {
+            **faculty_data, "grand_verified_marks": grand_total_data["grand_verified_marks"]
+        })
         
         # Extract section totals and verified marks
         section_totals = {
@@ -211,23 +270,12 @@ def get_total_marks(department, faculty_id):
 @faculty_list.route('/total_marks/<department>/<faculty_id>', methods=['POST'])
 def update_verified_marks(department, faculty_id):
     try:
-        from flask import current_app as app, request
+        from flask import request
         from datetime import datetime, UTC
-        mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-        mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
         
         verified_data = request.get_json()
         
-        department_collection = {
-            "AIML": mongo_fdw.db.AIML,
-            "ASH": mongo_fdw.db.ASH,
-            "Civil": mongo_fdw.db.Civil,
-            "Computer": mongo_fdw.db.Computer,
-            "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-            "ENTC": mongo_fdw.db.ENTC,
-            "IT": mongo_fdw.db.IT,
-            "Mechanical": mongo_fdw.db.Mechanical
-        }.get(department)
+        department_collection = department_collections.get(department)
 
         if department_collection is None:
             return jsonify({"error": "Invalid department"}), 400
@@ -295,6 +343,10 @@ def update_verified_marks(department, faculty_id):
                 }
             }
         )
+        department_summary.record(department, faculty_data, {
+            **faculty_data, "grand_verified_marks": round(grand_verified_total, 2), "status": "verified"
+        })
+        report_prerender.milestone(department, faculty_id, "verified")
 
         return jsonify({
             "status": "success",
@@ -309,42 +361,43 @@ def update_verified_marks(department, faculty_id):
 
 @faculty_list.route('/all-faculties', methods=['GET'])
 def get_all_faculties():
-    """Get faculty information from all departments"""
+    """One page of the faculty of all departments (see pagination.py)"""
     try:
-        all_faculties = []
-        
-        # Iterate through all departments
-        for dept, collection in department_collections.items():
-            # Get the lookup document for the department
-            lookup_doc = collection.find_one({"_id": "lookup"})
-            if not lookup_doc or "data" not in lookup_doc:
-                continue
-
-            # Iterate through faculty in lookup data
-            for user_id, role in lookup_doc["data"].items():
-                # Get faculty data from department collection
-                faculty_data = collection.find_one({"_id": user_id})
-                
-                # Get user profile data from users collection
-                user_profile = mongo.db.users.find_one({"_id": user_id})
-
-                if faculty_data and user_profile:
-                    faculty_info = {
-                        "_id": user_id,
-                        "name": user_profile.get("name", ""),
-                        "department": dept,
-                        "designation": user_profile.get("desg", "Faculty"),
-                        "role": role,
-                        "status": faculty_data.get("status", "pending")
-                    }
-                    all_faculties.append(faculty_info)
+        page = parse_page(request.args, INSTITUTE_FACULTY_SORT_KEYS, INSTITUTE_FACULTY_FILTER_KEYS)
+
+        departments = page.filters.get("department")
+        collections = {name: collection for name, collection in department_collections.items()
+                       if departments is None or name in departments}
+        rosters = {name: roster_cache.get(name, collection) or {} for name, collection in collections.items()}
+
+        # Departments are read concurrently, one query each for the page or its filters
+        rows, next_cursor, timings = faculty_page(
+            page, collections, {name: roster_ids(roster, page) for name, roster in rosters.items()})
+        all_faculties = [
+            {
+                "_id": user_id,
+                "name": user_profile.get("name", ""),
+                "department": dept,
+                "designation": user_profile.get("desg", "Faculty"),
+                "role": rosters[dept][user_id],
+                "status": faculty_data.get("status", "pending")
+            }
+            for dept, user_id, faculty_data, user_profile in rows
+        ]
 
         return jsonify({
             "status": "success",
+            # Faculty on this page
             "faculty_count": len(all_faculties),
-            "data": all_faculties
+            "data": all_faculties,
+            # Departments that failed or timed out are left out of data
+            "partial": any(timing["status"] != "ok" for timing in timings.values()),
+            "departments": timings,
+            **page_fields(page, next_cursor)
         }), 200
 
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error retrieving all faculties: {str(e)}")
         return jsonify({
@@ -1,12 +1,11 @@
 import random
 import string
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from db_config import mongo
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import jwt
-from mail import send_reset_password_mail
 import bcrypt
 
 # Load environment variables
@@ -16,8 +15,7 @@ load_dotenv()
 forgot_password = Blueprint('forgot_password', __name__)
 
 # MongoDB Configuration
-client = MongoClient(os.getenv("MONGO_URI"))
-db = client.get_default_database()
+db = mongo.db
 db_users = db.users
 db_signin = db.signin
 
@@ -49,6 +47,7 @@ def request_password_reset():
         reset_link = f"http://10.10.1.18:5173/reset-password?token={token}"
 
         # Send email with reset link
+        from mail import send_reset_password_mail
         send_reset_password_mail(user_email, reset_link, user['name'])
 
         return jsonify({
@@ -0,0 +1,48 @@
+"""
+HTTP responses that stream GridFS files.
+
+The body is read from fs.chunks one chunk at a time while it is sent. Responses
+carry an ETag and Last-Modified, answer If-None-Match / If-Modified-Since with 304,
+and serve Range requests. Clients revalidate on every use (Cache-Control: no-cache)
+because the same URL can point at a newer report.
+"""
+import io
+
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+
+
+def gridfs_etag(grid_out):
+    """Content validator: the report hash, the stored md5, or the file id"""
+    # GridFS files never change after upload, so the id identifies the content
+    return getattr(grid_out, "report_hash", None) or grid_out.md5 or str(grid_out._id)
+
+
+def gridfs_response(grid_out, download_name, mimetype=None, as_attachment=True, data=None):
+    """
+    Stream a GridOut as a conditional, range-capable response.
+
+    Args:
+        grid_out (GridOut): The file, as returned by fs.get
+        download_name (str): Filename for Content-Disposition
+        mimetype (str): Defaults to the file's content_type
+        data (bytes): The file's content when the caller still holds it, e.g. right after
+            storing it; sent from memory instead of being read back from fs.chunks
+    """
+    if data is not None:
+        body = wrap_file(request.environ, io.BytesIO(data))
+    else:
+        body = wrap_file(request.environ, grid_out, buffer_size=grid_out.chunk_size)
+    response = Response(
+        body,
+        mimetype=mimetype or grid_out.content_type or 'application/octet-stream',
+        direct_passthrough=True
+    )
+    response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline',
+                         filename=download_name)
+    response.content_length = grid_out.length
+    response.set_etag(gridfs_etag(grid_out))
+    response.last_modified = grid_out.upload_date
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=grid_out.length)
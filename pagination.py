@@ -0,0 +1,225 @@
+"""
+Cursor-based pagination, filtering and sorting for listing endpoints.
+
+Every listing is paginated: ?limit= sets the page size, PAGE_SIZE_DEFAULT when it is
+missing and never more than PAGE_SIZE_MAX. Pages are ordered by one sort key
+(?sort=name, ?sort=-name for descending) with _id as the tie-breaker, and continue
+after the last row of the previous page, so records added or removed between
+requests never shift a page. The cursor is an opaque token that encodes that last
+row together with the sort and filters it belongs to.
+
+Listings joined from two collections read the page from the collection that holds
+the sort key, with filters on the other collection resolved to ids first
+(filter_ids). Listings spread over several collections read one page from each and
+merge them (merge_pages).
+
+Settings come from the environment:
+    PAGE_SIZE_DEFAULT (default 50), PAGE_SIZE_MAX (default 200)
+"""
+import base64
+import hashlib
+import json
+import os
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+
+class PaginationError(ValueError):
+    """Invalid limit, sort, filter or cursor; reported as 400"""
+
+
+class Page:
+    """One page request: size, sort key and direction, filters and the position to continue from"""
+
+    __slots__ = ("limit", "sort", "descending", "filters", "after")
+
+    def __init__(self, limit, sort, descending, filters, after=None):
+        self.limit = limit
+        self.sort = sort
+        self.descending = descending
+        self.filters = filters
+        self.after = after  # (sort value, _id) of the previous page's last row
+
+    def _fingerprint(self):
+        query = json.dumps([self.sort, self.descending, self.filters], sort_keys=True, default=str)
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()[:16]
+
+    def cursor_for(self, value, row_id):
+        """Opaque token continuing after a row"""
+        payload = json.dumps({"q": self._fingerprint(), "v": value, "id": row_id}, default=str)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _resume(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            fingerprint, value, row_id = payload["q"], payload["v"], payload["id"]
+        except (ValueError, KeyError, TypeError):
+            raise PaginationError("Invalid cursor")
+        if fingerprint != self._fingerprint():
+            raise PaginationError("Cursor does not match this sort and filter")
+        self.after = (value, row_id)
+
+
+def parse_page(args, sort_keys, filter_keys, default_sort="_id"):
+    """
+    Read a page request from query arguments.
+
+    Args:
+        args (MultiDict): request.args
+        sort_keys (iterable): Accepted values of ?sort=
+        filter_keys (iterable): Accepted filter arguments; each may be given several times
+    """
+    try:
+        limit = int(args.get('limit', PAGE_SIZE_DEFAULT))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+
+    sort = args.get('sort', default_sort)
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in sort_keys:
+        raise PaginationError(f"sort must be one of: {', '.join(sort_keys)}")
+
+    filters = {key: sorted(args.getlist(key)) for key in filter_keys if args.getlist(key)}
+    page = Page(min(limit, PAGE_SIZE_MAX), sort, descending, filters)
+    if args.get('cursor'):
+        page._resume(args['cursor'])
+    return page
+
+
+def _row_key(value, row_id):
+    # Missing values sort first, as MongoDB orders null before other values
+    return (value is not None, value if value is not None else 0, row_id)
+
+
+def paginate_rows(rows, page, sort_getters, filter_getters, id_getter=lambda row: row["_id"]):
+    """
+    Filter, sort and cut one page from rows already in memory.
+
+    Args:
+        sort_getters (dict): Sort key -> function(row) returning the value
+        filter_getters (dict): Filter key -> function(row) returning the value to match
+    Returns:
+        tuple: (rows of the page, next cursor or None)
+    """
+    for key, accepted in page.filters.items():
+        getter = filter_getters[key]
+        rows = [row for row in rows if str(getter(row)) in accepted]
+
+    sort_getter = sort_getters[page.sort]
+    keyed = sorted(((_row_key(sort_getter(row), id_getter(row)), row) for row in rows),
+                   key=lambda item: item[0], reverse=page.descending)
+    if page.after is not None:
+        after = _row_key(*page.after)
+        keyed = [item for item in keyed if (item[0] < after if page.descending else item[0] > after)]
+
+    chunk = keyed[:page.limit]
+    next_cursor = None
+    if len(keyed) > page.limit:
+        last = chunk[-1][1]
+        next_cursor = page.cursor_for(sort_getter(last), id_getter(last))
+    return [row for _, row in chunk], next_cursor
+
+
+def _field_value(document, field):
+    value = document
+    for part in field.split('.'):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _cut(keyed, page, value_of):
+    """Page and next cursor from (row key, row) pairs in page order"""
+    chunk = keyed[:page.limit]
+    next_cursor = None
+    if len(keyed) > page.limit:
+        last = chunk[-1][1]
+        next_cursor = page.cursor_for(value_of(last), last["_id"])
+    return [row for _, row in chunk], next_cursor
+
+
+def keyset_query(page, sort_fields, filter_fields, base_query=None):
+    """
+    Return (query, sort) for reading one page from a collection.
+
+    Args:
+        sort_fields (dict): Sort key -> document field
+        filter_fields (dict): Filter key -> document field, matched with $in. Filters
+            of the page that are not listed belong to another collection and are
+            left to the caller, see filter_ids
+    """
+    clauses = [base_query] if base_query else []
+    for key, accepted in page.filters.items():
+        if key in filter_fields:
+            clauses.append({filter_fields[key]: {"$in": accepted}})
+
+    field = sort_fields[page.sort]
+    if page.after is not None:
+        value, row_id = page.after
+        direction = "$lt" if page.descending else "$gt"
+        if field == "_id":
+            clauses.append({"_id": {direction: row_id}})
+        elif value is None:
+            # Nulls come first ascending and last descending
+            after_null = {field: None, "_id": {direction: row_id}}
+            clauses.append(after_null if page.descending else {"$or": [{field: {"$ne": None}}, after_null]})
+        else:
+            after = [{field: {direction: value}}, {field: value, "_id": {direction: row_id}}]
+            if page.descending:
+                after.append({field: None})
+            clauses.append({"$or": after})
+
+    query = {"$and": clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+    order = -1 if page.descending else 1
+    sort = [(field, order)] if field == "_id" else [(field, order), ("_id", order)]
+    return query, sort
+
+
+def keyset_find(collection, page, sort_fields, filter_fields, base_query=None, projection=None):
+    """Up to limit + 1 documents continuing the page, in page order"""
+    query, sort = keyset_query(page, sort_fields, filter_fields, base_query)
+    return list(collection.find(query, projection).sort(sort).limit(page.limit + 1))
+
+
+def paginate_query(collection, page, sort_fields, filter_fields, base_query=None, projection=None):
+    """Read one page from a collection; returns (documents, next cursor or None)"""
+    field = sort_fields[page.sort]
+    documents = keyset_find(collection, page, sort_fields, filter_fields, base_query, projection)
+    return _cut([(None, document) for document in documents], page, lambda row: _field_value(row, field))
+
+
+def merge_pages(page, shards, sort_fields):
+    """
+    One page from the keyset_find results of several collections with the same page.
+
+    Each shard already holds its first limit + 1 documents, so the first limit + 1 of
+    the merge are among them. Returns (documents, next cursor or None).
+    """
+    field = sort_fields[page.sort]
+    keyed = sorted(((_row_key(_field_value(document, field), document["_id"]), document)
+                    for documents in shards for document in documents),
+                   key=lambda item: item[0], reverse=page.descending)
+    return _cut(keyed, page, lambda row: _field_value(row, field))
+
+
+def filter_ids(collection, ids, page, filter_fields):
+    """
+    Narrow ids to the documents of a collection that pass the page's filters on it.
+
+    Used for the filters of a joined listing that live outside the collection the
+    page is read from. Returns ids unchanged, without a query, when none apply.
+    """
+    clauses = {filter_fields[key]: {"$in": accepted} for key, accepted in page.filters.items()
+               if key in filter_fields}
+    if not clauses:
+        return list(ids)
+    return collection.distinct("_id", {"_id": {"$in": list(ids)}, **clauses})
+
+
+def page_fields(page, next_cursor):
+    """Fields added to a paginated response"""
+    return {"limit": page.limit, "next_cursor": next_cursor, "has_more": next_cursor is not None}
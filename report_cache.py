@@ -0,0 +1,114 @@
+"""
+Content-addressed cache of rendered appraisal reports.
+
+A report is keyed by a SHA-256 of every value printed on it (the placeholders
+computed from sections A-E, the grand totals, the user's name/role/designation
+and the verifier name) plus the renderer. The PDF is stored once in GridFS under
+that key, so a section save that changes nothing on the report still hits the
+cache, and concurrent requests for the same key in one process share one render.
+"""
+import hashlib
+import json
+import threading
+
+# Bump when a layout change should invalidate every cached report
+REPORT_CACHE_VERSION = 1
+
+
+def report_cache_key(placeholders, renderer):
+    """Stable hash of the rendered content: {placeholder: value} and the renderer name"""
+    payload = json.dumps(
+        {"version": REPORT_CACHE_VERSION, "renderer": renderer, "placeholders": placeholders},
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _Render:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ReportCache:
+    """GridFS-backed report store that coalesces concurrent renders of the same key"""
+
+    def __init__(self, fs, files):
+        """
+        Args:
+            fs (GridFS): Where reports are stored
+            files (Collection): The files collection of that GridFS bucket, for the key index
+        """
+        self.fs = fs
+        self.files = files
+        self._indexed = False
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Render
+
+    def _ensure_index(self):
+        # Created on first use rather than at import, to keep cold starts free of round trips
+        if not self._indexed:
+            self.files.create_index("report_hash")
+            self._indexed = True
+
+    def lookup(self, key):
+        """Return the GridFS file id of a cached report, or None"""
+        self._ensure_index()
+        grid_out = self.fs.find_one({"report_hash": key})
+        return grid_out._id if grid_out is not None else None
+
+    def lookup_many(self, keys):
+        """Return {key: GridFS file id} for the keys that are cached, in one query"""
+        if not keys:
+            return {}
+        self._ensure_index()
+        cursor = self.files.find({"report_hash": {"$in": list(keys)}}, {"report_hash": 1})
+        return {document["report_hash"]: document["_id"] for document in cursor}
+
+    def store(self, key, pdf_bytes, **file_fields):
+        """Store a report rendered outside get_or_render and return its file id"""
+        return self.fs.put(pdf_bytes, report_hash=key, **file_fields)
+
+    def get_or_render(self, key, render, **file_fields):
+        """
+        Return (file id, PDF bytes or None, rendered) for a key.
+
+        On a miss, render() is called once per key at a time in this process and its
+        bytes are stored with file_fields. Callers that waited on another thread's
+        render, or hit the cache, get None for the bytes and read the file from GridFS.
+        """
+        file_id = self.lookup(key)
+        if file_id is not None:
+            return file_id, None, False
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = _Render()
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result, None, False
+
+        try:
+            # Another worker process may have stored it since the lookup above
+            file_id = self.lookup(key)
+            pdf_bytes = None
+            if file_id is None:
+                pdf_bytes = render()
+                file_id = self.store(key, pdf_bytes, **file_fields)
+            pending.result = file_id
+            return file_id, pdf_bytes, pdf_bytes is not None
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
@@ -0,0 +1,144 @@
+"""
+Batch export of appraisal reports as a streamed ZIP.
+
+Cached reports are copied from GridFS into the archive in chunks; the others are
+rendered in a pool of REPORT_EXPORT_WORKERS processes (default: the CPU count) and
+added as each one finishes. Only a bounded window of renders is in flight, and every
+chunk is flushed to the response as soon as it is written, so memory stays flat and
+the first bytes go out before the last report is rendered.
+
+The process pool is shared by every export and started on first use with the
+REPORT_EXPORT_START_METHOD start method (default: forkserver where available, else
+spawn), so workers never inherit the web server's threads and Mongo clients.
+
+Settings come from the environment:
+    REPORT_EXPORT_WORKERS (default: CPU count), REPORT_EXPORT_START_METHOD
+"""
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+REPORT_EXPORT_WORKERS = int(os.getenv("REPORT_EXPORT_WORKERS", "0")) or os.cpu_count() or 1
+REPORT_EXPORT_START_METHOD = os.getenv("REPORT_EXPORT_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# Renders queued per worker beyond the one it is running
+EXPORT_WINDOW_PER_WORKER = 2
+
+# Bytes read from GridFS per archive write
+EXPORT_COPY_CHUNK = 256 * 1024
+
+_lock = threading.Lock()
+_render_executor = None
+_word_executor = None
+
+
+def render_pool():
+    """Process pool shared by all exports, replaced if a worker died and broke it"""
+    global _render_executor
+    with _lock:
+        if _render_executor is None or getattr(_render_executor, '_broken', False):
+            _render_executor = ProcessPoolExecutor(
+                max_workers=REPORT_EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context(REPORT_EXPORT_START_METHOD)
+            )
+        return _render_executor
+
+
+def word_pool():
+    """Single thread for Word renders, which cannot run in parallel even across exports"""
+    global _word_executor
+    with _lock:
+        if _word_executor is None:
+            _word_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-export-word')
+        return _word_executor
+
+
+class _ZipBuffer:
+    """Unseekable sink for zipfile; holds only the bytes written since the last take()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield the bytes of a ZIP archive of (name, data) entries.
+
+    data is bytes, or a readable file such as a GridOut, which is copied
+    EXPORT_COPY_CHUNK bytes at a time and closed.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            if isinstance(data, (bytes, bytearray)):
+                archive.writestr(name, data)
+            else:
+                try:
+                    with archive.open(name, 'w') as entry:
+                        for chunk in iter(lambda: data.read(EXPORT_COPY_CHUNK), b''):
+                            entry.write(chunk)
+                            yield buffer.take()
+                finally:
+                    data.close()
+            yield buffer.take()
+    # Central directory
+    yield buffer.take()
+
+
+def render_reportlab_task(task):
+    """Process pool entry point; task is (placeholders, user_id)"""
+    from report_pdf import render_appraisal_pdf
+    return render_appraisal_pdf(task[0])
+
+
+def render_as_completed(executor, render, tasks, window):
+    """
+    Run render(payload) for each (key, payload) task and yield (key, result, error) as they finish.
+
+    At most `window` renders are submitted to the executor at a time. Renders still
+    queued when the caller stops iterating are cancelled; the executor is shared.
+    """
+    tasks = iter(tasks)
+    pending = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                key, payload = task
+                pending[executor.submit(render, payload)] = key
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,307 @@
+"""
+Background report generation jobs.
+
+Jobs are stored in Mongo (report_jobs collection) and executed by a bounded thread
+pool. When the queue already holds REPORT_JOB_QUEUE_DEPTH jobs, new submissions are
+refused with 429 and a Retry-After estimated from recent render times.
+
+Each job is leased to the process that queued or claimed it: a heartbeat thread
+refreshes the lease of every job the process holds several times per
+REPORT_JOB_LEASE_SECONDS, however long the render takes. Jobs whose lease ran out
+because their worker died are claimed again by the next recovery pass, which runs at
+most every REPORT_JOB_RECOVERY_SECONDS on submissions, status reads and heartbeats.
+Finished jobs expire REPORT_JOB_TTL_SECONDS after they finish.
+
+Settings come from the environment:
+    REPORT_JOB_WORKERS (default 2), REPORT_JOB_QUEUE_DEPTH (default 50),
+    REPORT_JOB_LEASE_SECONDS (default 300), REPORT_JOB_MAX_WAIT (default 30),
+    REPORT_JOB_RECOVERY_SECONDS (default 30), REPORT_JOB_TTL_SECONDS (default 604800)
+"""
+import math
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from flask import Blueprint, jsonify, request
+from pymongo import ReturnDocument
+from werkzeug.utils import secure_filename
+
+from gridfs_download import gridfs_response
+
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+REPORT_JOB_QUEUE_DEPTH = int(os.getenv("REPORT_JOB_QUEUE_DEPTH", "50"))
+REPORT_JOB_LEASE_SECONDS = float(os.getenv("REPORT_JOB_LEASE_SECONDS", "300"))
+REPORT_JOB_MAX_WAIT = float(os.getenv("REPORT_JOB_MAX_WAIT", "30"))
+REPORT_JOB_RECOVERY_SECONDS = float(os.getenv("REPORT_JOB_RECOVERY_SECONDS", "30"))
+REPORT_JOB_TTL_SECONDS = int(os.getenv("REPORT_JOB_TTL_SECONDS", "604800"))
+
+FINISHED = ("done", "failed")
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Report queue is full")
+        self.retry_after = retry_after
+
+
+class ReportJobQueue:
+    """Persistent report jobs run by a bounded pool of worker threads"""
+
+    def __init__(self, jobs, run, workers=REPORT_JOB_WORKERS, max_depth=REPORT_JOB_QUEUE_DEPTH,
+                 lease_seconds=REPORT_JOB_LEASE_SECONDS, recovery_seconds=REPORT_JOB_RECOVERY_SECONDS,
+                 ttl_seconds=REPORT_JOB_TTL_SECONDS):
+        """
+        Args:
+            jobs (Collection): Where job state is kept
+            run (callable): run(department, user_id) renders the report and returns its GridFS file id
+        """
+        self.jobs = jobs
+        self.run = run
+        self.workers = workers
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.recovery_seconds = recovery_seconds
+        self.ttl_seconds = ttl_seconds
+        self.owner = uuid.uuid4().hex  # Holder of the leases of the jobs this queue runs
+        self._lock = threading.Lock()
+        self._executor = None
+        self._depth = 0
+        self._events = {}  # job id -> Event set when the job finishes in this process
+        self._average_seconds = 5.0
+        self._last_recovery = None
+        self._indexed = False
+        self._slot_listeners = []
+
+    def _ensure_indexes(self):
+        # Created on first use rather than at import, to keep cold starts free of round trips
+        if not self._indexed:
+            self.jobs.create_index([("status", 1), ("heartbeat", 1)])
+            self.jobs.create_index("finished_at", expireAfterSeconds=self.ttl_seconds)
+            self._indexed = True
+
+    def _pool(self):
+        # Created on first use so importing the app starts no threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report-job')
+                threading.Thread(target=self._heartbeat, name='report-job-heartbeat', daemon=True).start()
+            return self._executor
+
+    def _heartbeat(self):
+        """Keep the leases of this process's jobs fresh and recover abandoned ones"""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                with self._lock:
+                    held = list(self._events)
+                if held:
+                    self.jobs.update_many(
+                        {"_id": {"$in": held}, "owner": self.owner, "status": {"$in": ["queued", "running"]}},
+                        {"$set": {"heartbeat": time.time()}}
+                    )
+                self.recover()
+            except Exception as e:
+                print(f"Report job heartbeat failed: {str(e)}")
+
+    def on_slot_free(self, callback):
+        """Call callback() in the worker thread each time a job finishes and frees its slot"""
+        self._slot_listeners.append(callback)
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up"""
+        return max(1, math.ceil(self._depth / self.workers * self._average_seconds))
+
+    def _reserve(self, max_depth=None):
+        with self._lock:
+            if self._depth >= min(max_depth or self.max_depth, self.max_depth):
+                return False
+            self._depth += 1
+            return True
+
+    def _start(self, job_id):
+        with self._lock:
+            self._events[job_id] = threading.Event()
+        self._pool().submit(self._execute, job_id)
+
+    def submit(self, department, user_id, max_depth=None):
+        """
+        Queue a report and return the job document; raises QueueFull under backpressure.
+
+        max_depth lowers the queue limit for this submission, so background work leaves
+        room for requests made by users.
+        """
+        self.recover()
+        if not self._reserve(max_depth):
+            raise QueueFull(self.retry_after())
+        job = {
+            "_id": uuid.uuid4().hex,
+            "department": department,
+            "user_id": user_id,
+            "status": "queued",
+            "file_id": None,
+            "error": None,
+            "created_at": datetime.now(),
+            "owner": self.owner,
+            "heartbeat": time.time()
+        }
+        try:
+            self.jobs.insert_one(job)
+        except Exception:
+            with self._lock:
+                self._depth -= 1
+            raise
+        self._start(job["_id"])
+        return job
+
+    def _execute(self, job_id):
+        started = time.monotonic()
+        try:
+            job = self.jobs.find_one_and_update(
+                {"_id": job_id, "owner": self.owner, "status": "queued"},
+                {"$set": {"status": "running", "started_at": datetime.now(), "heartbeat": time.time()}},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                print(f"Report job {job_id} was claimed by another worker")
+                return
+            file_id = self.run(job["department"], job["user_id"])
+            self.jobs.update_one(
+                {"_id": job_id, "owner": self.owner},
+                {"$set": {"status": "done", "file_id": str(file_id), "finished_at": datetime.now()}}
+            )
+        except Exception as e:
+            print(f"Report job {job_id} failed: {str(e)}")
+            self.jobs.update_one(
+                {"_id": job_id, "owner": self.owner},
+                {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now()}}
+            )
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._depth -= 1
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+                event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+            for callback in self._slot_listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Report job slot listener failed: {str(e)}")
+
+    def recover(self):
+        """Claim jobs whose worker stopped heartbeating; runs at most every recovery_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_recovery is not None and now - self._last_recovery < self.recovery_seconds:
+                return
+            self._last_recovery = now
+        self._ensure_indexes()
+        while self._reserve():
+            job = self.jobs.find_one_and_update(
+                {"status": {"$in": ["queued", "running"]},
+                 "heartbeat": {"$lt": time.time() - self.lease_seconds}},
+                {"$set": {"status": "queued", "owner": self.owner, "heartbeat": time.time()}},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                with self._lock:
+                    self._depth -= 1
+                return
+            print(f"Resuming report job {job['_id']}")
+            self._start(job["_id"])
+
+    def get(self, job_id, wait=0):
+        """Return the job document, waiting up to `wait` seconds for it to finish"""
+        self.recover()
+        deadline = time.monotonic() + wait
+        with self._lock:
+            event = self._events.get(job_id)
+        if event is not None:
+            event.wait(wait)
+            return self.jobs.find_one({"_id": job_id})
+        while True:
+            # Running in another worker process, or already finished
+            job = self.jobs.find_one({"_id": job_id})
+            if job is None or job["status"] in FINISHED or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(0.5, max(deadline - time.monotonic(), 0)))
+
+
+def job_response(job):
+    body = {
+        "job_id": job["_id"],
+        "department": job["department"],
+        "user_id": job["user_id"],
+        "status": job["status"],
+        "created_at": job["created_at"].isoformat(),
+    }
+    if job["status"] == "done":
+        body["download_url"] = f"/report-jobs/{job['_id']}/download"
+    if job["status"] == "failed":
+        body["error"] = job.get("error")
+    return body
+
+
+def create_report_jobs_blueprint(queue, fs, department_collections):
+    """
+    Job API for report generation.
+
+    Args:
+        queue (ReportJobQueue): Executes the jobs
+        fs (GridFS): Where finished reports are stored
+        department_collections (dict): Department name -> collection, to validate submissions
+    """
+    report_jobs_bp = Blueprint('report_jobs', __name__)
+
+    @report_jobs_bp.route('/<department>/<user_id>/report-jobs', methods=['POST'])
+    def submit_report_job(department, user_id):
+        try:
+            if department not in department_collections:
+                return jsonify({"error": "Invalid department"}), 400
+            job = queue.submit(department, user_id)
+            response = jsonify(job_response(job))
+            response.status_code = 202
+            response.headers['Location'] = f"/report-jobs/{job['_id']}"
+            return response
+        except QueueFull as e:
+            response = jsonify({"error": str(e), "retry_after": e.retry_after})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @report_jobs_bp.route('/report-jobs/<job_id>', methods=['GET'])
+    def get_report_job(job_id):
+        """Job status; ?wait=<seconds> long-polls until the job finishes"""
+        try:
+            wait = min(max(request.args.get('wait', 0, type=float), 0), REPORT_JOB_MAX_WAIT)
+            job = queue.get(job_id, wait)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            return jsonify(job_response(job)), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @report_jobs_bp.route('/report-jobs/<job_id>/download', methods=['GET'])
+    def download_report_job(job_id):
+        try:
+            job = queue.jobs.find_one({"_id": job_id})
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            if job["status"] != "done":
+                return jsonify(job_response(job)), 409
+            return gridfs_response(
+                fs.get(ObjectId(job["file_id"])),
+                secure_filename(f"filled_appraisal_{job['user_id']}.pdf"),
+                mimetype='application/pdf'
+            )
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    return report_jobs_bp
@@ -0,0 +1,272 @@
+"""
+Pure-Python PDF rendering of the Faculty Self Appraisal report.
+
+Lays out the same tables as "Faculty Self Appraisal Scheme -PCCoE-24-25.docx" with
+reportlab, filled from appraisal_report.report_placeholders. Unlike the Word +
+docx2pdf path it needs no Office install and runs on Linux and Vercel.
+"""
+import io
+import re
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+PLACEHOLDER = re.compile(r'\{[A-Za-z0-9_]+\}')
+
+# Cells up to this many characters fit their column without wrapping
+SHORT_CELL = 10
+
+HEADER = [
+    "Pimpri Chinchwad Education Trust's",
+    "Pimpri Chinchwad College of Engineering",
+    "(An Autonomous Institute)",
+    "Permanently Affiliated to Savitribai Phule Pune University)",
+    "Sector No 26, Pradhikaran, Nigdi, Pune",
+    "Self Appraisal Form Faculty Members",
+]
+
+PROFILE = [
+    ["Name of Faculty Member", "{faculty_name}"],
+    ["Designation", "{faculty_designation}"],
+    ["Department", "{faculty_department}"],
+    ["Appraisal Period and Year", "1st April 2024 to 31st March 2025"],
+]
+
+# Each block is (heading, column widths in mm, rows); the first row is the header row
+BLOCKS = [
+    ("Table 'A': Academic Involvement", (14, 108, 20, 38), [
+        ["Sr. No.", "Parameter", "Max. Marks", "Marks Obtained"],
+        ["1", "Average of Result analysis of Courses Taught", "50", "{result_analysis_marks}"],
+        ["2", "Course Outcome of Courses Taught", "50", "{course_outcome_marks}"],
+        ["3", "Development of e-learning contents", "50", "{elearning_content_marks}"],
+        ["4", "Academic Engagement", "50", "{academic_engagement_marks}"],
+        ["5", "Theory / Practical Teaching Load", "50", "{teaching_load_marks}"],
+        ["6", "UG Project / PG Dissertations Guided", "40", "{projects_guided_marks}"],
+        ["7", "Feedback of faculty by student", "100", "{student_feedback_marks}"],
+        ["8", "Conduction of Guardian [PTG] Meetings", "50", "{ptg_meetings_marks}"],
+        ["", "Total of Marks Obtained: Academic Involvement", "", "{section_a_total}"],
+    ]),
+    ("Part A: Obtained Marks Summary", (65, 38, 38, 39), [
+        ["Cadre", "Professor", "Associate Professor", "Assistant Professor"],
+        ["Cadre wise maximum considerable marks", "300", "360", "440"],
+        ["Obtained marks from Academic Involvement", "X = {Prof_A}", "Y = {Assoc_A}", "Z = {Assis_A}"],
+        ["Actual Academic Involvement marks", "X * 0.68 = {Prof_A_total_marks}",
+         "Y * 0.818 = {Assoc_A_total_marks}", "Z = {Assis_A_total_marks}"],
+    ]),
+    ("Table 'B': Research and Development", (14, 96, 35, 35), [
+        ["Sr. No.", "Description", "Marks Obtained", "Marks after Verification"],
+        ["1", "Journal papers indexed in SCI/SCIE", "{sci_papers_marks}", "{sci_papers_verified_marks}"],
+        ["1", "Journal papers indexed in ESCI", "{esci_papers_marks}", "{esci_papers_verified_marks}"],
+        ["1", "Journal papers indexed in Scopus", "{scopus_papers_marks}", "{scopus_papers_verified_marks}"],
+        ["1", "Journal papers indexed in UGC CARE", "{ugc_papers_marks}", "{ugc_papers_verified_marks}"],
+        ["1", "Journal papers in other journals", "{other_papers_marks}", "{other_papers_verified_marks}"],
+        ["2", "Conference papers indexed in Scopus / WoS", "{scopus_conf_marks}", "{scopus_conf_verified_marks}"],
+        ["2", "Other conference papers", "{other_conf_marks}", "{other_conf_verified_marks}"],
+        ["3", "Book chapters indexed in Scopus / WoS", "{scopus_chapter_marks}", "{scopus_chapter_verified_marks}"],
+        ["3", "Other book chapters", "{other_chapter_marks}", "{other_chapter_verified_marks}"],
+        ["4", "Books with international publishers", "{scopus_books_marks}", "{scopus_books_verified_marks}"],
+        ["4", "Books with national publishers", "{national_books_marks}", "{national_books_verified_marks}"],
+        ["4", "Books with local publishers", "{local_books_marks}", "{local_books_verified_marks}"],
+        ["5", "Citations in Web of Science", "{wos_citations_marks}", "{wos_citations_verified_marks}"],
+        ["5", "Citations in Scopus", "{scopus_citations_marks}", "{scopus_citations_verified_marks}"],
+        ["5", "Citations in Google Scholar", "{google_citations_marks}", "{google_citations_verified_marks}"],
+        ["6", "Copyrights registered (individual)", "{individual_copyright_registered_marks}",
+         "{individual_copyright_registered_verified_marks}"],
+        ["6", "Copyrights granted (individual)", "{individual_copyright_granted_marks}",
+         "{individual_copyright_granted_verified_marks}"],
+        ["7", "Copyrights registered (institute)", "{institute_copyright_registered_marks}",
+         "{institute_copyright_registered_verified_marks}"],
+        ["7", "Copyrights granted (institute)", "{institute_copyright_granted_marks}",
+         "{institute_copyright_granted_verified_marks}"],
+        ["8", "Patents registered (individual)", "{individual_patent_registered_marks}",
+         "{individual_patent_registered_verified_marks}"],
+        ["8", "Patents published (individual)", "{individual_patent_published_marks}",
+         "{individual_patent_published_verified_marks}"],
+        ["8", "Patents granted (individual)", "{individual_granted_marks}", "{individual_granted_verified_marks}"],
+        ["8", "Patents commercialized (individual)", "{individual_commercialized_marks}",
+         "{individual_commercialized_verified_marks}"],
+        ["9", "Patents registered (institute)", "{college_patent_registered_marks}",
+         "{college_patent_registered_verified_marks}"],
+        ["9", "Patents published (institute)", "{college_patent_published_marks}",
+         "{college_patent_published_verified_marks}"],
+        ["9", "Patents granted (institute)", "{college_granted_marks}", "{college_granted_verified_marks}"],
+        ["9", "Patents commercialized (institute)", "{college_commercialized_marks}",
+         "{college_commercialized_verified_marks}"],
+        ["10", "Research grants / consultancy / startup funds", "{research_grants_marks}",
+         "{research_grants_verified_marks}"],
+        ["11", "Revenue through training programs", "{training_marks}", "{training_verified_marks}"],
+        ["12", "Non-research / non-consultancy grants", "{nonresearch_grants_marks}",
+         "{nonresearch_grants_verified_marks}"],
+        ["13", "Products developed and commercialized", "{commercialized_products_marks}",
+         "{commercialized_products_verified_marks}"],
+        ["13", "Products developed", "{developed_products_marks}", "{developed_products_verified_marks}"],
+        ["13", "Proofs of concept developed", "{poc_products_marks}", "{poc_products_verified_marks}"],
+        ["14", "Startup revenue", "{startup_revenue_pccoe_marks}", "{startup_revenue_pccoe_verified_marks}"],
+        ["14", "Startup funds received", "{startup_funding_pccoe_marks}", "{startup_funding_pccoe_verified_marks}"],
+        ["14", "Startup products developed", "{startup_products_marks}", "{startup_products_verified_marks}"],
+        ["14", "Startup proofs of concept", "{startup_poc_marks}", "{startup_poc_verified_marks}"],
+        ["14", "Startups registered", "{startup_registered_marks}", "{startup_registered_verified_marks}"],
+        ["15", "International awards", "{international_awards_marks}", "{international_awards_verified_marks}"],
+        ["15", "Government awards", "{government_awards_marks}", "{government_awards_verified_marks}"],
+        ["15", "National awards", "{national_awards_marks}", "{national_awards_verified_marks}"],
+        ["15", "International fellowships", "{international_fellowship_marks}",
+         "{international_fellowship_verified_marks}"],
+        ["15", "National fellowships", "{national_fellowship_marks}", "{national_fellowship_verified_marks}"],
+        ["16", "Active MoUs", "{active_mou_marks}", "{active_mou_verified_marks}"],
+        ["16", "Lab development with industry", "{lab_development_marks}", "{lab_development_verified_marks}"],
+        ["17", "Internships / placements through industry association", "{internships_placements_marks}",
+         "{internships_placements_verified_marks}"],
+        ["", "Total of Marks Obtained: Research and Development", "{B_total_marks}", "{section_b_total}"],
+    ]),
+    ("Part B: Obtained Marks Summary", (65, 38, 38, 39), [
+        ["Cadre", "Professor", "Associate Professor", "Assistant Professor"],
+        ["Cadre wise maximum considerable marks", "370", "300", "210"],
+        ["Obtained marks from Research and Development", "X = {Prof_B}", "Y = {Assoc_B}", "Z = {Assis_B}"],
+        ["Actual Research and Development marks", "Minimum (370, X) = {Prof_B_total_marks}",
+         "Minimum (300, Y) = {Assoc_B_total_marks}", "Minimum (210, Z) = {Assis_B_total_marks}"],
+        ["Actual marks after verification", "{Prof_B_total_verified}", "{Assoc_B_total_verified}",
+         "{Assis_B_total_verified}"],
+        ["Verification committee member", "{verf_committee_name}", "{verf_committee_name}",
+         "{verf_committee_name}"],
+    ]),
+    ("Table 'C': Self Development", (14, 108, 20, 38), [
+        ["Sr. No.", "Description", "Max. Marks", "Marks Obtained"],
+        ["1", "Qualification [Professor / Asso. Prof.]", "20", "{Prof_qualification_marks}"],
+        ["1", "Qualification [Asst. Prof.]", "20", "{qualification_marks}"],
+        ["2", "Training programs attended", "40", "{training_attended_marks}"],
+        ["3", "Training programs organized", "80", "{training_organized_marks}"],
+        ["4", "PhD guided (extra)", "-NA-", "{phd_guided_marks}"],
+        ["", "Total of Marks Obtained: Self-Development", "", "{section_c_total}"],
+    ]),
+    ("Part C: Obtained Marks Summary", (65, 38, 38, 39), [
+        ["Cadre", "Professor", "Associate Professor", "Assistant Professor"],
+        ["Cadre wise maximum considerable marks", "160", "170", "180"],
+        ["Obtained marks from Self Development", "X = {Prof_C}", "Y = {Assoc_C}", "Z = {Assis_C}"],
+        ["Actual Self Development marks", "Minimum (160, X) = {Prof_C_total_marks}",
+         "Minimum (170, Y) = {Assoc_C_total_marks}", "Minimum (180, Z) = {Assis_C_total_marks}"],
+    ]),
+    ("Part D: Portfolio - Departmental & Central", (90, 90), [
+        ["Institute Level", "Department Level"],
+        ["{Institute_Portfolio}", "{Department_portfolio}"],
+    ]),
+    ("Table 'D': Part I", (110, 30, 40), [
+        ["Cadre", "Max. Marks", "Marks Awarded"],
+        ["Self awarded marks for handling portfolios", "60", "{self_awarded_marks}"],
+        ["Marks awarded by Dean and / or HoD", "60", "{hodMarks}"],
+        ["Total of Marks Obtained: Portfolio", "", "{section_d_total}"],
+    ]),
+    ("Table 'D': Part II (Deputy Director / Dean / HoD / Associate Dean)", (110, 30, 40), [
+        ["", "Max. Marks", "Marks Awarded"],
+        ["Marks awarded by Director", "", "{assDeanHODMarks}"],
+        ["Marks awarded by Dean", "", "{assDeanDeanMarks}"],
+        ["Self awarded marks for handling portfolios", "60", "{assSelfawardedmarks}"],
+        ["Average of Director and Dean marks", "60", "{sumMarks_hod_dean}"],
+        ["Total of Marks Obtained: Portfolio", "", "{assTotalMarks}"],
+    ]),
+    ("E. Extra-ordinary Contribution", (140, 40), [
+        ["Cadre", "Marks Awarded"],
+        ["Extra-ordinary / any other contribution (maximum 50)", "{section_E_total}"],
+    ]),
+    ("Summary of Marks Obtained / Awarded", (12, 60, 18, 18, 18, 27, 27), [
+        ["Part", "Description", "Prof.", "Assoc. Prof.", "Asst. Prof.", "Claimed by Faculty",
+         "After Verification"],
+        ["A", "Academic Involvement", "300", "360", "440", "{total_for_A}", "{total_for_A_verified}"],
+        ["B", "Research and Development", "370", "300", "210", "{total_for_B}", "{total_for_B_verified}"],
+        ["C", "Self-Development", "160", "170", "180", "{total_for_C}", "{total_for_C_verified}"],
+        ["D", "Portfolio - Institute and / or Department", "120", "120", "120", "{section_d_total}",
+         "{total_for_D_verified}"],
+        ["E", "Extra-ordinary Contribution", "50", "50", "50", "{section_E_total}", "{total_for_E_verified}"],
+        ["AW", "Administration Weightage (Deputy Director / Dean / HoD: 100, Associate Dean: 50)",
+         "100 / 50", "100 / 50", "100 / 50", "{extra_marks}", "{extra_marks}"],
+        ["", "Total (minimum of 1000 and claimed / obtained)", "1000", "1000", "1000", "{grand_total}",
+         "{grand_verified_marks}"],
+    ]),
+]
+
+UNDERTAKING = (
+    "I hereby declare that I have carefully read the guidelines of the Self Appraisal Form and filled "
+    "the information correctly."
+)
+
+_styles = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle('ReportTitle', parent=_styles['Normal'], fontName='Helvetica-Bold',
+                             fontSize=11, leading=14, alignment=TA_CENTER)
+HEADING_STYLE = ParagraphStyle('ReportHeading', parent=_styles['Normal'], fontName='Helvetica-Bold',
+                               fontSize=10, leading=13, spaceBefore=8, spaceAfter=4)
+CELL_STYLE = ParagraphStyle('ReportCell', parent=_styles['Normal'], fontSize=8, leading=10)
+BODY_STYLE = ParagraphStyle('ReportBody', parent=_styles['Normal'], fontSize=9, leading=12)
+
+TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e6e6e6')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+])
+
+
+def _fill(text, placeholders):
+    return PLACEHOLDER.sub(lambda match: str(placeholders.get(match.group(0), match.group(0))), text)
+
+
+def _cell(text, placeholders):
+    # Short values are drawn as plain strings; only text that may need wrapping pays for a Paragraph
+    value = _fill(text, placeholders)
+    if len(value) <= SHORT_CELL:
+        return value
+    return Paragraph(_escape(value), CELL_STYLE)
+
+
+def _escape(value):
+    # Paragraph text is XML markup, so escape values such as portfolio names
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _markup(text, placeholders):
+    return _escape(_fill(text, placeholders))
+
+
+def _table(widths, rows, placeholders):
+    table = Table(
+        [[_cell(text, placeholders) for text in row] for row in rows],
+        colWidths=[width * mm for width in widths],
+        repeatRows=1
+    )
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def render_appraisal_pdf(placeholders):
+    """
+    Render the appraisal report and return the PDF bytes.
+
+    Args:
+        placeholders (dict): {placeholder: value}, as returned by appraisal_report.report_placeholders
+    """
+    story = [Paragraph(line, TITLE_STYLE) for line in HEADER]
+    story.append(Spacer(1, 4 * mm))
+    story.append(_table((65, 115), PROFILE, placeholders))
+
+    for heading, widths, rows in BLOCKS:
+        story.append(Paragraph(heading, HEADING_STYLE))
+        story.append(_table(widths, rows, placeholders))
+
+    story.append(Paragraph("Undertaking", HEADING_STYLE))
+    story.append(Paragraph(UNDERTAKING, BODY_STYLE))
+    story.append(Spacer(1, 10 * mm))
+    story.append(Paragraph(_markup("Name and Signature of Faculty Member with Date: {faculty_name}", placeholders),
+                           BODY_STYLE))
+
+    output = io.BytesIO()
+    document = SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title="Faculty Self Appraisal", author=str(placeholders.get('{faculty_name}', ''))
+    )
+    document.build(story)
+    return output.getvalue()
@@ -0,0 +1,94 @@
+"""
+Pre-rendering of appraisal reports on workflow milestones.
+
+The status transitions that make a report final or near-final (verified, done,
+SentToDirector) call report_prerender.milestone(). When REPORT_PRERENDER is set, each
+faculty member's report is queued as a background report job, so the download that
+follows is a cache hit. Pre-renders only use the lower REPORT_PRERENDER_QUEUE_SHARE of
+the job queue; reports that do not fit wait in an in-process backlog and are queued as
+jobs finish and free their slots. The backlog is not persisted: after a restart those
+reports render on download instead.
+
+Settings come from the environment:
+    REPORT_PRERENDER (default off), REPORT_PRERENDER_STATUSES (default
+    "verified,done,SentToDirector"), REPORT_PRERENDER_QUEUE_SHARE (default 0.5)
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from report_jobs import QueueFull
+
+REPORT_PRERENDER = os.getenv("REPORT_PRERENDER", "") not in ("", "0", "false")
+REPORT_PRERENDER_STATUSES = tuple(
+    status.strip() for status in os.getenv("REPORT_PRERENDER_STATUSES", "verified,done,SentToDirector").split(",")
+    if status.strip()
+)
+REPORT_PRERENDER_QUEUE_SHARE = float(os.getenv("REPORT_PRERENDER_QUEUE_SHARE", "0.5"))
+
+
+class ReportPrerender:
+    """Queues background renders when a faculty member reaches a milestone status"""
+
+    def __init__(self, enabled=REPORT_PRERENDER, statuses=REPORT_PRERENDER_STATUSES,
+                 queue_share=REPORT_PRERENDER_QUEUE_SHARE):
+        self.enabled = enabled
+        self.statuses = set(statuses)
+        self.queue_share = queue_share
+        self.queue = None
+        self._lock = threading.Lock()
+        self._backlog = OrderedDict()  # (department, user_id) -> None, oldest first
+
+    def attach(self, queue):
+        """Use a ReportJobQueue for the renders; until then milestones are ignored"""
+        self.queue = queue
+        queue.on_slot_free(self.drain)
+
+    def backlog(self):
+        """Number of reports waiting for a queue slot"""
+        return len(self._backlog)
+
+    def milestone(self, department, user_ids, status):
+        """
+        Queue reports for faculty members that just reached `status`.
+
+        Never raises, so a status update is not failed by its pre-render.
+        Returns the number of jobs queued now; the rest are queued as slots free up.
+        """
+        if not self.enabled or self.queue is None or status not in self.statuses:
+            return 0
+        if isinstance(user_ids, str):
+            user_ids = [user_ids]
+
+        with self._lock:
+            for user_id in user_ids:
+                self._backlog[(department, user_id)] = None
+        queued = self.drain()
+        if self._backlog:
+            print(f"Report queue busy, {len(self._backlog)} pre-renders wait for a free slot")
+        return queued
+
+    def drain(self):
+        """Queue backlog reports until the pre-render share of the queue is full; never raises"""
+        if self.queue is None:
+            return 0
+        max_depth = max(1, int(self.queue.max_depth * self.queue_share))
+        queued = 0
+        while True:
+            with self._lock:
+                if not self._backlog:
+                    return queued
+                department, user_id = self._backlog.popitem(last=False)[0]
+            try:
+                self.queue.submit(department, user_id, max_depth=max_depth)
+                queued += 1
+            except QueueFull:
+                with self._lock:
+                    self._backlog[(department, user_id)] = None
+                    self._backlog.move_to_end((department, user_id), last=False)
+                return queued
+            except Exception as e:
+                print(f"Pre-render of {department}/{user_id} failed: {str(e)}")
+
+
+report_prerender = ReportPrerender()
@@ -0,0 +1,259 @@
+"""
+Retention of rendered appraisal reports in GridFS.
+
+Every time a faculty member's appraisal_pdf pointer moves to a new file, a version is
+recorded in report_versions. A collection run keeps, per faculty member, the newest
+REPORT_RETENTION_VERSIONS versions and every version marked final, plus any file that
+a faculty document or a report job still points at; job documents expire
+REPORT_JOB_TTL_SECONDS after they finish, which releases their files. Other report
+cache files (GridFS files with a report_hash) older than REPORT_RETENTION_GRACE_SECONDS
+are deleted with their chunks, in batches of REPORT_RETENTION_BATCH_SIZE, together with
+chunks whose file document is gone. Before each batch is deleted its references are
+checked again, so a cache hit that points a faculty member or a job at a planned file
+while the run is in progress keeps that file.
+
+Settings come from the environment:
+    REPORT_RETENTION_VERSIONS (default 3), REPORT_RETENTION_GRACE_SECONDS (default 3600),
+    REPORT_RETENTION_BATCH_SIZE (default 500), REPORT_RETENTION_INTERVAL_HOURS (default 24)
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from bson.objectid import ObjectId
+from flask import Blueprint, jsonify, request
+
+REPORT_RETENTION_VERSIONS = int(os.getenv("REPORT_RETENTION_VERSIONS", "3"))
+REPORT_RETENTION_GRACE_SECONDS = float(os.getenv("REPORT_RETENTION_GRACE_SECONDS", "3600"))
+REPORT_RETENTION_BATCH_SIZE = int(os.getenv("REPORT_RETENTION_BATCH_SIZE", "500"))
+REPORT_RETENTION_INTERVAL_HOURS = float(os.getenv("REPORT_RETENTION_INTERVAL_HOURS", "24"))
+
+
+def _batches(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ReportRetention:
+    """Tracks report versions and garbage-collects superseded report files"""
+
+    def __init__(self, db, department_collections, keep=REPORT_RETENTION_VERSIONS,
+                 grace_seconds=REPORT_RETENTION_GRACE_SECONDS, batch_size=REPORT_RETENTION_BATCH_SIZE):
+        """
+        Args:
+            db (Database): The database holding the fs bucket, report_versions and report_jobs
+            department_collections (dict): Department name -> collection, for the current pointers
+        """
+        self.versions = db.report_versions
+        self.jobs = db.report_jobs
+        self.files = db.fs.files
+        self.chunks = db.fs.chunks
+        self.department_collections = department_collections
+        self.keep = keep
+        self.grace_seconds = grace_seconds
+        self.batch_size = batch_size
+        self._indexed = False
+
+    def _ensure_index(self):
+        # Created on first use rather than at import, to keep cold starts free of round trips
+        if not self._indexed:
+            self.versions.create_index([("department", 1), ("user_id", 1), ("created_at", -1)])
+            self._indexed = True
+
+    def record(self, department, user_id, file_id, report_hash):
+        """Add a version for a faculty member whose appraisal_pdf now points at file_id"""
+        self._ensure_index()
+        self.versions.insert_one({
+            "department": department,
+            "user_id": user_id,
+            "file_id": ObjectId(file_id),
+            "report_hash": report_hash,
+            "created_at": datetime.now(),
+            "final": False
+        })
+
+    def list_versions(self, department, user_id):
+        return list(self.versions.find({"department": department, "user_id": user_id}).sort("created_at", -1))
+
+    def mark_final(self, department, user_id):
+        """Mark the newest version of a faculty member's report final; returns it, or None"""
+        versions = self.list_versions(department, user_id)
+        if not versions:
+            return None
+        self.versions.update_one({"_id": versions[0]["_id"]}, {"$set": {"final": True}})
+        versions[0]["final"] = True
+        return versions[0]
+
+    def _referenced_files(self):
+        """File ids that must survive, and the version records past the retention limit"""
+        self._ensure_index()
+        keep = set()
+        expired_versions = []
+        seen = {}
+        cursor = self.versions.find({}, {"department": 1, "user_id": 1, "file_id": 1, "final": 1}).sort(
+            [("department", 1), ("user_id", 1), ("created_at", -1)]
+        )
+        for version in cursor:
+            owner = (version["department"], version["user_id"])
+            seen[owner] = seen.get(owner, 0) + 1
+            if seen[owner] <= self.keep or version.get("final"):
+                keep.add(version["file_id"])
+            else:
+                expired_versions.append(version["_id"])
+
+        # Current pointers, including reports stored before versions were recorded
+        for collection in self.department_collections.values():
+            for user_doc in collection.find({"appraisal_pdf.file_id": {"$exists": True}}, {"appraisal_pdf.file_id": 1}):
+                keep.add(ObjectId(user_doc["appraisal_pdf"]["file_id"]))
+
+        # Finished jobs whose download link may still be used, until the job expires
+        for job in self.jobs.find({"file_id": {"$ne": None}}, {"file_id": 1}):
+            keep.add(ObjectId(job["file_id"]))
+        return keep, expired_versions
+
+    def _still_referenced(self, file_ids, since):
+        """The files of a batch that gained a version or a pointer after `since`"""
+        string_ids = [str(file_id) for file_id in file_ids]
+        referenced = set(self.versions.distinct("file_id", {"file_id": {"$in": file_ids},
+                                                            "created_at": {"$gte": since}}))
+        for collection in self.department_collections.values():
+            for user_doc in collection.find({"appraisal_pdf.file_id": {"$in": string_ids}},
+                                            {"appraisal_pdf.file_id": 1}):
+                referenced.add(ObjectId(user_doc["appraisal_pdf"]["file_id"]))
+        for job in self.jobs.find({"file_id": {"$in": string_ids}}, {"file_id": 1}):
+            referenced.add(ObjectId(job["file_id"]))
+        return referenced
+
+    def plan(self):
+        """Work out what a collection run would delete, without deleting anything"""
+        started = datetime.now()
+        keep, expired_versions = self._referenced_files()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+
+        files = []
+        file_bytes = 0
+        # Only report cache files; other PDFs in the bucket are not ours to collect.
+        # uploadDate is stored as naive UTC
+        cursor = self.files.find({"report_hash": {"$exists": True},
+                                  "uploadDate": {"$lt": cutoff.replace(tzinfo=None)}},
+                                 {"length": 1})
+        for grid_file in cursor:
+            if grid_file["_id"] not in keep:
+                files.append(grid_file["_id"])
+                file_bytes += grid_file.get("length", 0)
+
+        # Chunks left behind by interrupted deletes. GridFS writes chunks before the file
+        # document, so uploads younger than the grace period are not orphans yet
+        orphans = [
+            files_id for files_id in set(self.chunks.distinct("files_id")) - set(self.files.distinct("_id"))
+            if not isinstance(files_id, ObjectId) or files_id.generation_time < cutoff
+        ]
+        orphan_chunks = 0
+        orphan_bytes = 0
+        for batch in _batches(orphans, self.batch_size):
+            for total in self.chunks.aggregate([
+                {"$match": {"files_id": {"$in": batch}}},
+                {"$group": {"_id": None, "chunks": {"$sum": 1}, "bytes": {"$sum": {"$binarySize": "$data"}}}}
+            ]):
+                orphan_chunks += total["chunks"]
+                orphan_bytes += total["bytes"]
+
+        return {
+            "started": started,
+            "files": files,
+            "file_bytes": file_bytes,
+            "orphans": orphans,
+            "orphan_chunks": orphan_chunks,
+            "orphan_bytes": orphan_bytes,
+            "expired_versions": expired_versions,
+        }
+
+    def collect(self, dry_run=False):
+        """Delete what plan() finds; returns the summary, with nothing deleted when dry_run is set"""
+        plan = self.plan()
+        summary = {
+            "dry_run": dry_run,
+            "keep_versions": self.keep,
+            "files": len(plan["files"]),
+            "orphaned_chunk_files": len(plan["orphans"]),
+            "orphaned_chunks": plan["orphan_chunks"],
+            "expired_versions": len(plan["expired_versions"]),
+            "reclaimable_bytes": plan["file_bytes"] + plan["orphan_bytes"],
+        }
+        if dry_run:
+            return summary
+
+        # Same order as GridFS.delete: the file document first, so a file is never half visible
+        deleted = 0
+        for batch in _batches(plan["files"], self.batch_size):
+            referenced = self._still_referenced(batch, plan["started"])
+            batch = [file_id for file_id in batch if file_id not in referenced]
+            self.files.delete_many({"_id": {"$in": batch}})
+            self.chunks.delete_many({"files_id": {"$in": batch}})
+            deleted += len(batch)
+        summary["kept_after_recheck"] = summary["files"] - deleted
+        summary["files"] = deleted
+        for batch in _batches(plan["orphans"], self.batch_size):
+            self.chunks.delete_many({"files_id": {"$in": batch}})
+        for batch in _batches(plan["expired_versions"], self.batch_size):
+            self.versions.delete_many({"_id": {"$in": batch}})
+        print(f"Report retention removed {summary['files']} files and {summary['orphaned_chunks']} orphaned "
+              f"chunks ({summary['reclaimable_bytes']} bytes)")
+        return summary
+
+
+def version_response(version):
+    return {
+        "version_id": str(version["_id"]),
+        "file_id": str(version["file_id"]),
+        "report_hash": version.get("report_hash"),
+        "created_at": version["created_at"].isoformat(),
+        "final": version.get("final", False),
+    }
+
+
+def create_report_retention_blueprint(retention):
+    """
+    Report versions and the retention run.
+
+    Args:
+        retention (ReportRetention): The retention policy to expose
+    """
+    report_retention_bp = Blueprint('report_retention', __name__)
+
+    @report_retention_bp.route('/report-retention', methods=['GET'])
+    def report_retention_dry_run():
+        """What a collection run would delete, and how many bytes it would reclaim"""
+        try:
+            return jsonify(retention.collect(dry_run=True)), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @report_retention_bp.route('/report-retention', methods=['POST'])
+    def run_report_retention():
+        try:
+            data = request.get_json(silent=True) or {}
+            return jsonify(retention.collect(dry_run=bool(data.get('dry_run', False)))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @report_retention_bp.route('/<department>/<user_id>/report-versions', methods=['GET'])
+    def get_report_versions(department, user_id):
+        try:
+            versions = retention.list_versions(department, user_id)
+            return jsonify([version_response(version) for version in versions]), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @report_retention_bp.route('/<department>/<user_id>/report-versions/final', methods=['POST'])
+    def mark_report_final(department, user_id):
+        """Keep the current report version regardless of the retention limit"""
+        try:
+            version = retention.mark_final(department, user_id)
+            if version is None:
+                return jsonify({"error": "No report versions found"}), 404
+            return jsonify(version_response(version)), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    return report_retention_bp
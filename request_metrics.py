@@ -0,0 +1,291 @@
+"""
+Per-route request metrics and a slow-request profiler.
+
+A PyMongo command listener attributes every Mongo command to the Flask request that
+issued it. Each route accumulates its request count, command count, reply bytes,
+time spent in Mongo, time spent in Python and a latency histogram. Requests slower
+than SLOW_REQUEST_MS are kept, with their command trace and (when
+PROFILE_SLOW_REQUESTS is set) a cProfile summary, for /metrics/slow.
+
+Settings come from the environment:
+    SLOW_REQUEST_MS (default 500), SLOW_REQUEST_LOG_SIZE (default 50),
+    PROFILE_SLOW_REQUESTS (default off), METRICS_MEASURE_BYTES (default on)
+"""
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+import bson
+from flask import Blueprint, Response, g, jsonify, request
+from pymongo.monitoring import CommandListener
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "50"))
+PROFILE_SLOW_REQUESTS = os.getenv("PROFILE_SLOW_REQUESTS", "") not in ("", "0", "false")
+METRICS_MEASURE_BYTES = os.getenv("METRICS_MEASURE_BYTES", "1") not in ("", "0", "false")
+
+# Latency histogram buckets in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Commands that are connection housekeeping rather than work done for a request
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions"}
+
+_current_trace = contextvars.ContextVar("fdw_request_trace", default=None)
+
+
+class RequestTrace:
+    """The Mongo commands issued while serving one request"""
+
+    __slots__ = ("commands", "mongo_seconds", "reply_bytes", "pending")
+
+    def __init__(self):
+        self.commands = []
+        self.mongo_seconds = 0.0
+        self.reply_bytes = 0
+        self.pending = {}  # request_id -> (command name, collection)
+
+    def record(self, name, collection, seconds, reply_bytes):
+        self.commands.append((name, collection, seconds, reply_bytes))
+        self.mongo_seconds += seconds
+        self.reply_bytes += reply_bytes
+
+
+class MongoCommandListener(CommandListener):
+    """Adds each command's duration and reply size to the trace of the current request"""
+
+    def started(self, event):
+        trace = _current_trace.get()
+        if trace is not None and event.command_name not in IGNORED_COMMANDS:
+            collection = event.command.get(event.command_name)
+            trace.pending[event.request_id] = (
+                event.command_name, collection if isinstance(collection, str) else None
+            )
+
+    def succeeded(self, event):
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        started = trace.pending.pop(event.request_id, None)
+        if started is None:
+            return
+        reply_bytes = len(bson.encode(event.reply)) if METRICS_MEASURE_BYTES else 0
+        trace.record(started[0], started[1], event.duration_micros / 1e6, reply_bytes)
+
+    def failed(self, event):
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        started = trace.pending.pop(event.request_id, None)
+        if started is not None:
+            trace.record(started[0], started[1], event.duration_micros / 1e6, 0)
+
+
+class RouteStats:
+    __slots__ = ("requests", "errors", "commands", "reply_bytes", "mongo_seconds",
+                 "python_seconds", "total_seconds", "slow", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.commands = 0
+        self.reply_bytes = 0
+        self.mongo_seconds = 0.0
+        self.python_seconds = 0.0
+        self.total_seconds = 0.0
+        self.slow = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class RequestMetrics:
+    """Collects per-route statistics from the Flask request lifecycle"""
+
+    def __init__(self, slow_request_ms=SLOW_REQUEST_MS, profile_slow_requests=PROFILE_SLOW_REQUESTS,
+                 slow_log_size=SLOW_REQUEST_LOG_SIZE):
+        self.slow_request_seconds = slow_request_ms / 1000
+        self.profile_slow_requests = profile_slow_requests
+        self.listener = MongoCommandListener()
+        self.slow_requests = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self._routes = {}  # (method, route) -> RouteStats
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_trace = RequestTrace()
+        g.metrics_token = _current_trace.set(g.metrics_trace)
+        if self.profile_slow_requests:
+            g.metrics_profiler = cProfile.Profile()
+            g.metrics_profiler.enable()
+
+    def _after_request(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, error=None):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        total = time.perf_counter() - started
+        trace = g.pop("metrics_trace")
+        _current_trace.reset(g.pop("metrics_token"))
+        profiler = g.pop("metrics_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+
+        status = g.pop("metrics_status", 500)
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        key = (request.method, route)
+        slow = total >= self.slow_request_seconds
+
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.requests += 1
+            stats.errors += status >= 500 or error is not None
+            stats.commands += len(trace.commands)
+            stats.reply_bytes += trace.reply_bytes
+            stats.mongo_seconds += trace.mongo_seconds
+            stats.python_seconds += max(total - trace.mongo_seconds, 0.0)
+            stats.total_seconds += total
+            stats.slow += slow
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if total <= bound:
+                    stats.buckets[index] += 1
+
+        if slow:
+            self._record_slow(key, status, total, trace, profiler)
+
+    def _record_slow(self, key, status, total, trace, profiler):
+        entry = {
+            "method": key[0],
+            "route": key[1],
+            "path": request.full_path.rstrip('?'),
+            "status": status,
+            "at": time.time(),
+            "duration_ms": round(total * 1000, 2),
+            "mongo_ms": round(trace.mongo_seconds * 1000, 2),
+            "mongo_commands": len(trace.commands),
+            "reply_bytes": trace.reply_bytes,
+            "commands": [
+                {"command": name, "collection": collection,
+                 "duration_ms": round(seconds * 1000, 3), "reply_bytes": reply_bytes}
+                for name, collection, seconds, reply_bytes in trace.commands
+            ],
+        }
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            entry["profile"] = out.getvalue()
+        self.slow_requests.append(entry)
+        print(f"Slow request: {key[0]} {entry['path']} {entry['duration_ms']} ms, "
+              f"{entry['mongo_commands']} Mongo commands ({entry['mongo_ms']} ms)")
+
+    def snapshot(self):
+        """Return {(method, route): RouteStats copy}"""
+        with self._lock:
+            copies = {}
+            for key, stats in self._routes.items():
+                copy = RouteStats()
+                for field in RouteStats.__slots__:
+                    value = getattr(stats, field)
+                    setattr(copy, field, list(value) if field == "buckets" else value)
+                copies[key] = copy
+            return copies
+
+    def prometheus_text(self, pool_stats=None):
+        """Render the route statistics (and optional pool counters) in Prometheus text format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(value_)}"' for key, value_ in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        routes = sorted(self.snapshot().items())
+        labelled = [({"method": method, "route": route}, stats) for (method, route), stats in routes]
+
+        metric("fdw_requests_total", "counter", "Requests served per route",
+               [(labels, stats.requests) for labels, stats in labelled])
+        metric("fdw_request_errors_total", "counter", "Requests that ended in a 5xx or an exception",
+               [(labels, stats.errors) for labels, stats in labelled])
+        metric("fdw_slow_requests_total", "counter", f"Requests slower than {self.slow_request_seconds}s",
+               [(labels, stats.slow) for labels, stats in labelled])
+        metric("fdw_mongo_commands_total", "counter", "Mongo commands issued per route",
+               [(labels, stats.commands) for labels, stats in labelled])
+        metric("fdw_mongo_reply_bytes_total", "counter", "BSON bytes returned by Mongo per route",
+               [(labels, stats.reply_bytes) for labels, stats in labelled])
+        metric("fdw_mongo_seconds_total", "counter", "Time spent waiting on Mongo per route",
+               [(labels, round(stats.mongo_seconds, 6)) for labels, stats in labelled])
+        metric("fdw_python_seconds_total", "counter", "Time spent outside Mongo per route",
+               [(labels, round(stats.python_seconds, 6)) for labels, stats in labelled])
+
+        lines.append("# HELP fdw_request_duration_seconds Request latency per route")
+        lines.append("# TYPE fdw_request_duration_seconds histogram")
+        for labels, stats in labelled:
+            label_text = f'method="{labels["method"]}",route="{_escape(labels["route"])}"'
+            for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                lines.append(f'fdw_request_duration_seconds_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'fdw_request_duration_seconds_bucket{{{label_text},le="+Inf"}} {stats.requests}')
+            lines.append(f"fdw_request_duration_seconds_sum{{{label_text}}} {round(stats.total_seconds, 6)}")
+            lines.append(f"fdw_request_duration_seconds_count{{{label_text}}} {stats.requests}")
+
+        if pool_stats is not None:
+            pools = sorted(pool_stats.get("pools", {}).items())
+            metric("fdw_mongo_pool_open_connections", "gauge", "Open connections per Mongo server",
+                   [({"address": address}, counts["open"]) for address, counts in pools])
+            metric("fdw_mongo_pool_in_use_connections", "gauge", "Checked out connections per Mongo server",
+                   [({"address": address}, counts["in_use"]) for address, counts in pools])
+            metric("fdw_mongo_pool_checkout_failures_total", "counter", "Failed connection checkouts",
+                   [({"address": address}, counts["check_out_failed"]) for address, counts in pools])
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
+
+
+def create_metrics_blueprint(metrics, pool_stats=None):
+    """
+    Expose the metrics at /metrics (Prometheus text) and the slow request log at /metrics/slow.
+
+    Args:
+        metrics (RequestMetrics): The collector attached to the app
+        pool_stats (callable): Returns the connection registry stats to include, optional
+    """
+    metrics_bp = Blueprint('metrics', __name__)
+
+    @metrics_bp.route('/metrics', methods=['GET'])
+    def get_metrics():
+        try:
+            body = metrics.prometheus_text(pool_stats() if pool_stats else None)
+            return Response(body, mimetype='text/plain; version=0.0.4')
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @metrics_bp.route('/metrics/slow', methods=['GET'])
+    def get_slow_requests():
+        try:
+            return jsonify({
+                "threshold_ms": metrics.slow_request_seconds * 1000,
+                "requests": list(metrics.slow_requests)
+            }), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    return metrics_bp
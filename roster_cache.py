@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+
+# Seconds a cached roster is trusted. Invalidation only reaches the worker that made the
+# change, so other workers (gunicorn, serverless instances) pick it up after this TTL.
+ROSTER_CACHE_TTL = float(os.getenv("ROSTER_CACHE_TTL", "60"))
+
+
+class RosterCache:
+    """In-process cache of each department's lookup roster ({user_id: role})"""
+
+    def __init__(self, ttl=ROSTER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rosters = {}  # department -> (expires_at, roster)
+
+    def get(self, department, collection):
+        """
+        Return the department roster, reading the lookup document only on a miss or expiry.
+
+        The returned dict is shared between requests and must not be modified.
+        Returns None when the department has no lookup document.
+        """
+        entry = self._rosters.get(department)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return self.refresh(department, collection)
+
+    def refresh(self, department, collection):
+        """Reload one department roster from its lookup document"""
+        lookup_doc = collection.find_one({"_id": "lookup"}, {"data": 1})
+        roster = lookup_doc.get("data") if lookup_doc else None
+        with self._lock:
+            if roster is None:
+                self._rosters.pop(department, None)
+            else:
+                self._rosters[department] = (time.monotonic() + self.ttl, roster)
+        return roster
+
+    def role_of(self, department, collection, user_id):
+        """
+        Return the user's role in the department roster, or None if they are not in it.
+
+        Members are answered from memory; an unknown id triggers one reload in case the
+        user was added by another worker since the roster was cached.
+        """
+        roster = self.get(department, collection)
+        if roster is not None and user_id in roster:
+            return roster[user_id]
+        roster = self.refresh(department, collection)
+        return roster.get(user_id) if roster is not None else None
+
+    def invalidate(self, department=None):
+        """Drop one department's roster, or every roster when no department is given"""
+        with self._lock:
+            if department is None:
+                self._rosters.clear()
+            else:
+                self._rosters.pop(department, None)
+
+
+roster_cache = RosterCache()
@@ -0,0 +1,410 @@
+"""
+Scoring engine for the Faculty Self Appraisal.
+
+Every weight that turns a faculty document into marks lives in a versioned table:
+the Section B points per item, the Section A scaling per role, the designation
+bonuses, the 1000 mark cap and the 85/15 split of the final marks. The report, the
+API and the final marks listing all compute through this module, so changing a
+weight is a new table version rather than an edit in several places. Department-wide
+scores, final marks, ranks and distributions run on NumPy arrays; NumPy is imported
+on first use so it stays out of cold starts.
+
+The active table is chosen with SCORING_VERSION (default "2024-25").
+"""
+import math
+import os
+
+from flask import Blueprint, jsonify
+
+from appraisal_schema import SECTION_B_CATEGORIES, item_fields, item_weight
+
+SCORING_TABLES = {
+    "2024-25": {
+        # Section B: {key: (category, {item: points or (points, per)})}, as laid out in the form
+        "section_b": SECTION_B_CATEGORIES,
+        # Section A total is divided by the role's share of the teaching load
+        "section_a_scale": {"Assistant Professor": 1.0, "Associate Professor": 0.818, "Professor": 0.68},
+        "designation_bonus": {"HOD": 100, "Dean": 100, "Associate Dean": 50},
+        "max_total": 1000,
+        # Final marks: verified marks out of max_total scaled to 850, interaction out of 100 to 150
+        "verified_points": 850,
+        "interaction_points": 150,
+        "interaction_out_of": 100,
+    },
+}
+
+SCORING_VERSION = os.getenv("SCORING_VERSION", "2024-25")
+
+
+def scoring_table(version=None):
+    """Return the weight table of a version (the active one by default)"""
+    version = version or SCORING_VERSION
+    if version not in SCORING_TABLES:
+        raise ValueError(f"Unknown scoring version: {version}")
+    return SCORING_TABLES[version]
+
+
+def compile_section_b(table):
+    """Flatten the Section B weights to (key, category, item, value field, points, per) rules"""
+    rules = []
+    for key, (category, items) in table["section_b"].items():
+        for item, weight in items.items():
+            points, per = item_weight(weight)
+            rules.append((key, category, item, item_fields(item)[0], points, per))
+    return rules
+
+
+def item_marks(value, points, per):
+    """Marks for one Section B value: points per unit, or per whole `per` units"""
+    if per == 1:
+        return value * points
+    return math.floor(value / per) * points
+
+
+def section_a_scaled(total_marks, role, table):
+    """Section A total scaled by the role's share; unknown roles are not scaled"""
+    scale = table["section_a_scale"].get(role)
+    return total_marks / scale if scale is not None else total_marks
+
+
+def designation_bonus(desg, table):
+    return table["designation_bonus"].get(desg, 0)
+
+
+def capped_total(marks, bonus, table):
+    """Rounded marks plus the designation bonus, capped at the maximum"""
+    return min(round(marks + bonus), table["max_total"])
+
+
+def final_marks(verified_marks, interaction_average, bonus, table):
+    """Final marks from verified marks and the interaction average, as shown to the director"""
+    verified_marks_with_bonus = verified_marks + bonus
+    capped_verified_marks = min(verified_marks_with_bonus, table["max_total"])
+    scaled_verified = (capped_verified_marks / table["max_total"]) * table["verified_points"]
+    scaled_interaction = (interaction_average / table["interaction_out_of"]) * table["interaction_points"]
+    calculated_total = scaled_verified + scaled_interaction
+    final_total = min(calculated_total, table["max_total"])
+    return {
+        "verified_marks": verified_marks,
+        "extra_marks_for_designation": bonus,
+        "verified_marks_with_bonus": verified_marks_with_bonus,
+        "capped_verified_marks": capped_verified_marks,
+        "scaled_verified_marks": round(scaled_verified, 2),
+        "interaction_average": interaction_average,
+        "scaled_interaction_marks": round(scaled_interaction, 2),
+        "calculated_total": round(calculated_total, 2),
+        "total_marks": round(final_total, 2),
+        "is_capped_at_1000": final_total == table["max_total"]
+    }
+
+
+def interaction_averages(reviews):
+    """
+    Mean interaction marks of each faculty member, computed on NumPy arrays.
+
+    Args:
+        reviews (list): One list of review marks per faculty member
+    Returns:
+        list: The mean of each list, or 0 for a faculty member without reviews
+    """
+    import numpy as np  # Loaded on first use; only the final marks listing needs it
+
+    counts = [len(marks) for marks in reviews]
+    sums = np.zeros(len(reviews))
+    # One column per review position, added left to right so every sum matches sum(marks)
+    for position in range(max(counts, default=0)):
+        sums = sums + np.fromiter((marks[position] if len(marks) > position else 0 for marks in reviews),
+                                  dtype=float, count=len(reviews))
+    means = sums / np.maximum(counts, 1)
+    return [mean if count else 0 for mean, count in zip(means.tolist(), counts)]
+
+
+def final_marks_department(verified_marks, averages, bonuses, table):
+    """
+    final_marks for a whole department, computed on NumPy arrays.
+
+    Args:
+        verified_marks, averages, bonuses (list): One value per faculty member
+    Returns:
+        list: The final_marks dict of each faculty member, value for value
+    """
+    import numpy as np
+
+    max_total = table["max_total"]
+    with_bonus = np.asarray(verified_marks, dtype=float) + np.asarray(bonuses, dtype=float)
+    over_cap = with_bonus > max_total
+    capped = np.minimum(with_bonus, max_total)
+    scaled_verified = (capped / max_total) * table["verified_points"]
+    scaled_interaction = ((np.asarray(averages, dtype=float) / table["interaction_out_of"])
+                          * table["interaction_points"])
+    calculated = scaled_verified + scaled_interaction
+    final_total = np.minimum(calculated, max_total)
+    at_cap = final_total == max_total
+
+    results = []
+    # tolist() converts each array to Python floats and bools in one call
+    for verified, average, bonus, over, verified_part, interaction_part, calculated_total, total, is_capped \
+            in zip(verified_marks, averages, bonuses, over_cap.tolist(), scaled_verified.tolist(),
+                   scaled_interaction.tolist(), calculated.tolist(), final_total.tolist(), at_cap.tolist()):
+        # Pass-through values keep their Python types, so ints still serialize as ints
+        verified_with_bonus = verified + bonus
+        results.append({
+            "verified_marks": verified,
+            "extra_marks_for_designation": bonus,
+            "verified_marks_with_bonus": verified_with_bonus,
+            "capped_verified_marks": max_total if over else verified_with_bonus,
+            "scaled_verified_marks": round(verified_part, 2),
+            "interaction_average": average,
+            "scaled_interaction_marks": round(interaction_part, 2),
+            "calculated_total": round(calculated_total, 2),
+            "total_marks": round(total, 2),
+            "is_capped_at_1000": is_capped
+        })
+    return results
+
+
+def rank_totals(totals):
+    """
+    Competition ranks (1 = highest) and percentile ranks of a list of totals.
+
+    The percentile is the share of faculty scoring at or below a total, in percent.
+    """
+    import numpy as np
+
+    values = np.asarray(totals, dtype=float)
+    if not len(values):
+        return [], []
+    at_or_below = np.searchsorted(np.sort(values), values, side='right')
+    ranks = len(values) - at_or_below + 1
+    percentiles = np.round(at_or_below / len(values) * 100, 2)
+    return ranks.tolist(), percentiles.tolist()
+
+
+def distribution_by(totals, groups):
+    """Count, mean, min, quartiles and max of the totals in each group, e.g. per role"""
+    import numpy as np
+
+    values = np.asarray(totals, dtype=float)
+    labels = np.asarray(groups, dtype=object)
+    distribution = {}
+    for group in sorted(set(groups), key=str):
+        members = values[labels == group]
+        p25, median, p75 = np.percentile(members, [25, 50, 75])
+        distribution[group] = {
+            "count": int(len(members)),
+            "mean": round(float(members.mean()), 2),
+            "min": round(float(members.min()), 2),
+            "p25": round(float(p25), 2),
+            "median": round(float(median), 2),
+            "p75": round(float(p75), 2),
+            "max": round(float(members.max()), 2),
+        }
+    return distribution
+
+
+def _grand_total(faculty_doc):
+    grand_total = faculty_doc.get('grand_total', 0)
+    if isinstance(grand_total, dict):
+        grand_total = grand_total.get('grand_total', 0)
+    return grand_total or 0
+
+
+def _score(faculty_doc, user, table, version, rules):
+    role = user.get('role', '')
+    desg = user.get('desg', '')
+    section_b = faculty_doc.get('B', {})
+
+    categories = {}
+    for key, category, item, value_field, points, per in rules:
+        value = section_b.get(key, {}).get(category, {}).get(value_field, 0) or 0
+        entry = categories.setdefault(key, {"category": category, "items": {}, "marks": 0})
+        marks = item_marks(value, points, per)
+        entry["items"][item] = marks
+        entry["marks"] += marks
+
+    a_total = faculty_doc.get('A', {}).get('total_marks', 0)
+    bonus = designation_bonus(desg, table)
+    return {
+        "version": version,
+        "role": role,
+        "desg": desg,
+        "section_a": {"total_marks": a_total, "scaled_marks": section_a_scaled(a_total, role, table)},
+        "section_b": categories,
+        "section_b_marks": sum(entry["marks"] for entry in categories.values()),
+        "designation_bonus": bonus,
+        "grand_total": capped_total(_grand_total(faculty_doc), bonus, table),
+        "grand_verified_marks": capped_total(faculty_doc.get('grand_verified_marks') or 0, bonus, table),
+    }
+
+
+def score_faculty(faculty_doc, user, version=None):
+    """
+    Compute the marks of one faculty member.
+
+    Args:
+        faculty_doc (dict): The department document (sections, grand_total, grand_verified_marks)
+        user (dict): The users document, for role and designation
+    """
+    table = scoring_table(version)
+    return _score(faculty_doc, user, table, version or SCORING_VERSION, compile_section_b(table))
+
+
+def score_department(faculty_docs, users, version=None):
+    """
+    Compute the marks of every faculty member of a department at once.
+
+    The department's Section B values form a faculty x rule matrix that is marked
+    against the compiled weights in one NumPy step. Category and Section B totals are
+    column sums added in rule order, and cells that score_faculty computes as ints
+    stay ints, so each result equals score_faculty's value for value.
+
+    Args:
+        faculty_docs (iterable): Department documents
+        users (dict): User id -> users document
+    Returns:
+        dict: Faculty id -> the score_faculty result
+    """
+    import numpy as np
+
+    table = scoring_table(version)
+    version = version or SCORING_VERSION
+    rules = compile_section_b(table)
+    faculty_docs = list(faculty_docs)
+    if not faculty_docs:
+        return {}
+
+    # Rules come grouped by key, so each key owns a contiguous block of matrix columns
+    blocks = []
+    for column, (key, category, item, value_field, _, _) in enumerate(rules):
+        if not blocks or blocks[-1][0] != key:
+            blocks.append((key, category, [], [], column))
+        blocks[-1][2].append(item)
+        blocks[-1][3].append(value_field)
+
+    raw = []
+    for faculty_doc in faculty_docs:
+        section_b = faculty_doc.get('B', {})
+        row = []
+        for key, category, _, value_fields, _ in blocks:
+            entries = section_b.get(key, {}).get(category, {})
+            row.extend(entries.get(value_field, 0) or 0 for value_field in value_fields)
+        raw.append(row)
+
+    values = np.array(raw)
+    points = np.array([rule[4] for rule in rules], dtype=float)
+    per = np.array([rule[5] for rule in rules], dtype=float)
+    marks = np.where(per == 1, values * points, np.floor(values / per) * points)
+    # item_marks gives ints for whole-number values and for every rule counted per `per` units
+    if values.dtype.kind in 'biu':
+        integral = np.ones(values.shape, dtype=bool)
+    else:
+        integral = np.array([[not isinstance(value, float) for value in row] for row in raw]) | (per != 1)
+
+    # Column sums in rule order, as score_faculty adds them, then the same again over the keys
+    key_totals = []
+    section_b_marks = np.zeros(len(faculty_docs))
+    for _, _, items, _, start in blocks:
+        total = np.zeros(len(faculty_docs))
+        for column in range(start, start + len(items)):
+            total = total + marks[:, column]
+        section_b_marks = section_b_marks + total
+        key_totals.append(total)
+    totals = np.column_stack(key_totals)
+    totals_integral = np.column_stack([integral[:, start:start + len(items)].all(axis=1)
+                                       for _, _, items, _, start in blocks])
+
+    def exact(floats, integral):
+        """Rows of Python numbers, int wherever score_faculty would produce an int"""
+        ints = np.where(integral, floats, 0).astype(np.int64).tolist()
+        floats = floats.tolist()
+        return [row_ints if all(row_integral) else
+                [whole if is_int else value for whole, value, is_int in zip(row_ints, row_floats, row_integral)]
+                for row_ints, row_floats, row_integral in zip(ints, floats, integral.tolist())]
+
+    item_rows = exact(marks, integral)
+    total_rows = exact(totals, totals_integral)
+    section_b_rows = exact(section_b_marks[:, None], integral.all(axis=1)[:, None])
+
+    faculty_users = [users.get(faculty_doc["_id"], {}) for faculty_doc in faculty_docs]
+    bonuses = np.array([designation_bonus(user.get('desg', ''), table) for user in faculty_users])
+
+    def capped(marks):
+        # capped_total for every faculty member; np.round halves to even like round()
+        marks = np.array(marks, dtype=float) + bonuses
+        return np.minimum(np.round(marks), table["max_total"]).astype(np.int64).tolist()
+
+    grand_totals = capped([_grand_total(faculty_doc) for faculty_doc in faculty_docs])
+    grand_verified = capped([faculty_doc.get('grand_verified_marks') or 0 for faculty_doc in faculty_docs])
+
+    scores = {}
+    for faculty_doc, user, items_row, totals_row, section_b_row, bonus, grand_total, verified in zip(
+            faculty_docs, faculty_users, item_rows, total_rows, section_b_rows, bonuses.tolist(),
+            grand_totals, grand_verified):
+        role = user.get('role', '')
+        a_total = faculty_doc.get('A', {}).get('total_marks', 0)
+        scores[faculty_doc["_id"]] = {
+            "version": version,
+            "role": role,
+            "desg": user.get('desg', ''),
+            "section_a": {"total_marks": a_total, "scaled_marks": section_a_scaled(a_total, role, table)},
+            "section_b": {
+                key: {"category": category, "items": dict(zip(items, items_row[start:start + len(items)])),
+                      "marks": key_total}
+                for (key, category, items, _, start), key_total in zip(blocks, totals_row)
+            },
+            "section_b_marks": section_b_row[0],
+            "designation_bonus": bonus,
+            "grand_total": grand_total,
+            "grand_verified_marks": verified,
+        }
+    return scores
+
+
+# Fields score_faculty reads from a department document
+SCORING_PROJECTION = {"A.total_marks": 1, "B": 1, "grand_total": 1, "grand_verified_marks": 1}
+
+
+def create_scoring_blueprint(department_collections, db_users):
+    """
+    Server-side marks for one faculty member or a whole department.
+
+    Args:
+        department_collections (dict): Department name -> collection
+        db_users (Collection): The users collection, for roles and designations
+    """
+    scoring_bp = Blueprint('scoring', __name__)
+
+    @scoring_bp.route('/<department>/<user_id>/scores', methods=['GET'])
+    def get_faculty_scores(department, user_id):
+        try:
+            collection = department_collections.get(department)
+            if collection is None:
+                return jsonify({"error": "Invalid department"}), 400
+            faculty_doc = collection.find_one({"_id": user_id}, SCORING_PROJECTION)
+            if not faculty_doc:
+                return jsonify({"error": "User data not found"}), 404
+            user = db_users.find_one({"_id": user_id}, {"role": 1, "desg": 1}) or {}
+            return jsonify(score_faculty(faculty_doc, user)), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @scoring_bp.route('/<department>/scores', methods=['GET'])
+    def get_department_scores(department):
+        """Marks of every faculty member of a department, from one query per collection"""
+        try:
+            collection = department_collections.get(department)
+            if collection is None:
+                return jsonify({"error": "Invalid department"}), 400
+            # Faculty documents are the ones with sections; lookup and marks documents have none
+            faculty_docs = list(collection.find({"A": {"$exists": True}}, SCORING_PROJECTION))
+            ids = [faculty_doc["_id"] for faculty_doc in faculty_docs]
+            users = {user["_id"]: user for user in db_users.find({"_id": {"$in": ids}}, {"role": 1, "desg": 1})}
+            return jsonify({
+                "department": department,
+                "version": SCORING_VERSION,
+                "scores": score_department(faculty_docs, users)
+            }), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    return scoring_bp
@@ -0,0 +1,297 @@
+import copy
+import math
+
+from pymongo import ReturnDocument
+
+from appraisal_schema import FIELD_TYPES, check_value, is_verifier_field, item_fields, item_weight
+from department_summary import SUMMARY_PROJECTION
+from scoring import scoring_table
+
+SECTIONS = ['A', 'B', 'C', 'D', 'E']
+
+# How each section's POST handler stores the grand total; PATCH and bulk imports write it the same way
+SECTION_SAVE_OPTIONS = {
+    "A": {"extra_fields": {"status": "pending"}, "nested_total": False},
+    "B": {"nested_total": True},
+    "C": {"nested_total": True},
+    "D": {"nested_total": True},
+    "E": {"extra_fields": {"status": "pending"}, "nested_total": False},
+}
+
+
+# What a save reads back to work out the grand total it stored
+TOTALS_PROJECTION = {f"{section}.total_marks": 1 for section in SECTIONS}
+
+
+def grand_total_expression():
+    """Server-side equivalent of calculate_grand_total: sum of every section's total_marks"""
+    # Each total is converted like float() in calculate_grand_total, so totals stored as
+    # strings still count; missing sections and unparseable values add 0.
+    return {"$sum": [0.0] + [
+        {"$convert": {"input": f"${section}.total_marks", "to": "double", "onError": 0.0, "onNull": 0.0}}
+        for section in SECTIONS
+    ]}
+
+
+def _total(value):
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def grand_total_value(doc):
+    """What grand_total_expression() evaluates to on doc"""
+    # $sum adds doubles with compensated summation, as fsum does
+    return math.fsum(_total((doc.get(section) or {}).get("total_marks")) for section in SECTIONS)
+
+
+def _stored_total(doc, nested_total):
+    grand_total = grand_total_value(doc)
+    return {"grand_total": grand_total, "status": "pending"} if nested_total else grand_total
+
+
+def _summary_fields(doc):
+    return {field: doc[field] for field in SUMMARY_PROJECTION if field in doc}
+
+
+def _notify(on_change, before, grand_total, extra_fields):
+    """Pass on_change the summary fields around a write, given the document read before it"""
+    after = _summary_fields(before or {})
+    after.update({field: value for field, value in (extra_fields or {}).items() if field in SUMMARY_PROJECTION})
+    after["grand_total"] = grand_total
+    on_change(_summary_fields(before) if before is not None else None, after)
+
+
+def build_section_update(section, data, extra_fields=None, nested_total=True):
+    """
+    Build the update pipeline that stores a section and recomputes grand_total.
+
+    Args:
+        section (str): Section key ('A' to 'E')
+        data (dict): Section payload as posted by the form
+        extra_fields (dict): Other top-level fields to set in the same write
+        nested_total (bool): Store grand_total as {"grand_total", "status"} (sections B-D)
+            instead of a bare number (sections A and E)
+    """
+    # Client data is wrapped in $literal so values such as "$100" are never read as field paths
+    fields = {section: {"$literal": data}, "isUpdated": True}
+    for field, value in (extra_fields or {}).items():
+        fields[field] = {"$literal": value}
+
+    if nested_total:
+        grand_total = {"grand_total": grand_total_expression(), "status": "pending"}
+    else:
+        grand_total = grand_total_expression()
+
+    return [
+        {"$set": fields},
+        {"$set": {"grand_total": grand_total}}
+    ]
+
+
+def save_section(collection, user_id, section, data, extra_fields=None, nested_total=True, on_change=None):
+    """
+    Store one section and its recomputed grand_total in a single atomic write.
+
+    Replaces the update -> find_one -> update sequence the section handlers used to run.
+    on_change(before, after), when given, receives the department summary fields
+    around the write.
+
+    Returns:
+        The stored grand_total value (number, or dict when nested_total is set)
+    """
+    # The document from before the write gives the summary fields it replaced; the new
+    # grand total follows from it and the saved section without another read
+    before = collection.find_one_and_update(
+        {"_id": user_id},
+        build_section_update(section, data, extra_fields, nested_total),
+        projection={"_id": 0, **SUMMARY_PROJECTION, **TOTALS_PROJECTION},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    doc = dict(before or {})
+    doc[section] = data
+    grand_total = _stored_total(doc, nested_total)
+    if on_change is not None:
+        _notify(on_change, before, grand_total, extra_fields)
+    return grand_total
+
+
+def is_computed_field(section, path):
+    """Whether a PATCH recomputes the field itself: Section B category marks and total_marks"""
+    return section == 'B' and (path == ('total_marks',) or path[-1] == 'marks')
+
+
+def resolve_patch_paths(section, fields):
+    """
+    Validate a PATCH body against the section layout.
+
+    Verification results and the fields a PATCH computes are not accepted.
+
+    Args:
+        section (str): Section key ('A' to 'E')
+        fields (dict): Dotted paths relative to the section, e.g. {"1.journalPapers.sciCount": 2}
+
+    Returns:
+        (updates, errors): {full dotted path: value} and a list of error strings
+    """
+    layout = FIELD_TYPES[section]
+    updates = {}
+    errors = []
+    for path, value in fields.items():
+        keys = tuple(path.split('.'))
+        expected = layout.get(keys)
+        if expected is None:
+            errors.append(f"{path}: not a field of section {section}")
+            continue
+        if is_verifier_field(keys):
+            errors.append(f"{path}: set by the verification, not by the faculty member")
+            continue
+        if is_computed_field(section, keys):
+            errors.append(f"{path}: computed from the scoring table")
+            continue
+        error = check_value(keys, value, expected)
+        if error:
+            errors.append(error)
+            continue
+        updates[f"{section}.{path}"] = value
+    return updates, errors
+
+
+def category_marks_expression(key, category, items):
+    """Server-side marks of one Section B category, using the active scoring table"""
+    terms = []
+    for item, weight in items.items():
+        points, per = item_weight(weight)
+        value = {"$ifNull": [f"$B.{key}.{category}.{item_fields(item)[0]}", 0]}
+        if per != 1:
+            value = {"$floor": {"$divide": [value, per]}}
+        terms.append({"$multiply": [value, points]})
+    return {"$add": terms}
+
+
+def category_marks_value(doc, key, category, items):
+    """What category_marks_expression() evaluates to on doc"""
+    values = (((doc.get("B") or {}).get(key) or {}).get(category)) or {}
+    marks = 0
+    for item, weight in items.items():
+        points, per = item_weight(weight)
+        value = values.get(item_fields(item)[0])
+        if value is None:
+            value = 0
+        if per != 1:
+            # $divide always yields a double, and $floor keeps it one
+            value = float(math.floor(value / per))
+        marks += value * points
+    return marks
+
+
+def section_b_total_expression():
+    """Server-side Section B total_marks: the sum of every category's marks"""
+    return {"$add": [{"$ifNull": [f"$B.{key}.{category}.marks", 0]}
+                     for key, (category, _) in scoring_table()["section_b"].items()]}
+
+
+def section_b_total_value(doc):
+    """What section_b_total_expression() evaluates to on doc"""
+    section_b = doc.get("B") or {}
+    total = 0
+    for key, (category, _) in scoring_table()["section_b"].items():
+        marks = ((section_b.get(key) or {}).get(category) or {}).get("marks")
+        total += marks if marks is not None else 0
+    return total
+
+
+def touched_categories(section, updates):
+    """Return {key: (category, items)} for the Section B categories an update touches"""
+    if section != 'B':
+        return {}
+    categories = {}
+    section_b = scoring_table()["section_b"]
+    for path in updates:
+        key = path.split('.')[1]
+        if key in section_b:
+            categories[key] = section_b[key]
+    return categories
+
+
+def affected_marks(section, updates):
+    """Return {marks path: expression} for the categories an update touches"""
+    return {f"B.{key}.{category}.marks": category_marks_expression(key, category, items)
+            for key, (category, items) in touched_categories(section, updates).items()}
+
+
+def build_patch_update(section, updates, extra_fields=None, nested_total=True):
+    """
+    Build the update pipeline for a partial section save.
+
+    Only the given paths are written; the marks of every touched Section B category
+    and the grand total are recomputed from the stored document in the same write.
+    Section B's total_marks is recomputed too, as the sum of all its category marks,
+    so a Section B PATCH never keeps a total the client computed.
+    """
+    fields = {path: {"$literal": value} for path, value in updates.items()}
+    fields["isUpdated"] = True
+    for field, value in (extra_fields or {}).items():
+        fields[field] = {"$literal": value}
+
+    if nested_total:
+        grand_total = {"grand_total": grand_total_expression(), "status": "pending"}
+    else:
+        grand_total = grand_total_expression()
+
+    pipeline = [{"$set": fields}]
+    marks = affected_marks(section, updates)
+    if marks:
+        pipeline.append({"$set": marks})
+    if section == 'B':
+        pipeline.append({"$set": {"B.total_marks": section_b_total_expression()}})
+    pipeline.append({"$set": {"grand_total": grand_total}})
+    return pipeline
+
+
+def patch_section(collection, user_id, section, updates, extra_fields=None, nested_total=True, on_change=None):
+    """
+    Apply a validated partial update to an existing faculty document.
+
+    on_change(before, after) is called as in save_section.
+
+    Returns:
+        (grand_total, marks) where marks maps each recomputed marks path (and, for
+        Section B, B.total_marks) to its value, or None when the document does not exist
+    """
+    categories = touched_categories(section, updates)
+    projection = {"_id": 0, **SUMMARY_PROJECTION, **TOTALS_PROJECTION}
+    if section == 'B':
+        # Every category's marks for the new total, and the whole of each touched category
+        for key, (category, _) in scoring_table()["section_b"].items():
+            projection[f"B.{key}.{category}" if key in categories else f"B.{key}.{category}.marks"] = 1
+    before = collection.find_one_and_update(
+        {"_id": user_id},
+        build_patch_update(section, updates, extra_fields, nested_total),
+        projection=projection,
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return None
+
+    # Replay the write on the document read before it
+    doc = copy.deepcopy(before)
+    for path, value in updates.items():
+        target = doc
+        *parents, leaf = path.split('.')
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    marks = {}
+    for key, (category, items) in categories.items():
+        marks[f"B.{key}.{category}.marks"] = doc["B"][key][category]["marks"] = \
+            category_marks_value(doc, key, category, items)
+    if section == 'B':
+        marks["B.total_marks"] = doc["B"]["total_marks"] = section_b_total_value(doc)
+
+    grand_total = _stored_total(doc, nested_total)
+    if on_change is not None:
+        _notify(on_change, before, grand_total, extra_fields)
+    return grand_total, marks
@@ -1,37 +1,13 @@
 from flask import Flask, jsonify, request
-from flask_pymongo import PyMongo
-import os
-from dotenv import load_dotenv
 from flask import Blueprint
+from db_config import mongo, mongo_fdw, department_collections
 
-# Load environment variables
-load_dotenv()
-
+# Standalone app for running this module on its own; app.py registers the blueprint instead
 app = Flask(__name__)
 
-# MongoDB Configuration
-app.config["MONGO_URI"] = os.getenv("MONGO_URI")
-app.config["MONGO_URI_FDW"] = os.getenv("MONGO_URI_FDW")
-
-# Initialize MongoDB connections
-mongo = PyMongo(app, uri=app.config["MONGO_URI"])
-mongo_fdw = PyMongo(app, uri=app.config["MONGO_URI_FDW"])
-
 # Collections
 db_users = mongo.db.users
 
-# Department collections
-department_collections = {
-    "AIML": mongo_fdw.db.AIML,
-    "ASH": mongo_fdw.db.ASH,
-    "Civil": mongo_fdw.db.Civil,
-    "Computer": mongo_fdw.db.Computer,
-    "Computer(Regional)": mongo_fdw.db.Computer_Regional,
-    "ENTC": mongo_fdw.db.ENTC,
-    "IT": mongo_fdw.db.IT,
-    "Mechanical": mongo_fdw.db.Mechanical
-}
-
 from flask import Blueprint, jsonify, request
 
 